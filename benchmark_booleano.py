@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# vi:ts=4 sw=4 et
+
+"""Mede o ganho das tabelas de resultados dos operadores de Booleano.
+
+Os operadores atuais são comparados com os anteriores, que convertiam o
+resultado com Booleano() em vez de consultar uma tabela. Os anteriores são
+métodos de BooleanoAnterior, uma subclasse com os seus próprios Verdadeiro
+e Falso, então os dois lados são chamados da mesma forma. Também é medida
+a fórmula lambda A,B,C: ((~A & (A|B)) > B) em todas as linhas da tabela,
+que é o que Formula faz com bitparalelo=False.
+
+Uso: python benchmark_booleano.py
+
+Termina com código 1 se algum operador ficar mais lento que o anterior. O
+caso da fórmula só é informado.
+"""
+
+from __future__ import print_function
+
+import itertools
+import sys
+import timeit
+
+from logica import BDD, Booleano, Verdadeiro, Falso, VetorBooleano
+
+
+class BooleanoAnterior(Booleano):
+    """Booleano com os operadores de antes das tabelas."""
+
+    def __new__(cls, val=0):
+        if val:
+            return VerdadeiroAnterior
+        else:
+            return FalsoAnterior
+
+    def __and__(self, other):
+        if isinstance(other, (VetorBooleano, BDD)):
+            return NotImplemented
+        return self and BooleanoAnterior(other)
+    __rand__ = __and__
+
+    def __or__(self, other):
+        if isinstance(other, (VetorBooleano, BDD)):
+            return NotImplemented
+        return self or BooleanoAnterior(other)
+    __ror__ = __or__
+
+    def __xor__(self, other):
+        if isinstance(other, (VetorBooleano, BDD)):
+            return NotImplemented
+        return BooleanoAnterior(int.__xor__(self, other))
+    __rxor__ = __xor__
+
+    def __neg__(self):
+        return BooleanoAnterior(not self)
+    __invert__ = __neg__
+
+    def __gt__(self, other):
+        return ~ self or other
+
+
+VerdadeiroAnterior = int.__new__(BooleanoAnterior, 1)
+FalsoAnterior = int.__new__(BooleanoAnterior, 0)
+
+
+def formula(A, B, C):
+    return (~A & (A | B)) > B
+
+
+def melhor_tempo(funcao, numero):
+    """Retorna o melhor tempo, em segundos, de uma chamada de funcao."""
+    return min(timeit.repeat(funcao, number=numero, repeat=5)) / numero
+
+
+def comparar(nome, anterior, atual, numero):
+    """Mostra e retorna o ganho de atual em relação a anterior."""
+    antes = melhor_tempo(anterior, numero)
+    depois = melhor_tempo(atual, numero)
+    print("%-30s %9.0f ns %9.0f ns %7.2fx" % (nome, antes * 1e9, depois * 1e9, antes / depois))
+    return antes / depois
+
+
+def main():
+    casos = []
+    for V, F in ((VerdadeiroAnterior, FalsoAnterior), (Verdadeiro, Falso)):
+        casos.append([
+            ("A & B", lambda A=V, B=F: A & B),
+            ("B | A", lambda A=V, B=F: B | A),
+            ("A ^ B", lambda A=V, B=F: A ^ B),
+            ("~ A", lambda A=V: ~ A),
+            ("A > B", lambda A=V, B=F: A > B),
+        ])
+    for (nome, anterior), (_, atual) in zip(*casos):
+        assert anterior() == atual(), nome
+        assert anterior().__class__ is BooleanoAnterior, nome
+        assert atual().__class__ is Booleano, nome
+
+    print("%-30s %12s %12s %8s" % ("caso", "anterior", "tabelas", "ganho"))
+    pior = float("inf")
+    for (nome, anterior), (_, atual) in zip(*casos):
+        pior = min(pior, comparar(nome, anterior, atual, 200000))
+
+    linhas_anteriores = list(itertools.product((VerdadeiroAnterior, FalsoAnterior), repeat=3))
+    linhas = list(itertools.product((Verdadeiro, Falso), repeat=3))
+    assert [formula(*l) for l in linhas_anteriores] == [formula(*l) for l in linhas]
+    comparar(
+        "fórmula, 8 linhas",
+        lambda: [formula(*l) for l in linhas_anteriores],
+        lambda: [formula(*l) for l in linhas],
+        20000,
+    )
+
+    return 0 if pior >= 1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
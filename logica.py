@@ -120,22 +120,58 @@ Falso
 >>> str(e)
 '(((A | B) & (A | ~ A) & (~ B | B) & (~ B | ~ A)))'
 >>>
+>>> # Removendo as cláusulas tautológicas e as redundantes:
+>>> e = Expressao( (A & ~B) | (B & ~A) )
+>>> e.transformar_em_forma_normal_conjuntiva(simplificar=True)
+>>> str(e)
+'(((A | B) & (~ B | ~ A)))'
+>>>
+>>> # Lendo uma expressão de um texto, sem eval() e sem criar os símbolos:
+>>> str(ler_expressao("(A & ~B) | (B & ~A)"))
+'((A & ~ B) | (B & ~ A))'
+>>>
 """
 
 
+import array
+import copy
+import heapq
+import io
+import itertools
+import json
+import mmap
+import re
+import struct
 import sys
+import weakref
 
 if sys.version_info.major >= 3:
     from functools import reduce
 
+try:
+    _ErroDeRecursao = RecursionError
+except NameError:
+    # Python 2 raises RuntimeError when the recursion limit is exceeded.
+    _ErroDeRecursao = RuntimeError
+
+# NumPy is optional, it is only needed by Expressao.avaliar_lote()
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 # You can use "from logica import *"
 __all__ = [
     "Booleano",
     "Verdadeiro",
     "Falso",
+    "VetorBooleano",
+    "GerenciadorBDD",
+    "BDD",
 
     "Formula",
+    "TabelaVerdade",
 
     "Expressao",
     "ExpressaoSimbolo",
@@ -143,8 +179,17 @@ __all__ = [
     "ExpressaoBinaria",
     "ExpressaoAnd",
     "ExpressaoOr",
+    "TabelaSimbolos",
 
     "criar_simbolos_no_namespace",
+    "ler_expressao",
+
+    "ResolvedorSAT",
+    "resolver_sat",
+    "ConjuntoClausulas",
+    "escrever_dimacs",
+    "ler_dimacs",
+    "iterar_dimacs",
 ]
 
 
@@ -185,24 +230,41 @@ class Booleano(int):
 
     # Note: boolean operators (and, or, not) can't be overridden
 
+    # The operators below are called for every row of a truth table, so
+    # when both operands are Booleano the result comes from the tables at
+    # the end of this class, indexed by the operands (Falso is 0 and
+    # Verdadeiro is 1), without creating or converting anything.
+
     def __and__(self, other):
         # This is the bitwise & operator
+        if other.__class__ is Booleano:
+            return _tabela_and[self][other]
+        if isinstance(other, (VetorBooleano, BDD)):
+            return NotImplemented
         return self and Booleano(other)
     __rand__ = __and__
 
     def __or__(self, other):
         # This is the bitwise | operator
+        if other.__class__ is Booleano:
+            return _tabela_or[self][other]
+        if isinstance(other, (VetorBooleano, BDD)):
+            return NotImplemented
         return self or Booleano(other)
     __ror__ = __or__
 
     def __xor__(self, other):
         # This is the bitwise ^ operator
+        if other.__class__ is Booleano:
+            return _tabela_xor[self][other]
+        if isinstance(other, (VetorBooleano, BDD)):
+            return NotImplemented
         return Booleano(int.__xor__(self, other))
     __rxor__ = __xor__
 
     def __neg__(self):
         # This is the numeric - operator
-        return Booleano(not self)
+        return _tabela_not[self]
     # This is the bitwise ~ operator
     __invert__ = __neg__
 
@@ -217,16 +279,943 @@ class Booleano(int):
         """A > B  significa  "A -> B", ou seja, "A implica em B"
         É equivalente a (not A or B).
         """
-        return ~ self or other
+        if other.__class__ is Booleano:
+            return _tabela_implica[self][other]
+        return _tabela_not[self] or other
         # Using "not" would return a bool() type;
         # thus I need to use the "~" operator
         #return not self or other
 
+    def __lt__(self, other):
+        """A < B  é a comparação de inteiros, ou seja, "~A & B".
+
+        Sem este método, "Verdadeiro < B" chamaria B.__gt__(Verdadeiro), que
+        significa "B implica em Verdadeiro", quando B é um VetorBooleano ou
+        um BDD.
+        """
+        if isinstance(other, (VetorBooleano, BDD)):
+            return _tabela_not[self] & other
+        return int.__lt__(self, other)
+
 
 # Bootstrapping the two values:
 Verdadeiro = int.__new__(Booleano, 1)
 Falso      = int.__new__(Booleano, 0)
 
+# Results of the Booleano operators: _tabela_and[a][b] is a & b, and so on.
+_tabela_not = (Verdadeiro, Falso)
+_tabela_and = ((Falso, Falso), (Falso, Verdadeiro))
+_tabela_or = ((Falso, Verdadeiro), (Verdadeiro, Verdadeiro))
+_tabela_xor = ((Falso, Verdadeiro), (Verdadeiro, Falso))
+_tabela_implica = ((Verdadeiro, Verdadeiro), (Falso, Verdadeiro))
+
+
+
+class VetorBooleano(object):
+    """Vários valores booleanos empacotados em um único inteiro.
+
+    Cada bit de .valor corresponde a uma linha da tabela verdade (o bit 0 é a
+    primeira linha). Os operadores são os mesmos do Booleano, mas cada
+    operação calcula todas as linhas de uma só vez:
+        &  AND
+        |  OR
+        ^  XOR
+        ~  NOT
+        >  implica
+
+    >>> a = VetorBooleano(0b0011, 0b1111)
+    >>> b = VetorBooleano(0b0101, 0b1111)
+    >>> a & b
+    VetorBooleano(0b1, 0b1111)
+    >>> a > b
+    VetorBooleano(0b1101, 0b1111)
+
+    Não é possível converter um VetorBooleano para bool, então "and", "or",
+    "not" e "if" geram TypeError. A classe Formula usa isso para detectar
+    funções que não podem ser avaliadas desta forma.
+    """
+
+    def __init__(self, valor, mascara):
+        # mascara tem um bit ligado para cada linha
+        self.valor = valor & mascara
+        self.mascara = mascara
+
+    def __repr__(self):
+        return "%s(%s, %s)" % (self.__class__.__name__, bin(self.valor), bin(self.mascara))
+
+    def _operando(self, other):
+        if isinstance(other, VetorBooleano):
+            return other.valor
+        if isinstance(other, int):
+            # Booleano, bool, ou qualquer inteiro usado como constante
+            return self.mascara if other else 0
+        raise TypeError("operando não suportado: %r" % (other, ))
+
+    def __bool__(self):
+        raise TypeError("VetorBooleano não pode ser convertido para bool")
+    __nonzero__ = __bool__
+
+    def __and__(self, other):
+        # This is the bitwise & operator
+        return VetorBooleano(self.valor & self._operando(other), self.mascara)
+    __rand__ = __and__
+
+    def __or__(self, other):
+        # This is the bitwise | operator
+        return VetorBooleano(self.valor | self._operando(other), self.mascara)
+    __ror__ = __or__
+
+    def __xor__(self, other):
+        # This is the bitwise ^ operator
+        return VetorBooleano(self.valor ^ self._operando(other), self.mascara)
+    __rxor__ = __xor__
+
+    def __neg__(self):
+        # This is the numeric - operator
+        return VetorBooleano(~ self.valor, self.mascara)
+    # This is the bitwise ~ operator
+    __invert__ = __neg__
+
+    def __pos__(self):
+        # This is the numeric + operator
+        return self
+
+    def __gt__(self, other):
+        """A > B  significa  "A -> B", ou seja, "A implica em B"."""
+        _verificar_implicacao(other)
+        return VetorBooleano(~ self.valor | self._operando(other), self.mascara)
+
+    # The remaining comparisons behave like int comparisons between 0 and 1,
+    # which is what the Booleano type does row by row.
+    def __lt__(self, other):
+        return VetorBooleano(~ self.valor & self._operando(other), self.mascara)
+
+    def __le__(self, other):
+        return VetorBooleano(~ self.valor | self._operando(other), self.mascara)
+
+    def __ge__(self, other):
+        return VetorBooleano(self.valor | ~ self._operando(other), self.mascara)
+
+    def __eq__(self, other):
+        return VetorBooleano(~ (self.valor ^ self._operando(other)), self.mascara)
+
+    def __ne__(self, other):
+        return VetorBooleano(self.valor ^ self._operando(other), self.mascara)
+
+    __hash__ = None
+
+
+def _verificar_implicacao(other):
+    """Rejeita "A > c" quando c é um bool ou um int.
+
+    Python chama A.__gt__(c) tanto para "A > c" quanto para "c < A", que são
+    operações diferentes. Booleano tem o seu próprio __lt__, mas bool e int
+    não; o TypeError faz a Formula avaliar linha por linha.
+    """
+    if isinstance(other, int) and other.__class__ is not Booleano:
+        raise TypeError("não é possível distinguir A > %r de %r < A" % (other, other))
+
+
+_mascaras_variaveis = {}
+
+def _mascara_variavel(i, nvars):
+    """Retorna um inteiro com os bits ligados nas linhas da tabela verdade em
+    que a i-ésima variável (de um total de nvars) é Verdadeiro.
+
+    As linhas seguem a ordem da tabela verdade: a primeira linha tem todas as
+    variáveis verdadeiras e a última variável é a que muda mais rápido.
+    """
+    if (i, nvars) in _mascaras_variaveis:
+        return _mascaras_variaveis[i, nvars]
+
+    # Row r has variable i true when bit (nvars - 1 - i) of r is zero.
+    bloco = 1 << (nvars - 1 - i)
+    mascara = (1 << bloco) - 1
+    periodo = 2 * bloco
+    total = 1 << nvars
+    while periodo < total:
+        mascara |= mascara << periodo
+        periodo *= 2
+
+    _mascaras_variaveis[i, nvars] = mascara
+    return mascara
+
+
+def _mascara_de_lista(valores):
+    """Converte uma lista de valores (um por linha) em um inteiro com um bit
+    por linha."""
+    bits = "".join("1" if v else "0" for v in reversed(valores))
+    return int(bits or "0", 2)
+
+
+def _lista_de_mascara(mascara, nlinhas):
+    """Converte um inteiro com um bit por linha em uma lista de Booleano."""
+    bits = format(mascara, "0%db" % nlinhas)
+    return [Verdadeiro if b == "1" else Falso for b in reversed(bits)]
+
+
+# Returns the number of bits set in x. int.bit_count() is Python 3.10+.
+_contar_bits = int.bit_count if hasattr(int, "bit_count") else lambda x: bin(x).count("1")
+
+
+def _bit_mais_baixo(x):
+    """Retorna a posição do bit ligado menos significativo de x."""
+    return (x & -x).bit_length() - 1
+
+
+class TabelaVerdade(object):
+    """Tabela verdade guardada como um inteiro com um bit por linha (o bit 0
+    é a primeira linha), que se comporta como uma lista de Booleano
+    somente leitura.
+
+    Cada linha ocupa um bit, em vez de um ponteiro de 8 bytes. Comparar
+    duas tabelas e contar as linhas verdadeiras são operações sobre o
+    inteiro, sem percorrer as linhas.
+
+    >>> t = TabelaVerdade(0b0110, 4)
+    >>> t
+    [Falso, Verdadeiro, Verdadeiro, Falso]
+    >>> t[1], t[-1], len(t), t.count(Verdadeiro)
+    (Verdadeiro, Falso, 4, 2)
+    >>> t == [Falso, Verdadeiro, Verdadeiro, Falso]
+    True
+    """
+
+    __slots__ = ("mascara", "nlinhas")
+
+    # Rows converted to Booleano at a time by __iter__().
+    _linhas_por_bloco = 1 << 12
+
+    def __init__(self, mascara, nlinhas):
+        self.mascara = mascara
+        self.nlinhas = nlinhas
+
+    def __len__(self):
+        return self.nlinhas
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.nlinhas))]
+        if i < 0:
+            i += self.nlinhas
+        if not 0 <= i < self.nlinhas:
+            raise IndexError("índice de linha fora do intervalo")
+        return Verdadeiro if (self.mascara >> i) & 1 else Falso
+
+    def __iter__(self):
+        bloco = self._linhas_por_bloco
+        completa = (1 << bloco) - 1
+        for primeira in range(0, self.nlinhas, bloco):
+            n = min(bloco, self.nlinhas - primeira)
+            for valor in _lista_de_mascara((self.mascara >> primeira) & completa, n):
+                yield valor
+
+    def __reversed__(self):
+        for i in range(self.nlinhas - 1, -1, -1):
+            yield self[i]
+
+    def __contains__(self, valor):
+        return self.count(valor) > 0
+
+    def count(self, valor):
+        """Retorna a quantidade de linhas iguais a valor."""
+        verdadeiras = _contar_bits(self.mascara)
+        if valor == Verdadeiro:
+            return verdadeiras
+        if valor == Falso:
+            return self.nlinhas - verdadeiras
+        return 0
+
+    def index(self, valor):
+        """Retorna a primeira linha igual a valor."""
+        mascara = self.mascara
+        if valor == Falso:
+            mascara = ~ mascara & ((1 << self.nlinhas) - 1)
+        elif valor != Verdadeiro:
+            mascara = 0
+        if not mascara:
+            raise ValueError("%r não está na tabela verdade" % (valor, ))
+        return _bit_mais_baixo(mascara)
+
+    def __eq__(self, other):
+        if isinstance(other, TabelaVerdade):
+            return self.nlinhas == other.nlinhas and self.mascara == other.mascara
+        # Like a list, it is never equal to a tuple, whose hash would differ.
+        if isinstance(other, list):
+            return len(other) == self.nlinhas and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __ne__(self, other):
+        igual = self.__eq__(other)
+        if igual is NotImplemented:
+            return igual
+        return not igual
+
+    def __hash__(self):
+        return hash((self.nlinhas, self.mascara))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getstate__(self):
+        return (self.mascara, self.nlinhas)
+
+    def __setstate__(self, estado):
+        self.mascara, self.nlinhas = estado
+
+
+# Level of the two terminal nodes, below every variable.
+_NIVEL_TERMINAL = float("inf")
+
+
+class GerenciadorBDD(object):
+    """Guarda os nós de diagramas de decisão binária reduzidos e ordenados
+    (ROBDD).
+
+    Cada nó testa uma variável: o ramo "baixo" é seguido quando ela é Falso e
+    o ramo "alto" quando é Verdadeiro. Os nós são números inteiros: 0 é o nó
+    Falso, 1 é o nó Verdadeiro, e os demais ficam na tabela de nós únicos,
+    então nunca há dois nós iguais. Por isso, duas funções booleanas são
+    equivalentes se, e somente se, têm o mesmo nó, e as verificações de
+    equivalência, tautologia e contradição são comparações de inteiros.
+
+    As variáveis são identificadas por qualquer valor "hashable" (um nome, um
+    número) e são ordenadas pela ordem em que foram criadas por .variavel().
+    BDDs só podem ser combinados se forem do mesmo gerenciador (veja
+    .importar()). Os nós nunca são liberados, então um gerenciador vive
+    enquanto houver BDDs dele em uso.
+
+    >>> g = GerenciadorBDD()
+    >>> A = g.variavel('A')
+    >>> B = g.variavel('B')
+    >>> ((A & B) | (A & ~ B)).equivalente(A)
+    Verdadeiro
+    >>> (A | ~ A).tautologia()
+    Verdadeiro
+    >>> (A > B).contar_verdadeiros(['A', 'B'])
+    3
+    """
+
+    # The computed table (the cache of .ite()) is emptied when it grows
+    # beyond this number of entries.
+    limite_cache = 1 << 20
+
+    def __init__(self):
+        # Node n tests the variable at level self._nivel[n]. Nodes 0 and 1
+        # are the terminals.
+        self._nivel = [_NIVEL_TERMINAL, _NIVEL_TERMINAL]
+        self._baixo = [0, 1]
+        self._alto = [0, 1]
+        # Maps (nivel, baixo, alto) to the node.
+        self._unicos = {}
+        # Maps (f, g, h) to the node of ite(f, g, h).
+        self._cache = {}
+        # The variable of each level, and the level of each variable.
+        self.variaveis = []
+        self._niveis = {}
+
+    def __len__(self):
+        """Quantidade de nós (incluindo os dois terminais)."""
+        return len(self._nivel)
+
+    def nivel(self, chave):
+        """Retorna o nível da variável, criando-a se ainda não existir."""
+        nivel = self._niveis.get(chave)
+        if nivel is None:
+            nivel = self._niveis[chave] = len(self.variaveis)
+            self.variaveis.append(chave)
+        return nivel
+
+    def variavel(self, chave):
+        """Retorna o BDD da variável identificada por chave."""
+        return BDD(self, self._no(self.nivel(chave), 0, 1))
+
+    def constante(self, valor):
+        """Retorna o BDD constante Verdadeiro ou Falso."""
+        return BDD(self, 1 if valor else 0)
+
+    def _no(self, nivel, baixo, alto):
+        if baixo == alto:
+            return baixo
+        chave = (nivel, baixo, alto)
+        no = self._unicos.get(chave)
+        if no is None:
+            no = self._unicos[chave] = len(self._nivel)
+            self._nivel.append(nivel)
+            self._baixo.append(baixo)
+            self._alto.append(alto)
+        return no
+
+    def ite(self, f, g, h):
+        """Retorna o nó de "se f então g senão h", sendo f, g e h nós."""
+        # An explicit stack instead of recursion, which would go one level
+        # deeper per variable. The stack holds the (f, g, h) still to be
+        # computed and, after the two cofactors of a node, (None, chave,
+        # nivel) to build it. The results go to resultados, so a node's
+        # cofactors are the last two of them.
+        cache = self._cache
+        niveis = self._nivel
+        baixos = self._baixo
+        altos = self._alto
+        resultados = []
+        pilha = [(f, g, h)]
+        while pilha:
+            f, g, h = item = pilha.pop()
+            if f is None:
+                alto = resultados.pop()
+                no = self._no(h, resultados.pop(), alto)
+                if len(cache) >= self.limite_cache:
+                    cache.clear()
+                cache[g] = no
+                resultados.append(no)
+                continue
+
+            if f == 1 or g == h:
+                resultados.append(g)
+                continue
+            if f == 0:
+                resultados.append(h)
+                continue
+            if g == 1 and h == 0:
+                resultados.append(f)
+                continue
+            no = cache.get(item)
+            if no is not None:
+                resultados.append(no)
+                continue
+
+            # The cofactors of f, g and h on the topmost of their variables.
+            nivel = min(niveis[f], niveis[g], niveis[h])
+            f0 = f1 = f
+            if niveis[f] == nivel:
+                f0 = baixos[f]
+                f1 = altos[f]
+            g0 = g1 = g
+            if niveis[g] == nivel:
+                g0 = baixos[g]
+                g1 = altos[g]
+            h0 = h1 = h
+            if niveis[h] == nivel:
+                h0 = baixos[h]
+                h1 = altos[h]
+            pilha.append((None, item, nivel))
+            pilha.append((f1, g1, h1))
+            pilha.append((f0, g0, h0))
+        return resultados[0]
+
+    def importar(self, bdd):
+        """Retorna o BDD deste gerenciador que representa a mesma função que
+        bdd, que pode ser de outro gerenciador.
+
+        As variáveis são identificadas pelas chaves, então a ordem delas
+        pode ser diferente nos dois gerenciadores.
+        """
+        if bdd.gerenciador is self:
+            return bdd
+        origem = bdd.gerenciador
+        # New variables are created in the order of the source, which keeps
+        # the BDD the same size if this manager doesn't have them yet.
+        for chave in origem.suporte(bdd.no):
+            self.nivel(chave)
+        nos = {0: 0, 1: 1}
+        # Post-order: a node is imported once both of its children are.
+        pilha = [bdd.no]
+        while pilha:
+            n = pilha[-1]
+            if n in nos:
+                pilha.pop()
+                continue
+            baixo = origem._baixo[n]
+            alto = origem._alto[n]
+            if baixo in nos and alto in nos:
+                pilha.pop()
+                nivel = self.nivel(origem.variaveis[origem._nivel[n]])
+                baixo = nos[baixo]
+                alto = nos[alto]
+                if nivel < self._nivel[baixo] and nivel < self._nivel[alto]:
+                    # The usual case, with the variables in the same order.
+                    nos[n] = self._no(nivel, baixo, alto)
+                else:
+                    nos[n] = self.ite(self._no(nivel, 0, 1), alto, baixo)
+            else:
+                pilha.append(baixo)
+                pilha.append(alto)
+        return BDD(self, nos[bdd.no])
+
+    def suporte(self, no):
+        """Retorna a lista das variáveis das quais o nó depende, ordenadas
+        por nível."""
+        niveis = set()
+        visitados = set([0, 1])
+        pilha = [no]
+        while pilha:
+            n = pilha.pop()
+            if n in visitados:
+                continue
+            visitados.add(n)
+            niveis.add(self._nivel[n])
+            pilha.append(self._baixo[n])
+            pilha.append(self._alto[n])
+        return [self.variaveis[nivel] for nivel in sorted(niveis)]
+
+    def _posicoes(self, no, chaves):
+        """Retorna um dicionário com a posição de cada nível de chaves, em
+        ordem de nível, e a lista desses níveis."""
+        niveis = sorted(self.nivel(c) for c in chaves)
+        posicoes = dict((nivel, i) for i, nivel in enumerate(niveis))
+        posicoes[_NIVEL_TERMINAL] = len(niveis)
+        for chave in self.suporte(no):
+            if self._niveis[chave] not in posicoes:
+                raise ValueError("o BDD depende da variável %r" % (chave, ))
+        return posicoes, niveis
+
+    def contar(self, no, chaves):
+        """Retorna a quantidade de valorações das variáveis chaves que
+        tornam o nó verdadeiro."""
+        posicoes, niveis = self._posicoes(no, chaves)
+        contagens = {0: 0, 1: 1}
+        # Post-order, as in .importar().
+        pilha = [no]
+        while pilha:
+            n = pilha[-1]
+            if n in contagens:
+                pilha.pop()
+                continue
+            baixo = self._baixo[n]
+            alto = self._alto[n]
+            if baixo in contagens and alto in contagens:
+                pilha.pop()
+                p = posicoes[self._nivel[n]]
+                contagens[n] = (
+                    contagens[baixo] << (posicoes[self._nivel[baixo]] - p - 1)
+                ) + (
+                    contagens[alto] << (posicoes[self._nivel[alto]] - p - 1)
+                )
+            else:
+                pilha.append(baixo)
+                pilha.append(alto)
+        return contagens[no] << posicoes[self._nivel[no]]
+
+    def valoracoes(self, no, chaves):
+        """Gera as valorações (tuplas de Booleano, na ordem de chaves) que
+        tornam o nó verdadeiro.
+
+        As valorações seguem a ordem da tabela verdade, com as variáveis
+        ordenadas por nível: a primeira tem o máximo de variáveis
+        verdadeiras no início, e a última variável é a que muda mais rápido.
+        """
+        posicoes, niveis = self._posicoes(no, chaves)
+        ordem = [posicoes[self.nivel(c)] for c in chaves]
+
+        # Depth-first, with an explicit stack: (n, i, valor) reaches node n
+        # after giving valor to the variable niveis[i - 1], and the values
+        # of the variables before it are already in valores.
+        valores = [None] * len(niveis)
+        pilha = [(no, 0, None)]
+        while pilha:
+            n, i, valor = pilha.pop()
+            if i:
+                valores[i - 1] = valor
+            if n == 0:
+                continue
+            if i == len(niveis):
+                yield tuple(valores[p] for p in ordem)
+                continue
+            if self._nivel[n] == niveis[i]:
+                pilha.append((self._baixo[n], i + 1, Falso))
+                pilha.append((self._alto[n], i + 1, Verdadeiro))
+            else:
+                pilha.append((n, i + 1, Falso))
+                pilha.append((n, i + 1, Verdadeiro))
+
+
+class BDD(object):
+    """Uma função booleana representada por um nó de um GerenciadorBDD.
+
+    Os operadores são os mesmos do VetorBooleano, e também não é possível
+    converter um BDD para bool. Assim, uma função que funciona com
+    VetorBooleano também pode ser chamada com BDDs (veja Formula e
+    Expressao.bdd()).
+    """
+
+    def __init__(self, gerenciador, no):
+        self.gerenciador = gerenciador
+        self.no = no
+
+    def __repr__(self):
+        return "%s(%r, %d)" % (self.__class__.__name__, self.gerenciador, self.no)
+
+    def _operando(self, other):
+        if isinstance(other, BDD):
+            if other.gerenciador is not self.gerenciador:
+                raise ValueError("os BDDs são de gerenciadores diferentes")
+            return other.no
+        if isinstance(other, int):
+            # Booleano, bool, ou qualquer inteiro usado como constante
+            return 1 if other else 0
+        raise TypeError("operando não suportado: %r" % (other, ))
+
+    def _ite(self, g, h):
+        return BDD(self.gerenciador, self.gerenciador.ite(self.no, g, h))
+
+    def __bool__(self):
+        raise TypeError("BDD não pode ser convertido para bool")
+    __nonzero__ = __bool__
+
+    def __and__(self, other):
+        # This is the bitwise & operator
+        return self._ite(self._operando(other), 0)
+    __rand__ = __and__
+
+    def __or__(self, other):
+        # This is the bitwise | operator
+        return self._ite(1, self._operando(other))
+    __ror__ = __or__
+
+    def __xor__(self, other):
+        # This is the bitwise ^ operator
+        outro = self._operando(other)
+        return self._ite(self.gerenciador.ite(outro, 0, 1), outro)
+    __rxor__ = __xor__
+
+    def __neg__(self):
+        # This is the numeric - operator
+        return self._ite(0, 1)
+    # This is the bitwise ~ operator
+    __invert__ = __neg__
+
+    def __pos__(self):
+        # This is the numeric + operator
+        return self
+
+    def __gt__(self, other):
+        """A > B  significa  "A -> B", ou seja, "A implica em B"."""
+        _verificar_implicacao(other)
+        return self._ite(self._operando(other), 1)
+
+    # The remaining comparisons behave like int comparisons between 0 and 1,
+    # which is what the Booleano type does row by row.
+    def __lt__(self, other):
+        return self._ite(0, self._operando(other))
+
+    def __le__(self, other):
+        return self._ite(self._operando(other), 1)
+
+    def __ge__(self, other):
+        return self._ite(1, self.gerenciador.ite(self._operando(other), 0, 1))
+
+    def __eq__(self, other):
+        outro = self._operando(other)
+        return self._ite(outro, self.gerenciador.ite(outro, 0, 1))
+
+    def __ne__(self, other):
+        return ~ (self == other)
+
+    __hash__ = None
+
+    def equivalente(self, other):
+        """Retorna Verdadeiro se os dois BDDs representam a mesma função.
+
+        Se other for de outro gerenciador, ele é importado para o
+        gerenciador deste BDD.
+        """
+        if isinstance(other, BDD):
+            other = self.gerenciador.importar(other)
+        return Booleano(self.no == self._operando(other))
+
+    def tautologia(self):
+        return Booleano(self.no == 1)
+
+    def contradicao(self):
+        return Booleano(self.no == 0)
+
+    def suporte(self):
+        """Retorna a lista das variáveis das quais esta função depende."""
+        return self.gerenciador.suporte(self.no)
+
+    def contar_verdadeiros(self, chaves=None):
+        """Retorna a quantidade de valorações das variáveis chaves (por
+        padrão, as de .suporte()) que tornam a função verdadeira."""
+        if chaves is None:
+            chaves = self.suporte()
+        return self.gerenciador.contar(self.no, chaves)
+
+    def valoracoes(self, chaves=None):
+        """Gera as valorações das variáveis chaves (por padrão, as de
+        .suporte()) que tornam a função verdadeira. Veja
+        GerenciadorBDD.valoracoes()."""
+        if chaves is None:
+            chaves = self.suporte()
+        return self.gerenciador.valoracoes(self.no, chaves)
+
+    def exemplo(self, chaves=None):
+        """Retorna a primeira valoração de .valoracoes(), ou None se a função
+        for uma contradição."""
+        return next(iter(self.valoracoes(chaves)), None)
+
+
+# Two-level minimization (see Formula.minimizar()).
+#
+# A cube is a pair (valor, livres) of row numbers: the bits set in livres
+# are the variables absent from the cube, and the other bits of valor give
+# the value of each variable, as in the row numbers of the truth table (bit
+# nvars - 1 - i is the i-th variable, and a zero bit means Verdadeiro). The
+# bits of valor that are set in livres are always zero.
+#
+# The rows covered by a cube, and the ON-set and the OFF-set of a function,
+# are sets of rows stored as masks with one bit per row, like .tbmascara.
+
+def _mascara_do_cubo(cubo, nvars):
+    """Retorna a máscara das linhas cobertas pelo cubo."""
+    valor, livres = cubo
+    completa = (1 << (1 << nvars)) - 1
+    mascara = completa
+    for i in range(nvars):
+        bit = 1 << (nvars - 1 - i)
+        if not livres & bit:
+            variavel = _mascara_variavel(i, nvars)
+            mascara &= (completa & ~ variavel) if valor & bit else variavel
+    return mascara
+
+
+def _expandir_mascara(mascara, cubo, bit):
+    """Retorna a máscara do cubo sem a variável do bit indicado, a partir
+    da máscara do cubo: as linhas com esse bit trocado são as linhas do
+    cubo deslocadas de bit posições."""
+    if cubo[0] & bit:
+        return mascara | (mascara >> bit)
+    return mascara | (mascara << bit)
+
+
+def _literais_do_cubo(cubo, nvars):
+    return nvars - _contar_bits(cubo[1])
+
+
+def _custo_da_cobertura(cubos, nvars):
+    """Quantidade de termos e, depois, de literais."""
+    return (len(cubos), sum(_literais_do_cubo(c, nvars) for c in cubos))
+
+
+def _implicantes_primos(on, nvars):
+    """Retorna os implicantes primos da função cujo ON-set é on (método de
+    Quine-McCluskey).
+
+    Os cubos de cada tamanho ficam em um set. Dois cubos com as mesmas
+    variáveis livres são combinados quando os seus valores diferem em um
+    único bit, então cada cubo só procura os vizinhos (valor | bit) no set,
+    em vez de ser comparado com todos os outros.
+    """
+    atuais = set()
+    linhas = on
+    while linhas:
+        r = _bit_mais_baixo(linhas)
+        linhas &= linhas - 1
+        atuais.add((r, 0))
+
+    primos = []
+    while atuais:
+        proximos = set()
+        combinados = set()
+        for cubo in atuais:
+            valor, livres = cubo
+            for p in range(nvars):
+                bit = 1 << p
+                if (valor | livres) & bit:
+                    continue
+                vizinho = (valor | bit, livres)
+                if vizinho in atuais:
+                    proximos.add((valor, livres | bit))
+                    combinados.add(cubo)
+                    combinados.add(vizinho)
+        primos.extend(c for c in atuais if c not in combinados)
+        atuais = proximos
+    return sorted(primos)
+
+
+def _cobertura_exata(on, nvars):
+    """Retorna a cobertura de on com o menor custo (veja
+    _custo_da_cobertura()) usando implicantes primos.
+
+    A busca é um branch and bound. Em cada passo, a linha descoberta
+    coberta por menos primos é escolhida, e cada um desses primos é
+    tentado, exceto os que cobrem apenas parte das linhas cobertas por
+    outro primo mais barato. Os primos essenciais são os que ficam
+    sozinhos nessa escolha. O limite inferior vem de um conjunto de linhas
+    descobertas que não têm nenhum primo em comum, e que portanto precisam
+    de um primo diferente cada uma.
+    """
+    primos = _implicantes_primos(on, nvars)
+    mascaras = [_mascara_do_cubo(c, nvars) for c in primos]
+    literais = [_literais_do_cubo(c, nvars) for c in primos]
+
+    # For each row, the mask of the primes that cover it. The rows covered
+    # by fewer primes come first.
+    primos_da_linha = {}
+    for i, mascara in enumerate(mascaras):
+        while mascara:
+            r = _bit_mais_baixo(mascara)
+            mascara &= mascara - 1
+            primos_da_linha[r] = primos_da_linha.get(r, 0) | (1 << i)
+    linhas = sorted(primos_da_linha, key=lambda r: _contar_bits(primos_da_linha[r]))
+    menor_custo = dict(
+        (r, min(literais[i] for i in range(len(primos)) if (primos_da_linha[r] >> i) & 1))
+        for r in linhas
+    )
+
+    # The heuristic cover is the first upper bound.
+    inicial = _cobertura_heuristica(on, nvars)
+    melhor = [_custo_da_cobertura(inicial, nvars), inicial]
+
+    pilha = [(on, [], 0)]
+    while pilha:
+        descoberto, escolhidos, custo = pilha.pop()
+        if not descoberto:
+            if (len(escolhidos), custo) < melhor[0]:
+                melhor[:] = [(len(escolhidos), custo), [primos[i] for i in escolhidos]]
+            continue
+
+        # Lower bound: a greedy set of rows without common primes.
+        usados = 0
+        termos = len(escolhidos)
+        minimo = custo
+        escolhida = None
+        for r in linhas:
+            if not (descoberto >> r) & 1:
+                continue
+            if escolhida is None:
+                escolhida = r
+            if not primos_da_linha[r] & usados:
+                usados |= primos_da_linha[r]
+                termos += 1
+                minimo += menor_custo[r]
+        if (termos, minimo) >= melhor[0]:
+            continue
+
+        candidatos = []
+        p = primos_da_linha[escolhida]
+        while p:
+            i = _bit_mais_baixo(p)
+            p &= p - 1
+            candidatos.append(i)
+        candidatos.sort(key=lambda i: (-_contar_bits(mascaras[i] & descoberto), literais[i]))
+        filhos = []
+        for i in candidatos:
+            cobre = mascaras[i] & descoberto
+            if any(cobre & ~ mascaras[j] == 0 and literais[j] <= literais[i]
+                   for j in filhos):
+                continue
+            filhos.append(i)
+        # The stack is LIFO: the best candidate is tried first.
+        for i in reversed(filhos):
+            pilha.append((descoberto & ~ mascaras[i], escolhidos + [i], custo + literais[i]))
+    return melhor[1]
+
+
+def _expandir(cubo, mascara, off, nvars, descoberto):
+    """Remove variáveis do cubo enquanto ele não cobrir nenhuma linha de
+    off, preferindo as que fazem o cubo cobrir linhas descobertas.
+    Retorna o cubo e a sua máscara."""
+    for prefere_descobertas in (True, False):
+        for p in reversed(range(nvars)):
+            bit = 1 << p
+            if cubo[1] & bit:
+                continue
+            nova = _expandir_mascara(mascara, cubo, bit)
+            if nova & off:
+                continue
+            if prefere_descobertas and not (nova & ~ mascara & descoberto):
+                continue
+            cubo = (cubo[0] & ~ bit, cubo[1] | bit)
+            mascara = nova
+    return cubo, mascara
+
+
+def _irredundante(cubos, mascaras, nvars):
+    """Remove os cubos cujas linhas são todas cobertas pelos outros,
+    começando pelos que têm mais literais."""
+    cubos = list(cubos)
+    mascaras = list(mascaras)
+    while True:
+        uma_vez = duas_vezes = 0
+        for m in mascaras:
+            duas_vezes |= uma_vez & m
+            uma_vez |= m
+        redundantes = [i for i, m in enumerate(mascaras) if m & ~ duas_vezes == 0]
+        if not redundantes:
+            return cubos, mascaras
+        # Removing one at a time: two cubes may only cover each other.
+        i = max(redundantes, key=lambda i: (_literais_do_cubo(cubos[i], nvars), -i))
+        del cubos[i]
+        del mascaras[i]
+
+
+def _reduzir(linhas, nvars):
+    """Retorna o menor cubo que cobre todas as linhas (não vazias)."""
+    valor = livres = 0
+    for i in range(nvars):
+        bit = 1 << (nvars - 1 - i)
+        variavel = _mascara_variavel(i, nvars)
+        if linhas & ~ variavel == 0:
+            pass
+        elif linhas & variavel == 0:
+            valor |= bit
+        else:
+            livres |= bit
+    return (valor, livres)
+
+
+def _cobertura_heuristica(on, nvars):
+    """Retorna uma cobertura de on, não necessariamente mínima, no estilo do
+    Espresso.
+
+    Cada linha descoberta é expandida até um implicante primo (EXPAND), os
+    cubos redundantes são removidos (IRREDUNDANT) e, enquanto o custo
+    diminuir, cada cubo é reduzido ao menor cubo que cobre as linhas que só
+    ele cobre (REDUCE) e expandido de novo.
+    """
+    off = ((1 << (1 << nvars)) - 1) & ~ on
+
+    cubos = []
+    mascaras = []
+    descoberto = on
+    while descoberto:
+        r = _bit_mais_baixo(descoberto)
+        cubo, mascara = _expandir((r, 0), 1 << r, off, nvars, descoberto)
+        cubos.append(cubo)
+        mascaras.append(mascara)
+        descoberto &= ~ mascara
+    cubos, mascaras = _irredundante(cubos, mascaras, nvars)
+
+    custo = _custo_da_cobertura(cubos, nvars)
+    while cubos:
+        # The rows covered by the cubes after each one.
+        seguintes = [0] * len(cubos)
+        for i in reversed(range(len(cubos) - 1)):
+            seguintes[i] = seguintes[i + 1] | mascaras[i + 1]
+
+        novos = []
+        novas = []
+        anteriores = 0
+        for i in range(len(cubos)):
+            outras = anteriores | seguintes[i]
+            so_deste = mascaras[i] & on & ~ outras
+            if not so_deste:
+                continue
+            cubo = _reduzir(so_deste, nvars)
+            mascara = _mascara_do_cubo(cubo, nvars)
+            cubo, mascara = _expandir(cubo, mascara, off, nvars, on & ~ outras & ~ mascara)
+            novos.append(cubo)
+            novas.append(mascara)
+            anteriores |= mascara
+        novos, novas = _irredundante(novos, novas, nvars)
+        novo_custo = _custo_da_cobertura(novos, nvars)
+        if novo_custo >= custo:
+            break
+        cubos, mascaras, custo = novos, novas, novo_custo
+    return cubos
+
 
 
 
@@ -237,9 +1226,39 @@ class Formula(object):
     * Gerar a tabela verdade.
     * Comparar duas fórmulas quanto à equivalência.
     * Dizer se é tautologia ou contradição.
+
+    A tabela verdade fica guardada em .tbmascara, um inteiro com um bit por
+    linha (o bit 0 é a primeira linha). .tbverdade é uma TabelaVerdade, que
+    usa o mesmo inteiro e se comporta como uma lista de Booleano.
+
+    A tabela verdade só é calculada quando for usada. Fórmulas com muitas
+    variáveis não guardam a tabela verdade (.tbverdade e .tbmascara são
+    None); nesse caso, a tabela é calculada em blocos, sob demanda, usando
+    pouca memória. Veja .blocos() e .linhas().
+
+    As verificações (.tautologia(), .contradicao(), ==) param assim que a
+    resposta é conhecida. Os métodos .exemplo(), .contraexemplo() e
+    .diferenca() também retornam a linha que decidiu a resposta.
+
+    Com usar_bdd=True, a fórmula é convertida em um BDD (veja a classe BDD),
+    e as verificações deixam de depender do tamanho da tabela verdade.
     """
 
-    def __init__(self, expr, nvars=None):
+    # Truth tables are computed in blocks of 2**bits_por_bloco rows.
+    # Formulas with fewer variables than this are stored in memory.
+    bits_por_bloco = 16
+
+    # A formula created from an Expressao evaluates it with .eval() until
+    # the function is called this many times, and then compiles it (see
+    # ._avaliar_expressao()).
+    chamadas_para_compilar = 8
+
+    # .minimizar() is exact up to this many variables. The exact covering
+    # takes milliseconds on random functions of 7 variables, but can take
+    # seconds on some of 8.
+    limite_exato = 7
+
+    def __init__(self, expr, nvars=None, bitparalelo=True, materializar=None, usar_sat=None, usar_bdd=False, podar=False, gerenciador=None):
         """Formula(expr, nvars)
 
         Há dois tipos de parâmetros possíveis:
@@ -248,67 +1267,727 @@ class Formula(object):
 
         expr  -> Expressao
         nvars -> None (detectado automaticamente)
+
+        Se bitparalelo for verdadeiro, a função é chamada uma única vez, com
+        um VetorBooleano para cada variável, calculando todas as linhas da
+        tabela de uma vez. Se a função não suportar isso (por exemplo, se usar
+        "and", "or", "not" ou "if"), a tabela é calculada linha por linha e
+        .bitparalelo passa a ser False.
+
+        Se materializar for verdadeiro, a tabela verdade é guardada em
+        .tbverdade depois de calculada. Por padrão, isso só acontece se nvars
+        for menor que .bits_por_bloco.
+
+        Se usar_sat for verdadeiro, as verificações usam o ResolvedorSAT em
+        vez da tabela verdade. Só é possível em fórmulas criadas a partir de
+        uma Expressao; por padrão, é usado nas que não guardam a tabela
+        verdade.
+
+        Se usar_bdd for verdadeiro, a função é chamada uma única vez, com um
+        BDD para cada variável, e as verificações usam o BDD resultante:
+        .tautologia(), .contradicao() e == passam a custar uma comparação, e
+        .exemplo(), .contraexemplo() e .diferenca() retornam a mesma
+        valoração que a tabela verdade. Se a função não suportar BDDs (veja
+        bitparalelo), .usar_bdd passa a ser False. O BDD é criado no
+        gerenciador (veja GerenciadorBDD); por padrão, cada fórmula tem o seu,
+        que é liberado junto com ela.
+
+        Se podar for verdadeiro, a tabela verdade é calculada com valorações
+        parciais (veja ._avaliar_podado()), o que evita avaliar as linhas já
+        decididas por parte das variáveis. Só é possível em fórmulas criadas
+        a partir de uma Expressao.
         """
         if isinstance(expr, Expressao):
             assert nvars is None
 
-            # Convertendo de set para lista.
-            simbolos = sorted(expr.simbolos())
+            # The variable i is the symbol number i of the table.
+            tabela = expr.tabela_simbolos()
 
-            self.nvars = len(simbolos)
-            self.expr = lambda *args: expr.eval(dict(zip(simbolos, args)))
+            self.nvars = len(tabela)
+            self.expr = self._avaliar_expressao
+            self._chamadas = 0
+            self.expressao = expr
+            self.tabela = tabela
+            self.simbolos = list(tabela)
         else:
             assert isinstance(nvars, int)
             self.nvars = nvars
             self.expr = expr
+            self.expressao = None
+            self.tabela = None
+            self.simbolos = None
+
+        self.bitparalelo = bitparalelo
+        self._tbverdade = None
+        self._tbmascara = None
+
+        if materializar is None:
+            materializar = self.nvars < self.bits_por_bloco
+        self.materializar = materializar
+
+        if usar_sat is None:
+            usar_sat = self.expressao is not None and not materializar
+        assert not usar_sat or self.expressao is not None
+        self.usar_sat = usar_sat
+
+        # A formula without variables has an empty truth table, which no BDD
+        # represents.
+        self.usar_bdd = usar_bdd and self.nvars > 0
+        self._bdd = None
+        self.gerenciador = gerenciador
+
+        assert not podar or self.expressao is not None
+        self.podar = podar
+
+    def _avaliar_expressao(self, *valores):
+        """A função .expr das fórmulas criadas a partir de uma Expressao.
+
+        O caminho bit-paralelo e o BDD chamam a função uma única vez, e
+        compilar a expressão custaria mais do que avaliá-la. Só depois de
+        .chamadas_para_compilar chamadas (linha por linha, ou um bloco por
+        chamada) a expressão é compilada, e .expr passa a ser a função
+        compilada (veja Expressao.compilar()).
+        """
+        self._chamadas += 1
+        if self._chamadas >= self.chamadas_para_compilar:
+            self.expr = self.expressao.compilar()
+            return self.expr(*valores)
+        return self.expressao.eval(dict(zip(self.simbolos, valores)))
+
+    @property
+    def bdd(self):
+        """O BDD da fórmula, calculado no primeiro acesso, ou None se
+        .usar_bdd for falso.
+
+        A i-ésima variável da fórmula é a variável i do gerenciador. Fórmulas
+        que são comparadas muitas vezes entre si devem usar o mesmo
+        gerenciador; senão, o BDD de uma é importado para o gerenciador da
+        outra a cada comparação.
+        """
+        if self._bdd is None and self.usar_bdd:
+            if self.gerenciador is None:
+                self.gerenciador = GerenciadorBDD()
+            gerenciador = self.gerenciador
+            args = [gerenciador.variavel(i) for i in range(self.nvars)]
+            try:
+                resultado = self.expr(*args)
+                if isinstance(resultado, int):
+                    # The function ignored its arguments and returned a constant.
+                    resultado = gerenciador.constante(resultado)
+                if not isinstance(resultado, BDD):
+                    raise TypeError("resultado não suportado: %r" % (resultado, ))
+                self._bdd = resultado
+            except (TypeError, _ErroDeRecursao):
+                # The function may recurse once per level of a deep
+                # expression; the truth table or the SAT solver are used
+                # instead.
+                self.usar_bdd = False
+        return self._bdd
+
+    def _chaves_bdd(self):
+        return range(self.nvars)
+
+    def _bdd_de(self, other):
+        """Retorna o BDD de other no gerenciador desta fórmula."""
+        return self.bdd.gerenciador.importar(other.bdd)
+
+    @property
+    def tbverdade(self):
+        """TabelaVerdade com o valor da fórmula em cada linha da tabela
+        verdade.
+
+        É calculada no primeiro acesso, ou é None se a fórmula não guarda a
+        tabela verdade.
+        """
+        if self._tbverdade is None and self.materializar:
+            if self._tbmascara is None:
+                self.calcular_tabela_verdade()
+            else:
+                self._tbverdade = TabelaVerdade(self._tbmascara, self._nlinhas())
+        return self._tbverdade
 
-        self.tbverdade = []
-
-        # Just to prevent out-of-memory and too long operations.
-        # This limit can be raised if needed.
-        assert self.nvars < 16
+    @property
+    def tbmascara(self):
+        """Inteiro com um bit por linha da tabela verdade.
 
-        self.calcular_tabela_verdade()
+        É calculado no primeiro acesso, ou é None se a fórmula não guarda a
+        tabela verdade.
+        """
+        if self._tbmascara is None and self.materializar:
+            self.calcular_tabela_verdade()
+        return self._tbmascara
 
     def __eq__(self, other):
-        """Compara a tabela verdade de duas fórmulas."""
-        return Booleano(self.tbverdade == other.tbverdade)
+        """Compara a tabela verdade de duas fórmulas.
+
+        A comparação para na primeira linha diferente.
+        """
+        if self.nvars != other.nvars:
+            return Falso
+        if self.bdd is not None and other.bdd is not None:
+            return self.bdd.equivalente(other.bdd)
+        if self._tbmascara is not None and other._tbmascara is not None:
+            return Booleano(self._tbmascara == other._tbmascara)
+        return Booleano(self.diferenca(other) is None)
+
+    def _nlinhas(self):
+        # A formula without variables has an empty truth table.
+        if self.nvars > 0:
+            return 1 << self.nvars
+        return 0
+
+    def _valores_externos(self, indice, bits):
+        """Valores das variáveis que ficam constantes dentro do bloco."""
+        externas = self.nvars - bits
+        return [
+            Falso if (indice >> (externas - 1 - i)) & 1 else Verdadeiro
+            for i in range(externas)
+        ]
+
+    def _avaliar_vetores(self, indice, bits):
+        """Avalia o bloco de 2**bits linhas de número indice chamando a
+        função uma única vez, com um VetorBooleano por variável.
+
+        Retorna None se a função não puder ser avaliada desta forma.
+        """
+        completa = (1 << (1 << bits)) - 1
+        args = [
+            VetorBooleano(completa if valor else 0, completa)
+            for valor in self._valores_externos(indice, bits)
+        ] + [
+            VetorBooleano(_mascara_variavel(j, bits), completa)
+            for j in range(bits)
+        ]
+        try:
+            resultado = self.expr(*args)
+            if isinstance(resultado, VetorBooleano):
+                return resultado.valor
+            if isinstance(resultado, int):
+                # The function ignored its arguments and returned a constant.
+                return completa if resultado else 0
+            raise TypeError("resultado não suportado: %r" % (resultado, ))
+        except TypeError:
+            self.bitparalelo = False
+            return None
+
+    def _avaliar_linhas(self, indice, bits):
+        """Avalia o bloco de 2**bits linhas de número indice, linha por linha.
+
+        Retorna a lista dos valores retornados pela função.
+        """
+        prefixo = self._valores_externos(indice, bits)
+        return [
+            self.expr(*(prefixo + list(valores)))
+            for valores in itertools.product((Verdadeiro, Falso), repeat=bits)
+        ]
+
+    def _avaliar_podado(self, indice, bits):
+        """Avalia o bloco de 2**bits linhas de número indice usando
+        Expressao.avaliar_parcial().
+
+        As variáveis do bloco recebem valores uma de cada vez, na ordem de
+        Expressao.simbolos_por_frequencia(). Assim que uma valoração parcial
+        decide o valor da expressão, todas as linhas que ela representa são
+        preenchidas de uma só vez, sem avaliar as variáveis restantes.
+        """
+        externas = self.nvars - bits
+        ordem = [
+            s for s in self.expressao.simbolos_por_frequencia()
+            if self.tabela.id(s) >= externas
+        ]
+        mascaras = [_mascara_variavel(self.tabela.id(s) - externas, bits) for s in ordem]
+        valores = dict(zip(self.simbolos, self._valores_externos(indice, bits)))
+        # The same as self.expressao.avaliar_parcial(valores), walking the
+        # tree only once for the whole block.
+        nos = self.expressao._pos_ordem()
+        parcial = lambda e, filhos: e._avaliar_parcial_no(valores, filhos)
+
+        def podar(k, linhas):
+            # linhas has the rows of the block that match valores.
+            valor = self.expressao._calcular(parcial, nos)
+            if valor is not None:
+                return linhas if valor else 0
+            simbolo = ordem[k]
+            valores[simbolo] = Verdadeiro
+            mascara = podar(k + 1, linhas & mascaras[k])
+            valores[simbolo] = Falso
+            mascara |= podar(k + 1, linhas & ~ mascaras[k])
+            del valores[simbolo]
+            return mascara
+
+        return podar(0, (1 << (1 << bits)) - 1)
+
+    def _avaliar_bloco(self, indice, bits):
+        if self.podar:
+            return self._avaliar_podado(indice, bits)
+        mascara = None
+        if self.bitparalelo:
+            mascara = self._avaliar_vetores(indice, bits)
+        if mascara is None:
+            mascara = _mascara_de_lista(self._avaliar_linhas(indice, bits))
+        return mascara
 
     def calcular_tabela_verdade(self):
-        def recursivo(self, valores):
-            assert len(valores) <= self.nvars
+        """Calcula e guarda a tabela verdade em .tbverdade e .tbmascara."""
+        if self.nvars <= 0:
+            self._tbmascara = 0
+        else:
+            self._tbmascara = self._avaliar_bloco(0, self.nvars)
+        self._tbverdade = TabelaVerdade(self._tbmascara, self._nlinhas())
+
+    def blocos(self, bits=None):
+        """Gera a tabela verdade em blocos de 2**bits linhas.
+
+        Cada bloco é uma tupla (primeira_linha, nlinhas, mascara), na qual
+        mascara é um inteiro com um bit por linha do bloco.
 
-            if len(valores) == self.nvars:
-                #self.tbverdade.append((valores, self.expr(*valores)))
-                self.tbverdade.append(self.expr(*valores))
+        Se a tabela verdade não estiver guardada na memória, cada bloco é
+        calculado apenas quando for pedido.
+        """
+        if self.nvars <= 0:
+            return
+        if bits is None:
+            bits = self.bits_por_bloco
+        bits = min(bits, self.nvars)
+        nlinhas = 1 << bits
+        completa = (1 << nlinhas) - 1
+
+        for indice in range(1 << (self.nvars - bits)):
+            primeira = indice << bits
+            if self._tbmascara is not None:
+                mascara = (self._tbmascara >> primeira) & completa
+            else:
+                mascara = self._avaliar_bloco(indice, bits)
+            yield (primeira, nlinhas, mascara)
+
+    def _blocos_sob_demanda(self):
+        """Parecido com .blocos(), mas cada linha que precisa ser avaliada
+        individualmente vira um bloco de uma linha só, e os blocos só são
+        calculados quando pedidos. Serve para parar a busca na primeira
+        linha que interessa.
+        """
+        if self._tbmascara is not None or self.nvars <= 0:
+            for bloco in self.blocos():
+                yield bloco
+            return
+
+        bits = min(self.bits_por_bloco, self.nvars)
+        nblocos = 1 << (self.nvars - bits)
+        for indice in range(nblocos):
+            primeira = indice << bits
+            mascara = None
+            if self.podar:
+                mascara = self._avaliar_podado(indice, bits)
+            elif self.bitparalelo:
+                mascara = self._avaliar_vetores(indice, bits)
+            if mascara is not None:
+                if nblocos == 1 and self.materializar:
+                    # This block is the whole truth table, keeping it.
+                    self._tbmascara = mascara
+                yield (primeira, 1 << bits, mascara)
             else:
-                recursivo(self,valores + [Verdadeiro])
-                recursivo(self,valores + [Falso])
+                prefixo = self._valores_externos(indice, bits)
+                linhas = itertools.product((Verdadeiro, Falso), repeat=bits)
+                for j, valores in enumerate(linhas):
+                    valor = self.expr(*(prefixo + list(valores)))
+                    yield (primeira + j, 1, 1 if valor else 0)
+
+    def _procurar_linha(self, valor):
+        """Retorna o número da primeira linha da tabela verdade em que a
+        fórmula tem o valor indicado, ou None se não houver."""
+        for primeira, nlinhas, mascara in self._blocos_sob_demanda():
+            if not valor:
+                mascara = ~ mascara & ((1 << nlinhas) - 1)
+            if mascara:
+                return primeira + _bit_mais_baixo(mascara)
+        return None
+
+    def _primeira_diferenca(self, other):
+        """Retorna o número da primeira linha em que as tabelas verdade das
+        duas fórmulas diferem, ou None se forem iguais.
+
+        Os blocos das duas fórmulas podem ter tamanhos diferentes.
+        """
+        assert self.nvars == other.nvars
+        if self._tbmascara is not None and other._tbmascara is not None:
+            diferenca = self._tbmascara ^ other._tbmascara
+            if diferenca:
+                return _bit_mais_baixo(diferenca)
+            return None
+
+        blocos_a = self._blocos_sob_demanda()
+        blocos_b = other._blocos_sob_demanda()
+        inicio_a = fim_a = inicio_b = fim_b = 0
+        mascara_a = mascara_b = 0
+
+        linha = 0
+        total = self._nlinhas()
+        while linha < total:
+            if linha == fim_a:
+                inicio_a, n, mascara_a = next(blocos_a)
+                fim_a = inicio_a + n
+            if linha == fim_b:
+                inicio_b, n, mascara_b = next(blocos_b)
+                fim_b = inicio_b + n
+            fim = min(fim_a, fim_b)
+            diferenca = (
+                (mascara_a >> (linha - inicio_a)) ^ (mascara_b >> (linha - inicio_b))
+            ) & ((1 << (fim - linha)) - 1)
+            if diferenca:
+                return linha + _bit_mais_baixo(diferenca)
+            linha = fim
+        return None
+
+    def valoracao(self, linha):
+        """Retorna a tupla de valores das variáveis na linha indicada da
+        tabela verdade, na mesma ordem dos argumentos da função.
+
+        >>> Formula(lambda A,B: A & B, 2).valoracao(2)
+        (Falso, Verdadeiro)
+        """
+        return tuple(
+            Falso if (linha >> (self.nvars - 1 - i)) & 1 else Verdadeiro
+            for i in range(self.nvars)
+        )
 
-        self.tbverdade = []
-        if self.nvars > 0:
-            recursivo(self, [])
+    def _clausulas(self, negar, primeira_auxiliar):
+        """Retorna as cláusulas (no formato do ResolvedorSAT) da expressão,
+        ou da sua negação, usando a transformação de Tseitin.
+
+        O símbolo self.simbolos[i] é a variável i + 1. As variáveis
+        auxiliares são numeradas a partir de primeira_auxiliar.
+        """
+        e = self.expressao
+        if negar:
+            e = ExpressaoNot(e)
+        indices = dict((s, self.tabela.id(s) + 1) for s in self.tabela)
+        clausulas = _tseitin(e, indices)
+
+        # Renumbering the auxiliary variables, so that the clauses of
+        # different formulas can be combined.
+        deslocamento = primeira_auxiliar - (self.nvars + 1)
+        if deslocamento:
+            for c in clausulas:
+                for i, x in enumerate(c):
+                    if abs(x) > self.nvars:
+                        c[i] = x + deslocamento if x > 0 else x - deslocamento
+        return clausulas
+
+    def _resolver_sat(self, *partes):
+        """Procura, com o ResolvedorSAT, uma valoração que satisfaça todas
+        as partes ao mesmo tempo. Cada parte é uma tupla (formula, negar).
+
+        As fórmulas são combinadas pela posição das variáveis, como na
+        comparação das tabelas verdade.
+        """
+        resolvedor = ResolvedorSAT(nvars=self.nvars)
+        for formula, negar in partes:
+            for clausula in formula._clausulas(negar, resolvedor.nvars + 1):
+                resolvedor.adicionar_clausula(clausula)
+        modelo = resolvedor.resolver()
+        if modelo is None:
+            return None
+        return tuple(
+            Verdadeiro if modelo[i] > 0 else Falso
+            for i in range(self.nvars)
+        )
+
+    def exemplo(self):
+        """Retorna a primeira valoração (veja .valoracao()) que torna a
+        fórmula verdadeira, ou None se ela for uma contradição.
+
+        A busca para assim que encontrar uma linha verdadeira. Se .usar_sat
+        for verdadeiro, retorna a valoração encontrada pelo ResolvedorSAT,
+        que não é necessariamente a primeira.
+        """
+        if self.bdd is not None:
+            return self.bdd.exemplo(self._chaves_bdd())
+        if self.usar_sat:
+            return self._resolver_sat((self, False))
+        linha = self._procurar_linha(Verdadeiro)
+        if linha is None:
+            return None
+        return self.valoracao(linha)
+
+    def contraexemplo(self):
+        """Retorna a primeira valoração (veja .valoracao()) que torna a
+        fórmula falsa, ou None se ela for uma tautologia.
+
+        A busca para assim que encontrar uma linha falsa. Se .usar_sat for
+        verdadeiro, retorna a valoração encontrada pelo ResolvedorSAT, que não
+        é necessariamente a primeira.
+
+        >>> Formula(lambda A,B: A > B, 2).contraexemplo()
+        (Verdadeiro, Falso)
+        """
+        if self.bdd is not None:
+            return (~ self.bdd).exemplo(self._chaves_bdd())
+        if self.usar_sat:
+            return self._resolver_sat((self, True))
+        linha = self._procurar_linha(Falso)
+        if linha is None:
+            return None
+        return self.valoracao(linha)
+
+    def diferenca(self, other):
+        """Retorna a primeira valoração (veja .valoracao()) na qual as duas
+        fórmulas têm valores diferentes, ou None se forem equivalentes.
+
+        As duas fórmulas devem ter a mesma quantidade de variáveis. Se as
+        duas usarem o ResolvedorSAT (veja .usar_sat), a valoração retornada
+        não é necessariamente a primeira.
+
+        >>> f = Formula(lambda A,B: A | B, 2)
+        >>> f.diferenca(Formula(lambda A,B: A ^ B, 2))
+        (Verdadeiro, Verdadeiro)
+        >>> f.diferenca(Formula(lambda A,B: ~(~A & ~B), 2)) is None
+        True
+        """
+        assert self.nvars == other.nvars
+        if self.bdd is not None and other.bdd is not None:
+            return (self.bdd ^ self._bdd_de(other)).exemplo(self._chaves_bdd())
+        if self.usar_sat and other.usar_sat:
+            valoracao = self._resolver_sat((self, False), (other, True))
+            if valoracao is None:
+                valoracao = self._resolver_sat((self, True), (other, False))
+            return valoracao
+        linha = self._primeira_diferenca(other)
+        if linha is None:
+            return None
+        return self.valoracao(linha)
+
+    def linhas(self):
+        """Gera os valores da tabela verdade, um por linha."""
+        for _, nlinhas, mascara in self.blocos():
+            for valor in _lista_de_mascara(mascara, nlinhas):
+                yield valor
+
+    def contar_verdadeiros(self):
+        """Retorna a quantidade de linhas verdadeiras da tabela verdade."""
+        if self.bdd is not None:
+            return self.bdd.contar_verdadeiros(self._chaves_bdd())
+        return sum(
+            _contar_bits(mascara) for _, _, mascara in self._blocos_sob_demanda()
+        )
 
     def tautologia(self):
         """Retorna Verdadeiro se a fórmula é uma tautologia.
         
-        Uma fórmula é tautologia se, e somente se, a tabela verdade é sempre verdadeira."""
-        if (self.tbverdade.count(Falso) + self.tbverdade.count(False)) == 0:
-            return Verdadeiro
-        else:
-            return Falso
+        Uma fórmula é tautologia se, e somente se, a tabela verdade é sempre verdadeira.
+
+        Veja também .contraexemplo()."""
+        if self.bdd is not None:
+            return self.bdd.tautologia()
+        if self._tbmascara is not None:
+            return Booleano(self._tbmascara == (1 << self._nlinhas()) - 1)
+        return Booleano(self.contraexemplo() is None)
 
     def contradicao(self):
         """Retorna Verdadeiro se a fórmula é uma contradição.
         
-        Uma fórmula é contradição se, e somente se, a tabela verdade é sempre falsa."""
-        if (self.tbverdade.count(Verdadeiro) + self.tbverdade.count(True)) == 0:
-            return Verdadeiro
+        Uma fórmula é contradição se, e somente se, a tabela verdade é sempre falsa.
+
+        Veja também .exemplo()."""
+        if self.bdd is not None:
+            return self.bdd.contradicao()
+        if self._tbmascara is not None:
+            return Booleano(self._tbmascara == 0)
+        return Booleano(self.exemplo() is None)
+
+    def minimizar(self, conjuntiva=False, exato=None, nomes=None):
+        """Retorna uma Expressao equivalente à fórmula, como uma soma de
+        produtos (forma normal disjuntiva) com a menor quantidade de termos
+        e, entre essas, de literais.
+
+        Se conjuntiva for verdadeiro, retorna um produto de somas (forma
+        normal conjuntiva), obtido minimizando a negação da fórmula.
+
+        Se exato for verdadeiro, usa o método de Quine-McCluskey, que sempre
+        encontra a menor expressão, mas cujo custo cresce exponencialmente
+        com a quantidade de variáveis. Caso contrário, usa uma heurística no
+        estilo do Espresso, que encontra uma expressão próxima da menor.
+        Por padrão, o método exato é usado nas fórmulas com até
+        .limite_exato variáveis.
+
+        nomes é a lista com o nome de cada variável. Por padrão, são usados
+        os símbolos da Expressao ou os nomes dos argumentos da função.
+
+        >>> f = Formula(lambda A,B,C: (A & B) | (A & ~B & C) | (~A & B & C), 3)
+        >>> str(f.minimizar())
+        '(((A & B) | (A & C) | (B & C)))'
+        >>> str(f.minimizar(conjuntiva=True))
+        '(((A | B) & (A | C) & (B | C)))'
+
+        Uma tautologia vira (A | ~ A), e uma contradição, (A & ~ A).
+        """
+        if self.nvars <= 0:
+            raise ValueError("a fórmula não tem variáveis")
+        if exato is None:
+            exato = self.nvars <= self.limite_exato
+        if nomes is None:
+            nomes = self.simbolos
+        if nomes is None:
+            codigo = getattr(self.expr, "__code__", None)
+            if codigo is not None and codigo.co_argcount == self.nvars:
+                nomes = codigo.co_varnames[:self.nvars]
+            else:
+                nomes = ["x%d" % (i + 1) for i in range(self.nvars)]
+
+        on = self.tbmascara
+        if on is None:
+            on = 0
+            for primeira, nlinhas, mascara in self.blocos():
+                on |= mascara << primeira
+        if conjuntiva:
+            # The clauses are the negations of the terms of the negation.
+            on = ((1 << self._nlinhas()) - 1) & ~ on
+        if exato:
+            cubos = _cobertura_exata(on, self.nvars)
         else:
-            return Falso
+            cubos = _cobertura_heuristica(on, self.nvars)
+
+        simbolos = [ExpressaoSimbolo(nome) for nome in nomes]
+        negacoes = [ExpressaoNot(simbolo) for simbolo in simbolos]
+        if not cubos or cubos == [(0, (1 << self.nvars) - 1)]:
+            # Constant: there are no terms, or a term without literals.
+            tautologia = bool(cubos) != conjuntiva
+            operacao = ExpressaoOr if tautologia else ExpressaoAnd
+            return Expressao(operacao(simbolos[0], negacoes[0]))
+
+        termos = []
+        for valor, livres in cubos:
+            # Sorting by the literals of each variable: positive, negative
+            # or absent.
+            chave = []
+            termo = []
+            for i in range(self.nvars):
+                bit = 1 << (self.nvars - 1 - i)
+                if livres & bit:
+                    chave.append(2)
+                    continue
+                # In the truth table, a zero bit means Verdadeiro.
+                positivo = (not valor & bit) != conjuntiva
+                chave.append(0 if positivo else 1)
+                termo.append(simbolos[i] if positivo else negacoes[i])
+            termos.append((chave, tuple(termo)))
+        termos = [termo for chave, termo in sorted(termos)]
+        return Expressao(_expressao_da_forma_normal(termos, not conjuntiva))
+
+
+
+
+
+# Interned expressions (see Expressao.internar()), indexed by their class
+# and children (or name, for symbols).
+_expressoes_internadas = weakref.WeakValueDictionary()
 
 
+class _ExpressaoGrande(Exception):
+    """Interrompe os percursos recursivos de Expressao (como
+    ._eval_recursivo()) em uma expressão grande."""
+
+
+class _Pais(dict):
+    """Pais de um nó com mais de um pai (veja Expressao._registrar_pai()):
+    associa o id() da referência fraca de cada pai à referência.
+
+    As referências ficam guardadas, então os ids não são reusados. As
+    referências mortas são removidas quando o dict passa de .limite.
+    """
+
+    __slots__ = ("limite", )
+
+
+class _Guardados(object):
+    """Dados calculados e guardados em um nó de Expressao: as chaves, o
+    conjunto e a tabela de símbolos, a função compilada e os pais (veja
+    Expressao._registrar_pai()). A maioria dos nós nunca precisa deles, então
+    eles ficam fora do nó, em um objeto criado no primeiro uso (veja
+    Expressao._guardados()).
+    """
 
+    __slots__ = ("chave_hash", "chave_ordenacao", "simbolos", "tabela", "compilado", "pais")
+
+    internado = False
+
+    def __init__(self):
+        self.chave_hash = None
+        self.chave_ordenacao = None
+        self.simbolos = None
+        self.tabela = None
+        self.compilado = None
+        self.pais = None
+
+
+class _GuardadosInternados(_Guardados):
+    """Dados guardados em um nó internado (veja Expressao.internar()), cuja
+    chave_hash é calculada quando o nó é internado. Os símbolos internados
+    não podem ser renomeados, então os dados nunca ficam velhos."""
+
+    __slots__ = ()
+
+    internado = True
+
+
+# Slots of Expressao left out of copies and pickles (see
+# Expressao.__getstate__()).
+_atributos_nao_copiados = ("_guardado", "__weakref__")
+
+
+def _internar_se(e, *operandos):
+    """Interna a expressão e criada por um operador se todos os operandos
+    forem expressões internadas.
+
+    Os operadores só chamam esta função se o seu primeiro operando for
+    internado, então as expressões que não são internadas não pagam por ela.
+    """
+    for o in operandos:
+        if not getattr(o, "internado", False):
+            return e
+    return e.internar()
+
+
+class TabelaSimbolos(object):
+    """Tabela dos símbolos de uma expressão (veja
+    Expressao.tabela_simbolos()), que associa cada nome a um número denso
+    (0, 1, 2, ...), na ordem de sorted().
+
+    >>> t = TabelaSimbolos(['x_1', 'P10'])
+    >>> t.id('P10'), t.id('x_1')
+    (0, 1)
+    >>> t.nome(1)
+    'x_1'
+    >>> list(t)
+    ['P10', 'x_1']
+
+    É a ordem das variáveis de Formula, dos argumentos de
+    Expressao.compilar() e das colunas de Expressao.avaliar_lote(). A tabela
+    não é modificada depois de criada.
+    """
+
+    __slots__ = ("_nomes", "_ids")
+
+    def __init__(self, nomes):
+        self._nomes = sorted(nomes)
+        self._ids = dict((nome, i) for i, nome in enumerate(self._nomes))
+
+    def id(self, nome):
+        """Retorna o número do nome; um nome que não está na tabela gera
+        KeyError."""
+        return self._ids[nome]
+
+    def nome(self, i):
+        """Retorna o nome de número i."""
+        return self._nomes[i]
+
+    def __len__(self):
+        return len(self._nomes)
+
+    def __contains__(self, nome):
+        return nome in self._ids
+
+    def __iter__(self):
+        return iter(self._nomes)
 
 
 class Expressao(object):
@@ -316,44 +1995,364 @@ class Expressao(object):
 
     A idéia desta classe e suas derivadas é permitir representar e manipular
     uma expressão lógica.
+
+    Os nós usam __slots__, sem __dict__, e os filhos ficam em uma tupla:
+    para modificar a árvore, atribua uma nova sequência a .children.
     """
 
+    # The weak references are used by the interned expressions and by
+    # ._registrar_pai().
+    __slots__ = ("_children", "_guardado", "__weakref__")
+
     is_symbol = False
     is_not = False
     is_and = False
     is_or  = False
     operator_str = " "
 
-    def __init__(self, child):
-        self.children = [child]
+    def __init__(self, child):
+        # A new node has no keys to invalidate, so the constructors skip the
+        # checks of the .children setter.
+        self._children = (child, )
+        self._guardado = None
+
+    @property
+    def children(self):
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        if self.internado:
+            raise AttributeError("uma expressão internada não pode ser modificada")
+        antigos = self._children
+        self._children = tuple(children)
+        if antigos:
+            # This node no longer depends on the children it lost.
+            novos = set(id(f) for f in self._children)
+            for f in antigos:
+                if id(f) not in novos and isinstance(f, Expressao):
+                    f._remover_pai(self)
+        if self._guardado is not None:
+            self._invalidar()
+
+    def _guardados(self, criar=True):
+        """Retorna os dados guardados neste nó (veja _Guardados), criando-os
+        no primeiro uso se criar for verdadeiro; senão retorna None.
+
+        Um nó que só precisa guardar os seus pais (veja ._registrar_pai())
+        os guarda diretamente em ._guardado, sem criar um _Guardados.
+        """
+        guardados = self._guardado
+        if isinstance(guardados, _Guardados):
+            return guardados
+        if not criar:
+            return None
+        pais = guardados
+        guardados = self._guardado = _Guardados()
+        guardados.pais = pais
+        return guardados
+
+    def _pais(self):
+        """Retorna os pais registrados com ._registrar_pai(): None, uma
+        referência fraca ou um _Pais."""
+        guardados = self._guardado
+        if isinstance(guardados, _Guardados):
+            return guardados.pais
+        return guardados
+
+    def _trocar_pais(self, pais):
+        guardados = self._guardado
+        if isinstance(guardados, _Guardados):
+            guardados.pais = pais
+        else:
+            self._guardado = pais
+
+    def _registrar_pai(self, pai):
+        """Registra que pai guardou (ou ajudou a calcular) uma chave que
+        depende deste nó, para que ._invalidar() apague a chave de pai
+        quando este nó for modificado (ou, se for um símbolo, renomeado).
+
+        Os pais são guardados como referências fracas, então não impedem que
+        sejam liberados. As expressões internadas não são modificadas e não
+        guardam os seus pais.
+        """
+        if self.internado:
+            return
+        # Without a callback, weakref.ref() returns the same reference while
+        # it exists, so its id identifies the parent, and all the children
+        # of a parent share one reference.
+        ref = weakref.ref(pai)
+        pais = self._pais()
+        if pais is None or pais is ref:
+            self._trocar_pais(ref)
+        elif not isinstance(pais, _Pais):
+            if pais() is None:
+                self._trocar_pais(ref)
+            else:
+                pais = _Pais(((id(pais), pais), (id(ref), ref)))
+                pais.limite = 8
+                self._trocar_pais(pais)
+        elif id(ref) not in pais:
+            if len(pais) >= pais.limite:
+                for chave, r in list(pais.items()):
+                    if r() is None:
+                        del pais[chave]
+                pais.limite = max(8, 2 * len(pais))
+            pais[id(ref)] = ref
+
+    def _remover_pai(self, pai):
+        """Desfaz ._registrar_pai(pai)."""
+        pais = self._pais()
+        if pais is None:
+            return
+        ref = weakref.ref(pai)
+        if pais is ref:
+            self._trocar_pais(None)
+        elif isinstance(pais, _Pais):
+            pais.pop(id(ref), None)
+
+    def _invalidar(self):
+        """Apaga os dados guardados neste nó e nos seus ancestrais (os nós
+        registrados com ._registrar_pai()), que dependem dele. Os dados das
+        outras expressões continuam válidos."""
+        vistos = set()
+        pilha = [self]
+        while pilha:
+            e = pilha.pop()
+            if id(e) in vistos:
+                continue
+            vistos.add(id(e))
+            if e.internado:
+                continue
+            pais = e._pais()
+            # The parents register again when they recompute their keys.
+            e._guardado = None
+            if pais is None:
+                continue
+            for ref in (pais.values() if isinstance(pais, _Pais) else (pais, )):
+                p = ref()
+                if p is not None:
+                    pilha.append(p)
+
+    @property
+    def internado(self):
+        """Veja .internar()."""
+        return self._guardado.__class__ is _GuardadosInternados
+
+    def __getstate__(self):
+        # Copies (and pickles) of an interned expression are not interned.
+        # The sort keys depend on hash(), which changes between processes.
+        estado = {}
+        for cls in self.__class__.__mro__:
+            for atributo in cls.__dict__.get("__slots__", ()):
+                if atributo in _atributos_nao_copiados:
+                    continue
+                if hasattr(self, atributo):
+                    estado[atributo] = getattr(self, atributo)
+        estado.update(getattr(self, "__dict__", {}))
+        return estado
+
+    def __setstate__(self, estado):
+        # Copies and unpickled expressions skip __init__(), and slots have no
+        # class-level defaults.
+        self._children = ()
+        self._guardado = None
+        for atributo, valor in estado.items():
+            object.__setattr__(self, atributo, valor)
+
+    def __copy__(self):
+        # A shallow copy shares the children, as before __reduce_ex__().
+        e = self.__class__.__new__(self.__class__)
+        e.__setstate__(self.__getstate__())
+        return e
+
+    def __reduce_ex__(self, protocolo):
+        # pickle and copy.deepcopy() use the binary format, which has no
+        # recursion and keeps the shared subexpressions shared. Trees that
+        # the format can't hold use the default reduction.
+        try:
+            dados = self.serializar()
+        except (TypeError, OverflowError):
+            return object.__reduce_ex__(self, protocolo)
+        return (_desserializar, (dados, ))
+
+    def serializar(self):
+        """Retorna a expressão em um formato binário compacto (bytes), que
+        pode ser lido de volta com Expressao.desserializar().
+
+        O formato tem uma tabela com o nome de cada símbolo e a árvore em
+        pós-ordem, um inteiro por nó. Subexpressões compartilhadas (o mesmo
+        objeto em vários lugares da árvore) são escritas uma única vez. Só os
+        nós Expressao, ExpressaoSimbolo, ExpressaoNot, ExpressaoAnd e
+        ExpressaoOr, e símbolos cujo nome é um texto (str), são suportados;
+        o resto gera TypeError. Uma expressão grande demais para os inteiros
+        de 4 bytes do formato gera OverflowError.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> e = Expressao((A & ~ A) | ExpressaoSimbolo('B'))
+        >>> Expressao.desserializar(e.serializar()) == e
+        True
+        """
+        return _serializar(self)
+
+    @staticmethod
+    def desserializar(dados):
+        """Lê uma expressão escrita por .serializar(). dados pode ser um
+        bytes, um bytearray ou um memoryview; a árvore é lida diretamente de
+        dados, sem copiá-los. Dados inválidos geram ValueError.
+        """
+        return _desserializar(dados)
 
     def __repr__(self):
-        return "%s(%s)" % (self.__class__.__name__, ', '.join(repr(x) for x in self.children))
+        # Small trees are written recursively, like in .eval(). The
+        # recursion gives up after visiting limite_escrever_recursivo
+        # operation nodes, so deep trees are written by ._escrever().
+        try:
+            return self._repr_recursivo([self.limite_escrever_recursivo])
+        except (_ExpressaoGrande, _ErroDeRecursao):
+            return self._escrever(lambda e: e._partes_repr())
+
+    def _repr_recursivo(self, restantes):
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        return "%s(%s)" % (self.__class__.__name__, ", ".join([f._repr_recursivo(restantes) for f in self._children]))
+
+    def _partes_repr(self):
+        return ("%s(" % (self.__class__.__name__, ), ", ", ")")
 
     def __str__(self):
-        return "(%s)" % (self.operator_str.join(str(x) for x in self.children), )
+        # See .__repr__().
+        try:
+            return self._str_recursivo([self.limite_escrever_recursivo])
+        except (_ExpressaoGrande, _ErroDeRecursao):
+            return self._escrever(lambda e: e._partes_str())
+
+    # See .__repr__().
+    limite_escrever_recursivo = 200
+
+    def _str_recursivo(self, restantes):
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        return "(%s)" % (self.operator_str.join([f._str_recursivo(restantes) for f in self._children]), )
+
+    def _partes_str(self):
+        return ("(", self.operator_str, ")")
+
+    def _escrever(self, partes):
+        """Monta o texto da expressão sem recursão. partes(e) retorna o
+        texto escrito antes dos filhos do nó e, entre eles e depois deles."""
+        saida = []
+        pilha = [self]
+        while pilha:
+            e = pilha.pop()
+            if not isinstance(e, Expressao):
+                # Text waiting to be written after the children
+                saida.append(e)
+                continue
+            inicio, separador, fim = partes(e)
+            saida.append(inicio)
+            pilha.append(fim)
+            for i, f in enumerate(reversed(e.children)):
+                if i > 0:
+                    pilha.append(separador)
+                pilha.append(f)
+        return "".join(saida)
+
+    def _pos_ordem(self):
+        """Retorna a lista dos nós desta expressão em pós-ordem (os filhos
+        antes dos pais), sem recursão.
+
+        Cada nó aparece uma única vez, mesmo que seja compartilhado por
+        várias partes da expressão.
+        """
+        nos = []
+        # Maps id(node) to the node; keeping the nodes alive keeps the ids
+        # unique.
+        visitados = {}
+        pilha = [(self, False)]
+        while pilha:
+            e, visitado = pilha.pop()
+            if visitado:
+                nos.append(e)
+            elif id(e) not in visitados:
+                visitados[id(e)] = e
+                pilha.append((e, True))
+                for f in reversed(e.children):
+                    pilha.append((f, False))
+        return nos
+
+    def _pre_ordem(self, passo, uma_vez=True):
+        """Chama passo(e) para cada nó e desta expressão, sem recursão, antes
+        de visitar os filhos de e (que podem ter sido trocados pelo passo).
+        Os símbolos não são visitados.
+
+        Se uma_vez for verdadeiro, cada nó é visitado uma única vez, mesmo
+        que seja compartilhado por várias partes da expressão; senão, é
+        visitado uma vez em cada parte.
+        """
+        visitados = {}
+        pilha = [self]
+        while pilha:
+            e = pilha.pop()
+            if e.is_symbol or id(e) in visitados:
+                continue
+            if uma_vez:
+                visitados[id(e)] = e
+            passo(e)
+            pilha.extend(reversed(e.children))
+
+    def _calcular(self, funcao, nos=None):
+        """Calcula funcao(e, filhos) para cada nó e, sendo filhos a lista dos
+        resultados já calculados para os filhos de e, e retorna o resultado
+        desta expressão. Não usa recursão, e cada nó compartilhado é
+        calculado uma única vez.
+
+        Quem calcula várias vezes sobre a mesma árvore pode passar em nos o
+        resultado de ._pos_ordem(), para não percorrê-la a cada vez.
+        """
+        if nos is None:
+            nos = self._pos_ordem()
+        resultados = {}
+        for e in nos:
+            resultados[id(e)] = funcao(e, [resultados[id(f)] for f in e.children])
+        return resultados[id(self)]
 
     def __and__(self, other):
         # This is the bitwise & operator
-        return ExpressaoAnd(self, other)
+        e = ExpressaoAnd(self, other)
+        # Only nodes with stored data can be interned.
+        if self._guardado is not None:
+            return _internar_se(e, self, other)
+        return e
     __rand__ = __and__
 
     def __or__(self, other):
         # This is the bitwise | operator
-        return ExpressaoOr(self, other)
+        e = ExpressaoOr(self, other)
+        if self._guardado is not None:
+            return _internar_se(e, self, other)
+        return e
     __ror__ = __or__
 
     def __xor__(self, other):
         # This is the bitwise ^ operator
-        return ExpressaoOr(
+        e = ExpressaoOr(
             ExpressaoAnd(ExpressaoNot(self), other),
             ExpressaoAnd(self, ExpressaoNot(other))
         )
+        if self._guardado is not None:
+            return _internar_se(e, self, other)
+        return e
     __rxor__ = __xor__
 
     def __neg__(self):
         # This is the numeric - operator
-        return ExpressaoNot(self)
+        e = ExpressaoNot(self)
+        if self._guardado is not None:
+            return _internar_se(e, self)
+        return e
     # This is the bitwise ~ operator
     __invert__ = __neg__
 
@@ -365,7 +2364,10 @@ class Expressao(object):
         """A > B  significa  "A -> B", ou seja, "A implica em B"
         É equivalente a (not A or B).
         """
-        return ExpressaoOr(ExpressaoNot(self), other)
+        e = ExpressaoOr(ExpressaoNot(self), other)
+        if self._guardado is not None:
+            return _internar_se(e, self, other)
+        return e
 
     def __eq__(self, other):
         """Compara se duas expressões são iguais.
@@ -378,34 +2380,275 @@ class Expressao(object):
           (A & B) == (A & B)
         porém:
           (A & B) != (B & A)
+
+        Se as duas expressões forem internadas, basta comparar a identidade.
         """
-        return (
-                type(self) == type(other)
-            ) and (
-                self.children == other.children
-            )
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        if self._guardado is not None and other._guardado is not None:
+            chave = self._chave_guardada("chave_hash")
+            outra = other._chave_guardada("chave_hash")
+            if chave is not None and outra is not None and chave != outra:
+                return False
+        # Small trees are compared recursively, like in .eval(). Deep trees
+        # and shared subexpressions are compared by the loop below.
+        try:
+            return self._iguais_recursivo(other, [self.limite_eq_recursivo])
+        except (_ExpressaoGrande, _ErroDeRecursao):
+            pass
+        # Comparing pairs of distinct nodes without recursion. After
+        # limite_eq_sem_vistos pairs, each pair is compared only once, so
+        # shared subexpressions are not compared again and again.
+        comparados = None
+        restantes = self.limite_eq_sem_vistos
+        pilha = [(self, other)]
+        while pilha:
+            a, b = pilha.pop()
+            if comparados is None:
+                restantes -= 1
+                if restantes < 0:
+                    comparados = set()
+            if comparados is not None:
+                if (id(a), id(b)) in comparados:
+                    continue
+                comparados.add((id(a), id(b)))
+            if type(a) != type(b) or (a.internado and b.internado):
+                return False
+            if not a._iguais_no(b) or len(a._children) != len(b._children):
+                return False
+            for f, g in zip(a._children, b._children):
+                if f is not g:
+                    if isinstance(f, Expressao):
+                        pilha.append((f, g))
+                    elif f != g:
+                        return False
+        return True
+
+    # See .__eq__().
+    limite_eq_recursivo = 200
+    limite_eq_sem_vistos = 200
+
+    def _iguais_recursivo(self, other, restantes):
+        # Distinct interned nodes always differ somewhere below, so the
+        # shortcut of the loop in .__eq__() is left out.
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        filhos = self._children
+        outros = other._children
+        if type(self) is not type(other) or len(filhos) != len(outros):
+            return False
+        # Indexing is faster than zip() for two or three children.
+        i = 0
+        for f in filhos:
+            g = outros[i]
+            i += 1
+            if f is not g:
+                if isinstance(f, Expressao):
+                    if not f._iguais_recursivo(g, restantes):
+                        return False
+                elif f != g:
+                    return False
+        return True
+
+    def _iguais_no(self, other):
+        """Compara os nós, sem comparar os filhos."""
+        return True
 
     def __ne__(self, other):
         return not (self == other)
 
-    def generate_sort_key(self, sorted_list):
-        self.sort_key = "(%s)" % (self.operator_str.join(x.sort_key for x in sorted_list), )
+    def __hash__(self):
+        """Hash estrutural, compatível com ==: expressões estruturalmente
+        iguais têm o mesmo hash.
+
+        O hash de cada nó é guardado e só é calculado de novo depois que o
+        nó ou um dos seus descendentes for modificado (veja .sort_key). Assim
+        como as chaves de um dict não devem ser modificadas, uma expressão
+        não deve ser modificada enquanto estiver em um set ou for chave de
+        um dict; as expressões internadas (veja .internar()) não podem ser
+        modificadas.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> len(set([A & B, A & B, B & A]))
+        2
+        """
+        # The interned nodes store their hash when they are interned.
+        return self._chave_em_cache("chave_hash", lambda e, filhos: e._hash_no(filhos, False))
+
+    def internar(self):
+        """Retorna uma cópia internada desta expressão.
+
+        Duas expressões internadas estruturalmente iguais são sempre o mesmo
+        objeto, então subexpressões repetidas ocupam memória uma única vez,
+        a comparação com == é feita pela identidade e o hash é calculado uma
+        única vez. Os operadores (&, |, ~, >, ^) aplicados a expressões
+        internadas também retornam expressões internadas.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> e = ((A & B) | (A & B)).internar()
+        >>> e.children[0] is e.children[1]
+        True
+        >>> e.children[0] is (A & B).internar()
+        True
+
+        As expressões internadas ficam em uma tabela de referências fracas,
+        então são liberadas quando não forem mais usadas.
+
+        Uma expressão internada não pode ser modificada: os métodos que
+        modificam a árvore (como .remover_associativas()) geram
+        AttributeError. Cópias (copy.copy(), copy.deepcopy(), pickle) não são
+        internadas.
+        """
+        if self.internado:
+            return self
+
+        # Maps id(node) to the interned node
+        internados = {}
+        pilha = [(self, False)]
+        while pilha:
+            e, visitado = pilha.pop()
+            if id(e) in internados:
+                continue
+            if e.internado:
+                internados[id(e)] = e
+            elif not visitado and e.children:
+                pilha.append((e, True))
+                for f in reversed(e.children):
+                    pilha.append((f, False))
+            else:
+                internados[id(e)] = e._internar_no([internados[id(f)] for f in e.children])
+        return internados[id(self)]
+
+    def _chave_internada(self, children):
+        return (self.__class__, ) + tuple(id(f) for f in children)
+
+    def _hash_estrutural(self, children):
+        return hash((self.__class__.__name__, ) + tuple(hash(f) for f in children))
+
+    def _internar_no(self, children):
+        """Retorna o nó internado igual a este nó, mas com os filhos
+        (já internados) indicados."""
+        # The key holds the ids of the children, which stay alive (and keep
+        # their ids) while the interned node that references them exists.
+        chave = self._chave_internada(children)
+        e = _expressoes_internadas.get(chave)
+        if e is None:
+            e = copy.copy(self)
+            e.children = children
+            e._guardado = _GuardadosInternados()
+            e._guardado.chave_hash = self._hash_estrutural(children)
+            _expressoes_internadas[chave] = e
+        return e
+
+    @property
+    def sort_key(self):
+        """Chave que não depende da ordem dos operandos: expressões que só
+        diferem na ordem dos operandos têm a mesma chave.
+
+        A chave é um inteiro, o hash da classe do nó e das chaves dos filhos
+        em ordem crescente. Ela é calculada no primeiro acesso e guardada em
+        cada nó, e só é calculada de novo depois que os filhos do nó ou de
+        um dos seus descendentes forem trocados (atribuindo .children), ou
+        um dos seus símbolos for renomeado; as chaves das outras expressões
+        não são afetadas.
+
+        Como a chave depende de hash(), ela só pode ser comparada com chaves
+        calculadas no mesmo processo.
+        """
+        return self._chave_em_cache("chave_ordenacao", lambda e, filhos: e._hash_no(filhos, True))
+
+    def hash_ignorando_ordem(self):
+        """Retorna um hash que ignora a ordem dos operandos: se
+        a.comparar_ignorando_ordem(b), então os dois hashes são iguais. É o
+        mesmo que .sort_key.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> (A & B).hash_ignorando_ordem() == (B & A).hash_ignorando_ordem()
+        True
+        """
+        return self.sort_key
+
+    def _chave_em_cache(self, atributo, combinar, folha=hash):
+        """Calcula uma chave para cada nó, de baixo para cima e sem
+        recursão: combinar(e, chaves_dos_filhos) retorna a chave do nó e, e
+        folha(x) retorna a chave de um filho x que não é uma Expressao.
+        Retorna a chave desta expressão.
+
+        A chave de cada nó (exceto dos símbolos, cujas chaves são baratas) é
+        guardada no atributo indicado de _Guardados, e cada nó calculado é
+        registrado nos seus filhos (veja ._registrar_pai()), para que
+        modificar um nó apague apenas as chaves que dependem dele. Apenas os
+        nós sem chave guardada são visitados.
+        """
+        chave = self._chave_guardada(atributo)
+        if chave is not None:
+            return chave
+
+        chaves = {}
+        pilha = [(self, False)]
+        while pilha:
+            e, visitado = pilha.pop()
+            if id(e) in chaves:
+                continue
+            if not isinstance(e, Expressao):
+                chaves[id(e)] = folha(e)
+                continue
+            chave = e._chave_guardada(atributo)
+            if chave is None:
+                if not visitado and e.children:
+                    pilha.append((e, True))
+                    for f in reversed(e.children):
+                        pilha.append((f, False))
+                    continue
+                chave = combinar(e, [chaves[id(f)] for f in e.children])
+                if not e.is_symbol:
+                    for f in e.children:
+                        if isinstance(f, Expressao):
+                            f._registrar_pai(e)
+                    setattr(e._guardados(), atributo, chave)
+            chaves[id(e)] = chave
+        return chaves[id(self)]
+
+    def _hash_no(self, filhos, ignorar_ordem):
+        """Hash do nó, dados os hashes dos filhos (veja .__hash__() e
+        .sort_key)."""
+        if ignorar_ordem:
+            filhos = sorted(filhos)
+        return hash((self.__class__.__name__, ) + tuple(filhos))
+
+    def _chave_guardada(self, atributo):
+        """Retorna a chave guardada no atributo de _Guardados, ou None. Veja
+        ._invalidar()."""
+        guardados = self._guardados(False)
+        if guardados is None:
+            return None
+        return getattr(guardados, atributo)
 
     def generate_sort_keys(self, recursive=True):
-        if recursive:
-            for e in self.children:
-                e.generate_sort_keys(recursive=recursive)
+        """Calcula as chaves de ordenação (veja .sort_key).
 
-        self.generate_sort_key(
-            sorted(self.children, key=lambda x: x.sort_key)
-        )
+        Não é mais necessário chamar este método: as chaves são calculadas
+        quando forem usadas.
+        """
+        self.sort_key
 
     def comparar_ignorando_ordem(self, other):
         """Compara se duas expressões são iguais, através da comparação da
         árvore das duas expressões. A ordem dos operandos será ignorada.
 
-        É necessário chamar .generate_sort_keys() antes de realizar a
-        comparação, caso contrário os resultados são indeterminados.
+        As chaves de ordenação (veja .sort_key) são comparadas primeiro, e
+        só se forem iguais as árvores são percorridas, juntando os operandos
+        de mesma chave, para confirmar que não houve colisão de hash. As
+        chaves ficam guardadas em cada nó, então comparar a mesma expressão
+        com várias outras calcula as chaves dela uma única vez, e depois de
+        modificar uma expressão só as chaves dos nós modificados e dos seus
+        ancestrais são calculadas de novo.
 
         >>> A = ExpressaoSimbolo('A')
         >>> B = ExpressaoSimbolo('B')
@@ -413,23 +2656,281 @@ class Expressao(object):
         >>> f = B & A
         >>> e == f
         False
-        >>> e.generate_sort_keys()
-        >>> f.generate_sort_keys()
         >>> e.comparar_ignorando_ordem(f)
         True
         """
-        return self.sort_key == other.sort_key
+        if self.sort_key != other.sort_key:
+            return False
+
+        # The keys of the children were stored along with the parents'.
+        chave = lambda f: f.sort_key
+        comparados = set()
+        pilha = [(self, other)]
+        while pilha:
+            a, b = pilha.pop()
+            if a is b or (id(a), id(b)) in comparados:
+                continue
+            comparados.add((id(a), id(b)))
+            if type(a) != type(b) or not a._iguais_no(b):
+                return False
+            if len(a.children) != len(b.children):
+                return False
+            pilha.extend(zip(
+                sorted(a.children, key=chave),
+                sorted(b.children, key=chave),
+            ))
+        return True
 
     def simbolos(self):
-        """Retorna um set() com os símbolos proposicionais presentes nesta expressão."""
-        l = set()
-        for e in self.children:
-            l.update(e.simbolos())
-        return l
+        """Retorna um set() com os símbolos proposicionais presentes nesta expressão.
+
+        >>> Expressao(ExpressaoSimbolo('P10') & ~ ExpressaoSimbolo('x_1')).simbolos() == set(['P10', 'x_1'])
+        True
+        """
+        return set(self._conjunto_simbolos())
+
+    def tabela_simbolos(self):
+        """Retorna a TabelaSimbolos desta expressão, que numera os seus
+        símbolos na ordem de sorted(self.simbolos()).
+
+        >>> e = Expressao(ExpressaoSimbolo('x_1') & ~ ExpressaoSimbolo('P10'))
+        >>> e.tabela_simbolos().id('x_1')
+        1
+
+        A tabela fica guardada nesta expressão, junto com o conjunto de
+        .simbolos(), até que a expressão seja modificada.
+        """
+        guardados = self._guardados(False)
+        if guardados is not None and guardados.tabela is not None:
+            return guardados.tabela
+        # ._conjunto_simbolos() stores the set in ._guardados(), and changing
+        # the tree clears the table along with it.
+        tabela = TabelaSimbolos(self._conjunto_simbolos())
+        self._guardados().tabela = tabela
+        return tabela
+
+    def _conjunto_simbolos(self):
+        """Retorna o frozenset dos nomes dos símbolos desta expressão.
+
+        O conjunto é guardado apenas nesta expressão, e os conjuntos já
+        guardados nas subexpressões são reaproveitados, até que a árvore seja
+        modificada (veja ._invalidar()). Guardar um conjunto em cada nó
+        ocuparia memória proporcional ao número de nós vezes o de símbolos.
+        """
+        guardados = self._guardados(False)
+        if guardados is not None and guardados.simbolos is not None:
+            return guardados.simbolos
+
+        nomes = set()
+        vistos = set()
+        pilha = [self]
+        while pilha:
+            e = pilha.pop()
+            if id(e) in vistos:
+                continue
+            vistos.add(id(e))
+            if e.is_symbol:
+                nomes.add(e.name)
+                continue
+            guardado = e._chave_guardada("simbolos")
+            if guardado is not None:
+                nomes.update(guardado)
+                continue
+            # The nodes along the way don't store a set, but changing them
+            # (or renaming a symbol) must still reach the one stored here.
+            for f in e.children:
+                if isinstance(f, Expressao):
+                    f._registrar_pai(e)
+                    pilha.append(f)
+        guardado = self._guardados().simbolos = frozenset(nomes)
+        return guardado
 
     def eval(self, valores):
         """Avalia a expressão, retornando o valor da expressão dados os valores dos símbolos passados."""
-        return self.children[0].eval(valores)
+        # Small trees are evaluated recursively, which is several times
+        # faster than building the post-order of ._calcular(). The recursion
+        # gives up after visiting limite_eval_recursivo operation nodes, so
+        # deep trees and shared subexpressions use ._calcular() instead.
+        try:
+            return self._eval_recursivo(valores, [self.limite_eval_recursivo])
+        except (_ExpressaoGrande, _ErroDeRecursao):
+            return self._calcular(lambda e, filhos: e._eval_no(valores, filhos))
+
+    # See .eval().
+    limite_eval_recursivo = 200
+
+    def _eval_recursivo(self, valores, restantes):
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        return self._eval_no(valores, [f._eval_recursivo(valores, restantes) for f in self._children])
+
+    def _eval_no(self, valores, filhos):
+        return filhos[0]
+
+    def avaliar_parcial(self, valores):
+        """Avalia a expressão com lógica de três valores.
+
+        Os símbolos que não estão em valores são desconhecidos. Retorna
+        Verdadeiro ou Falso se os valores conhecidos já decidem o valor da
+        expressão, ou None se não decidem.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> (A & B).avaliar_parcial({'A': Falso})
+        Falso
+        >>> (A & B).avaliar_parcial({'A': Verdadeiro}) is None
+        True
+        >>> (A > B).avaliar_parcial({'B': Verdadeiro})
+        Verdadeiro
+        """
+        return self._calcular(lambda e, filhos: e._avaliar_parcial_no(valores, filhos))
+
+    def _avaliar_parcial_no(self, valores, filhos):
+        return filhos[0]
+
+    def simbolos_por_frequencia(self):
+        """Retorna a lista dos símbolos desta expressão, do que aparece mais
+        vezes para o que aparece menos (empates na ordem de sorted()).
+
+        É uma boa ordem para atribuir valores aos símbolos em
+        .avaliar_parcial(): os símbolos mais usados são os que mais
+        provavelmente decidem o valor da expressão.
+        """
+        # Counting how many times each node occurs, parents first; a shared
+        # node occurs once for each occurrence of each of its parents.
+        ocorrencias = {id(self): 1}
+        contagem = {}
+        for e in reversed(self._pos_ordem()):
+            n = ocorrencias[id(e)]
+            if e.is_symbol:
+                contagem[e.name] = contagem.get(e.name, 0) + n
+            for f in e.children:
+                ocorrencias[id(f)] = ocorrencias.get(id(f), 0) + n
+        return sorted(contagem, key=lambda s: (-contagem[s], s))
+
+    def compilar(self):
+        """Retorna uma função Python equivalente a esta expressão.
+
+        A função recebe um argumento posicional para cada símbolo, na ordem de
+        .tabela_simbolos(), e calcula o resultado com os operadores &, |
+        e ~, sem montar dicionários nem chamar .eval() para cada nó.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> f = (A > B).compilar()
+        >>> f(Verdadeiro, Falso)
+        Falso
+        >>> f(Falso, Falso)
+        Verdadeiro
+
+        O código gerado tem uma atribuição por operador, então não há limite
+        de profundidade. A função fica guardada neste objeto e só é compilada
+        novamente se a expressão for modificada.
+        """
+        guardados = self._guardados(False)
+        if guardados is not None and guardados.compilado is not None:
+            return guardados.compilado
+
+        # .tabela_simbolos() registers the nodes with their children, so
+        # changing the tree clears the function along with the table (see
+        # ._invalidar()).
+        fonte = self._gerar_fonte(self.tabela_simbolos())
+        namespace = {}
+        exec(compile(fonte, "<Expressao.compilar>", "exec"), namespace)
+        funcao = self._guardados().compilado = namespace["_expressao"]
+        return funcao
+
+    def _gerar_fonte(self, tabela):
+        """Gera o código fonte usado por .compilar(). O argumento do símbolo
+        de número i na tabela (uma TabelaSimbolos) é vi."""
+        argumentos = ["v%d" % i for i in range(len(tabela))]
+
+        # Maps id(node) to the local variable holding its value.
+        # Shared subexpressions are computed only once.
+        nomes = {}
+        linhas = []
+        pilha = [(self, False)]
+        while pilha:
+            e, visitado = pilha.pop()
+            if id(e) in nomes:
+                continue
+            if e.is_symbol:
+                nomes[id(e)] = argumentos[tabela.id(e.name)]
+            elif not visitado:
+                pilha.append((e, True))
+                for f in reversed(e.children):
+                    pilha.append((f, False))
+            else:
+                filhos = [nomes[id(f)] for f in e.children]
+                if e.is_not:
+                    valor = "~ %s" % (filhos[0], )
+                elif e.is_and or e.is_or:
+                    if len(filhos) == 0:
+                        # Same error eval() gives on an empty operation.
+                        raise TypeError("operação sem operandos: %r" % (e, ))
+                    # Python's compiler recurses on chains of operators, so
+                    # wide operations are split into several assignments.
+                    while len(filhos) > 64:
+                        nome = "t%d" % (len(linhas), )
+                        linhas.append("    %s = %s" % (nome, e.operator_str.join(filhos[:64])))
+                        filhos = [nome] + filhos[64:]
+                    valor = e.operator_str.join(filhos)
+                else:
+                    # Parentheses
+                    nomes[id(e)] = filhos[0]
+                    continue
+                nomes[id(e)] = "t%d" % (len(linhas), )
+                linhas.append("    %s = %s" % (nomes[id(e)], valor))
+
+        linhas.insert(0, "def _expressao(%s):" % (", ".join(argumentos), ))
+        linhas.append("    return %s" % (nomes[id(self)], ))
+        return "\n".join(linhas) + "\n"
+
+    def avaliar_lote(self, valoracoes):
+        """Avalia a expressão para várias valorações de uma só vez.
+
+        valoracoes é uma matriz booleana do NumPy (ou algo que possa ser
+        convertido em uma), com uma linha para cada valoração e uma coluna
+        para cada símbolo, na ordem de .tabela_simbolos().
+
+        Retorna um vetor booleano com o valor da expressão em cada linha. Cada
+        nó da árvore custa uma única operação sobre vetores, em vez de uma
+        chamada de .eval() por valoração.
+
+        Requer o módulo numpy.
+        """
+        if numpy is None:
+            raise ImportError("avaliar_lote() requer o módulo numpy")
+
+        valoracoes = numpy.asarray(valoracoes, dtype=bool)
+        tabela = self.tabela_simbolos()
+        assert valoracoes.ndim == 2
+        assert valoracoes.shape[1] == len(tabela)
+
+        # On boolean arrays, the &, | and ~ operators used by eval() are
+        # element-wise logical operations.
+        colunas = dict((s, valoracoes[:, tabela.id(s)]) for s in tabela)
+        return numpy.array(self.eval(colunas), dtype=bool)
+
+    def bdd(self, gerenciador=None):
+        """Retorna o BDD (veja a classe BDD) desta expressão.
+
+        Cada símbolo é a variável do gerenciador com o seu nome; por padrão,
+        é criado um novo gerenciador. Os BDDs de expressões diferentes só
+        podem ser combinados se forem do mesmo gerenciador, mas podem ser
+        comparados com .equivalente().
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> (A > B).bdd().equivalente((~ A | B).bdd())
+        Verdadeiro
+        >>> (A > B).bdd().contar_verdadeiros()
+        3
+        """
+        if gerenciador is None:
+            gerenciador = GerenciadorBDD()
+        return self.compilar()(*[gerenciador.variavel(s) for s in self.tabela_simbolos()])
 
     def formula(self):
         """Retorna uma Formula() baseada nesta Expressao."""
@@ -444,21 +2945,47 @@ class Expressao(object):
         Este método opera a partir de um objeto AND/OR.
         ExpressaoAnd(A, ExpressaoAnd(B, C)) ==> (A & B & C)
         """
-        newchildren = []
-        for e in self.children:
-            if recursive:
-                e.remover_associativas(recursive=recursive)
-
-            # self and child are both AND or OR
-            if (e.is_and or e.is_or) and (type(e) == type(self)):
-                # (A & (B & C)) ==>  (A & B & C)
-                # (A | (B | C)) ==>  (A | B | C)
-                newchildren.extend(e.children)
+        def associativa(pai, e):
+            # parent and child are both AND or OR
+            return (e.is_and or e.is_or) and (type(e) == type(pai))
 
-            else:
-                # Doing nothing
-                newchildren.append(e)
-        self.children = newchildren
+        if not recursive:
+            newchildren = []
+            for e in self.children:
+                if associativa(self, e):
+                    # (A & (B & C)) ==>  (A & B & C)
+                    # (A | (B | C)) ==>  (A | B | C)
+                    newchildren.extend(e.children)
+                else:
+                    # Doing nothing
+                    newchildren.append(e)
+            self.children = newchildren
+            return
+
+        # An operation whose parents all have its type is absorbed by them,
+        # and there is no need to modify it: only the outermost operation of
+        # each sequence is modified, receiving all the operands at once. This
+        # keeps long chains linear, and gives the same result.
+        nos = self._pos_ordem()
+        visiveis = set([id(self)])
+        for pai in nos:
+            for e in pai.children:
+                if not associativa(pai, e):
+                    visiveis.add(id(e))
+
+        # The children are handled before their parents.
+        for pai in nos:
+            if pai.is_symbol or id(pai) not in visiveis:
+                continue
+            newchildren = []
+            pilha = list(reversed(pai.children))
+            while pilha:
+                e = pilha.pop()
+                if associativa(pai, e):
+                    pilha.extend(reversed(e.children))
+                else:
+                    newchildren.append(e)
+            pai.children = newchildren
 
     def remover_duplas_negacoes(self, recursive=True, auto_remover_associativas=False):
         """Remove duplas negações.
@@ -475,33 +3002,32 @@ class Expressao(object):
           auto_remover_associativas = True:
             (A & ~ ~ (B & C)) ==> (A & B & C)
         """
-        modified = False
-        newchildren = []
-        for e in self.children:
-            # child is NOT
-            while e.is_not:
-                f = e.children[0]  # there should be only one child
-                # grandchild is also NOT
-                if f.is_not:
-                    # Removing (~ (~ A))
-                    e = f.children[0]
-                    modified = True
-                # grandchild is something else
-                else:
-                    # Doing nothing
-                    break
-            newchildren.append(e)
-        self.children = newchildren
+        def passo(pai):
+            modified = False
+            newchildren = []
+            for e in pai.children:
+                # child is NOT
+                while e.is_not:
+                    f = e.children[0]  # there should be only one child
+                    # grandchild is also NOT
+                    if f.is_not:
+                        # Removing (~ (~ A))
+                        e = f.children[0]
+                        modified = True
+                    # grandchild is something else
+                    else:
+                        # Doing nothing
+                        break
+                newchildren.append(e)
+            pai.children = newchildren
 
-        if modified and auto_remover_associativas:
-            self.remover_associativas(recursive=False)
+            if modified and auto_remover_associativas:
+                pai.remover_associativas(recursive=False)
 
         if recursive:
-            for e in self.children:
-                e.remover_duplas_negacoes(
-                    recursive=recursive,
-                    auto_remover_associativas=auto_remover_associativas
-                )
+            self._pre_ordem(passo)
+        else:
+            passo(self)
 
     def interiorizar_negacao(self, recursive=True):
         """Interioriza a negação, aplicando as leis de De Morgan.
@@ -512,34 +3038,36 @@ class Expressao(object):
         Este método opera a partir de um objeto pai em relação ao NOT.
         Expressao(~(A & B)) ==> Expressao((~A) | (~B))
         """
-        newchildren = []
-        for e in self.children:
-            # child is NOT
-            if e.is_not:
-                f = e.children[0]  # there should be only one child
-                # grandchild is AND or OR
-                if f.is_and or f.is_or:
-                    if f.is_and:
-                        new_op = ExpressaoOr
-                    elif f.is_or:
-                        new_op = ExpressaoAnd
-                    newchildren.append(
-                        new_op(
-                            *[ExpressaoNot(x) for x in f.children]
+        def passo(pai):
+            newchildren = []
+            for e in pai.children:
+                # child is NOT
+                if e.is_not:
+                    f = e.children[0]  # there should be only one child
+                    # grandchild is AND or OR
+                    if f.is_and or f.is_or:
+                        if f.is_and:
+                            new_op = ExpressaoOr
+                        elif f.is_or:
+                            new_op = ExpressaoAnd
+                        newchildren.append(
+                            new_op(
+                                *[ExpressaoNot(x) for x in f.children]
+                            )
                         )
-                    )
-                    newchildren[-1].remover_duplas_negacoes(recursive=False)
-                # grandchild is something else
+                        newchildren[-1].remover_duplas_negacoes(recursive=False)
+                    # grandchild is something else
+                    else:
+                        newchildren.append(e)
+
                 else:
                     newchildren.append(e)
-
-            else:
-                newchildren.append(e)
-        self.children = newchildren
+            pai.children = newchildren
 
         if recursive:
-            for e in self.children:
-                e.interiorizar_negacao(recursive=recursive)
+            self._pre_ordem(passo)
+        else:
+            passo(self)
 
     def interiorizar_or(self):
         """Interioriza o OR, aplicando:
@@ -552,44 +3080,195 @@ class Expressao(object):
         é recomendável executar .remover_associativas() após chamar este
         método.
         """
-        newchildren = []
-        for e in self.children:
-            # child is OR
-            if e.is_or:
-                # Looking for AND inside OR
-                for f in e.children:
-                    # grandchild is AND
-                    if f.is_and:
-                        novo_and = []
-                        for filho_do_and in f.children:
-                            # Criando um OR para cada operando do AND
-                            novo_or = []
-                            for filho_do_or in e.children:
-                                if filho_do_or == f:
-                                    novo_or.append(filho_do_and)
-                                else:
-                                    novo_or.append(filho_do_or)
-                            novo_and.append(ExpressaoOr(*novo_or))
-                        # Finally, replacing old OR by the new AND
-                        newchildren.append(ExpressaoAnd(*novo_and))
-                        break
-                # OR has no AND inside it
-                else:  # for-else
+        def passo(pai):
+            newchildren = []
+            for e in pai.children:
+                # child is OR
+                if e.is_or:
+                    # Looking for AND inside OR
+                    for f in e.children:
+                        # grandchild is AND
+                        if f.is_and:
+                            novo_and = []
+                            for filho_do_and in f.children:
+                                # Criando um OR para cada operando do AND
+                                novo_or = []
+                                for filho_do_or in e.children:
+                                    if filho_do_or == f:
+                                        novo_or.append(filho_do_and)
+                                    else:
+                                        novo_or.append(filho_do_or)
+                                novo_and.append(ExpressaoOr(*novo_or))
+                            # Finally, replacing old OR by the new AND
+                            newchildren.append(ExpressaoAnd(*novo_and))
+                            break
+                    # OR has no AND inside it
+                    else:  # for-else
+                        newchildren.append(e)
+                # child is something else
+                else:
                     newchildren.append(e)
-            # child is something else
+            pai.children = newchildren
+
+        # The new ORs share the operands of the old one, and each of them
+        # visits these operands again (which may distribute further).
+        self._pre_ordem(passo, uma_vez=False)
+
+    def transformar_em_forma_normal_conjuntiva(self, simplificar=False):
+        """Transforma em uma fórmula equivalente na forma normal conjuntiva.
+
+        (~ (A & B) | (C & D))  ==>  ((~ A | ~ B | C) & (~ A | ~ B | D))
+
+        Equivale a aplicar .remover_duplas_negacoes(),
+        .remover_associativas(), .interiorizar_negacao(), .interiorizar_or()
+        e .remover_associativas(), mas em uma única passagem, de baixo para
+        cima, que já monta cada cláusula com todos os seus literais. As
+        cláusulas ficam na mesma ordem da distribuição feita por
+        .interiorizar_or(), e o resultado está sempre na forma normal
+        conjuntiva, mesmo com ORs e ANDs alternados em vários níveis.
+
+        Se simplificar for verdadeiro, as cláusulas são simplificadas: os
+        literais repetidos, as cláusulas tautológicas (como (A | ~ A)) e as
+        cláusulas que contêm todos os literais de outra são removidos. Se o
+        objeto pai for um AND, as cláusulas de todos os filhos são
+        simplificadas juntas. Se todas as cláusulas forem tautológicas,
+        apenas a primeira é mantida, para que a fórmula não fique vazia.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> C = ExpressaoSimbolo('C')
+        >>> e = Expressao(((A & ~ B) | A) & (B | B | C))
+        >>> e.transformar_em_forma_normal_conjuntiva(simplificar=True)
+        >>> str(e)
+        '((A & (B | C)))'
+
+        Assim como os outros métodos de transformação, este método opera a
+        partir de um objeto pai.
+        """
+        self._transformar_em_forma_normal(False, simplificar)
+
+    def transformar_em_forma_normal_disjuntiva(self, simplificar=True):
+        """Transforma em uma fórmula equivalente na forma normal disjuntiva.
+
+        (~ (A | B) & (C | D))  ==>  ((~ A & ~ B & C) | (~ A & ~ B & D))
+
+        Funciona como .transformar_em_forma_normal_conjuntiva(), mas
+        distribuindo o AND sobre o OR. O resultado de cada nó é calculado uma
+        única vez, mesmo que o nó apareça em vários lugares da expressão.
+
+        Por padrão, os termos são simplificados durante a distribuição: os
+        literais repetidos, os termos contraditórios (como (A & ~ A)) e os
+        termos absorvidos por outros ((A & B) é absorvido por (A)) são
+        removidos antes de serem multiplicados pelos operandos seguintes.
+        Se o objeto pai for um OR, os termos de todos os filhos são
+        simplificados juntos. Se todos os termos forem contraditórios,
+        apenas o primeiro é mantido. Com simplificar=False, os termos ficam
+        exatamente como na distribuição.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> C = ExpressaoSimbolo('C')
+        >>> e = Expressao((A | B) & (A | C))
+        >>> e.transformar_em_forma_normal_disjuntiva(simplificar=False)
+        >>> str(e)
+        '(((A & A) | (A & C) | (B & A) | (B & C)))'
+        >>> e = Expressao((A | B) & (A | C))
+        >>> e.transformar_em_forma_normal_disjuntiva()
+        >>> str(e)
+        '((A | (B & C)))'
+
+        Assim como os outros métodos de transformação, este método opera a
+        partir de um objeto pai.
+        """
+        self._transformar_em_forma_normal(True, simplificar)
+
+    def minimizar(self, conjuntiva=False, exato=None):
+        """Retorna uma nova Expressao equivalente, mínima (ou quase mínima)
+        na forma normal disjuntiva ou, se conjuntiva for verdadeiro, na
+        forma normal conjuntiva. Veja Formula.minimizar().
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> str(Expressao((A & B) | (A & ~ B) | (~ A & B)).minimizar())
+        '((A | B))'
+        """
+        return Formula(self).minimizar(conjuntiva, exato)
+
+    def _transformar_em_forma_normal(self, disjuntiva, simplificar):
+        """Implementação de .transformar_em_forma_normal_conjuntiva() e de
+        .transformar_em_forma_normal_disjuntiva()."""
+        formas = [
+            _forma_normal_por_distribuicao(e, disjuntiva, simplificar)
+            for e in self.children
+        ]
+        junta = self.is_or if disjuntiva else self.is_and
+        if simplificar and junta and len(formas) > 1:
+            formas = [_simplificar_forma_normal([c for f in formas for c in f])]
+
+        newchildren = []
+        for forma in formas:
+            e = _expressao_da_forma_normal(forma, disjuntiva)
+            if (e.is_and and self.is_and) or (e.is_or and self.is_or):
+                newchildren.extend(e.children)
             else:
                 newchildren.append(e)
-
         self.children = newchildren
-        for e in self.children:
-            e.interiorizar_or()
 
-    def transformar_em_forma_normal_conjuntiva(self):
-        self.remover_duplas_negacoes()
-        self.remover_associativas()
-        self.interiorizar_negacao()
-        self.interiorizar_or()
-        self.remover_associativas()
+    def transformar_em_forma_normal_conjuntiva_equisatisfativel(self, prefixo="_t"):
+        """Transforma em uma fórmula na forma normal conjuntiva usando a
+        transformação de Tseitin.
+
+        Em vez de distribuir o OR sobre o AND (o que pode gerar uma fórmula
+        exponencialmente maior), cada operação ganha um novo símbolo
+        auxiliar, cujo valor é definido por algumas cláusulas. O tamanho do
+        resultado é proporcional ao tamanho da expressão original.
+
+        ATENÇÃO: o resultado não é equivalente à expressão original, e sim
+        equisatisfatível: ele é satisfatível se, e somente se, a expressão
+        original também for, e toda valoração que o satisfaz também satisfaz
+        a expressão original (ignorando os símbolos auxiliares).
+
+        Os nomes dos símbolos auxiliares começam com o prefixo, seguido de um
+        número. Retorna a lista com esses nomes.
+
+        >>> A = ExpressaoSimbolo('A')
+        >>> B = ExpressaoSimbolo('B')
+        >>> C = ExpressaoSimbolo('C')
+        >>> e = Expressao((A & B) | C)
+        >>> e.transformar_em_forma_normal_conjuntiva_equisatisfativel()
+        ['_t1']
+        >>> str(e)
+        '(((~ _t1 | A) & (~ _t1 | B) & (_t1 | ~ A | ~ B) & (_t1 | C)))'
+
+        Assim como os outros métodos de transformação, este método opera a
+        partir de um objeto pai.
+        """
+        indices = {}
+        clausulas = [_tseitin(e, indices) for e in self.children]
+
+        usados = self.simbolos()
+        nomes = {}
+        auxiliares = []
+        contador = 0
+        for chave, v in sorted(indices.items(), key=lambda x: x[1]):
+            if isinstance(chave, tuple):
+                # Auxiliary variable: finding an unused name.
+                contador += 1
+                while prefixo + str(contador) in usados:
+                    contador += 1
+                chave = prefixo + str(contador)
+                auxiliares.append(chave)
+            nomes[v] = chave
+
+        newchildren = []
+        for c in clausulas:
+            e = _expressao_das_clausulas(c, nomes)
+            if self.is_and and e.is_and:
+                newchildren.extend(e.children)
+            else:
+                newchildren.append(e)
+        self.children = newchildren
+        return auxiliares
 
     def remover_operacoes_vazias(self, recursive=True):
         """Remove as operações vazias, ou seja, operações/operadores que
@@ -602,18 +3281,18 @@ class Expressao(object):
         vazias.
         Expressao(ExpressaoAnd()) ==> Expressao()
         """
-        if recursive:
-            for e in self.children:
-                e.remover_operacoes_vazias(recursive=recursive)
-
-        newchildren = []
-        for e in self.children:
-            # Child is an operator with zero operands
-            if not e.is_symbol and len(e.children) == 0:
-                pass
-            else:
-                newchildren.append(e)
-        self.children = newchildren
+        # The children are handled before their parents.
+        for pai in (self._pos_ordem() if recursive else [self]):
+            if pai.is_symbol:
+                continue
+            newchildren = []
+            for e in pai.children:
+                # Child is an operator with zero operands
+                if not e.is_symbol and len(e.children) == 0:
+                    pass
+                else:
+                    newchildren.append(e)
+            pai.children = newchildren
 
 
 
@@ -624,36 +3303,75 @@ class ExpressaoSimbolo(Expressao):
     is_symbol = True
     operator_str = ""
 
+    __slots__ = ("_name", )
+
     def __init__(self, name=""):
         #super(ExpressaoSimbolo, self).__init__()
-        self.children = []
-        self.name = name
+        self._children = ()
+        self._name = name
+        self._guardado = None
 
-    def __repr__(self):
-        return "%s(%s)" % (self.__class__.__name__, repr(self.name))
+    @property
+    def name(self):
+        return self._name
 
-    def __str__(self):
-        return str(self.name)
+    @name.setter
+    def name(self, name):
+        if self.internado:
+            raise AttributeError("uma expressão internada não pode ser modificada")
+        self._name = name
+        if self._guardado is not None:
+            # The keys of the parents depend on the name.
+            self._invalidar()
 
-    def __eq__(self, other):
+    def _repr_recursivo(self, restantes):
+        return "%s(%s)" % (self.__class__.__name__, repr(self._name))
+
+    def _partes_repr(self):
+        return ("%s(%s)" % (self.__class__.__name__, repr(self.name)), "", "")
+
+    def _str_recursivo(self, restantes):
+        return str(self._name)
+
+    def _partes_str(self):
+        return (str(self.name), "", "")
+
+    def _iguais_no(self, other):
         """Compara se dois símbolos têm o mesmo nome."""
-        return (
-                type(self) == type(other)
-            ) and (
-                self.children == other.children
-            ) and (
-                self.name == other.name
-            )
+        return self.name == other.name
 
-    def generate_sort_keys(self, recursive=True):
-        self.sort_key = self.name
+    def _iguais_recursivo(self, other, restantes):
+        return type(self) is type(other) and self._name == other._name and self._children == other._children
+
+    def _chave_internada(self, children):
+        return (self.__class__, self.name)
+
+    def _hash_estrutural(self, children):
+        return hash((self.__class__.__name__, self.name))
+
+    def _chave_guardada(self, atributo):
+        # The keys of a symbol are cheap, and computing them every time keeps
+        # them right if the name changes.
+        return None
+
+    def _hash_no(self, filhos, ignorar_ordem):
+        return hash((self.__class__.__name__, self.name))
 
     def simbolos(self):
-        return set(self.name)
+        return set([self.name])
 
-    def eval(self, valores):
+    def _eval_recursivo(self, valores, restantes):
+        return valores[self._name]
+
+    def _eval_no(self, valores, filhos):
         return valores[self.name]
 
+    def _avaliar_parcial_no(self, valores, filhos):
+        valor = valores.get(self.name)
+        if valor is None:
+            return None
+        return Booleano(valor)
+
 
 
 class ExpressaoNot(Expressao):
@@ -662,47 +3380,122 @@ class ExpressaoNot(Expressao):
     is_not = True
     operator_str = ""
 
+    __slots__ = ()
+
     def __init__(self, child):
         #super(ExpressaoNot, self).__init__()
-        self.children = [child]
+        self._children = (child, )
+        self._guardado = None
 
-    def __str__(self):
-        return "~ %s" % (str(self.children[0]), )
-        #return "(~ %s)" % (str(self.children[0]), )
+    def _str_recursivo(self, restantes):
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        return "~ " + self._children[0]._str_recursivo(restantes)
 
-    def generate_sort_key(self, sorted_list):
-        self.sort_key = "(~ %s)" % (sorted_list[0].sort_key, )
+    def _partes_str(self):
+        return ("~ ", "", "")
+        #return ("(~ ", "", ")")
 
-    def eval(self, valores):
-        return ~ self.children[0].eval(valores)
+    def _eval_recursivo(self, valores, restantes):
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        return ~ self._children[0]._eval_recursivo(valores, restantes)
+
+    def _eval_no(self, valores, filhos):
+        return ~ filhos[0]
+
+    def _avaliar_parcial_no(self, valores, filhos):
+        valor = filhos[0]
+        if valor is None:
+            return None
+        return ~ valor
 
 
 class ExpressaoBinaria(Expressao):
     """Representa um operador binário (ou n-ário)"""
 
+    __slots__ = ()
+
     def __init__(self, *children):
         #super(ExpressaoBinaria, self).__init__()
-        self.children = list(children)
+        self._children = children
+        self._guardado = None
 
 
 class ExpressaoAnd(ExpressaoBinaria):
     """Representa o operador AND"""
 
+    __slots__ = ()
+
     is_and = True
     operator_str = " & "
 
-    def eval(self, valores):
-        return reduce(lambda x,y: x.eval(valores) & y.eval(valores), self.children)
+    def _eval_recursivo(self, valores, restantes):
+        if not self._children:
+            # reduce() raises the same error as ._calcular().
+            return Expressao._eval_recursivo(self, valores, restantes)
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        filhos = iter(self._children)
+        resultado = next(filhos)._eval_recursivo(valores, restantes)
+        for f in filhos:
+            resultado = resultado & f._eval_recursivo(valores, restantes)
+        return resultado
+
+    def _eval_no(self, valores, filhos):
+        return reduce(lambda x,y: x & y, filhos)
+
+    def _avaliar_parcial_no(self, valores, filhos):
+        if not filhos:
+            # Same error eval() gives on an empty operation.
+            raise TypeError("operação sem operandos: %r" % (self, ))
+        resultado = Verdadeiro
+        for valor in filhos:
+            if valor is None:
+                resultado = None
+            elif not valor:
+                return Falso
+        return resultado
 
 
 class ExpressaoOr(ExpressaoBinaria):
     """Representa o operador OR"""
 
+    __slots__ = ()
+
     is_or = True
     operator_str = " | "
 
-    def eval(self, valores):
-        return reduce(lambda x,y: x.eval(valores) | y.eval(valores), self.children)
+    def _eval_recursivo(self, valores, restantes):
+        if not self._children:
+            # reduce() raises the same error as ._calcular().
+            return Expressao._eval_recursivo(self, valores, restantes)
+        restantes[0] -= 1
+        if restantes[0] < 0:
+            raise _ExpressaoGrande
+        filhos = iter(self._children)
+        resultado = next(filhos)._eval_recursivo(valores, restantes)
+        for f in filhos:
+            resultado = resultado | f._eval_recursivo(valores, restantes)
+        return resultado
+
+    def _eval_no(self, valores, filhos):
+        return reduce(lambda x,y: x | y, filhos)
+
+    def _avaliar_parcial_no(self, valores, filhos):
+        if not filhos:
+            # Same error eval() gives on an empty operation.
+            raise TypeError("operação sem operandos: %r" % (self, ))
+        resultado = Falso
+        for valor in filhos:
+            if valor is None:
+                resultado = None
+            elif valor:
+                return Verdadeiro
+        return resultado
 
 
 
@@ -716,3 +3509,1418 @@ def criar_simbolos_no_namespace(simbolos, namespace):
     """
     for simbolo in simbolos:
         namespace[simbolo] = ExpressaoSimbolo(simbolo)
+
+
+# Tokens of ler_expressao(): a symbol name or any other single character.
+# Names follow the rules of Python identifiers, including non-ASCII letters.
+_token_re = re.compile(r"[^\W\d]\w*|\S", re.UNICODE)
+_inicio_de_nome_re = re.compile(r"[^\W\d]", re.UNICODE)
+
+_precedencia_padrao = {
+    "~": 5,
+    "&": 4,
+    "^": 3,
+    "|": 2,
+    ">": 1,
+}
+_associativos_a_direita = frozenset([">"])
+# Same trees the operators of Expressao build, without interning.
+_operadores_binarios = {
+    "&": lambda a, b: ExpressaoAnd(a, b),
+    "^": lambda a, b: ExpressaoOr(
+        ExpressaoAnd(ExpressaoNot(a), b),
+        ExpressaoAnd(a, ExpressaoNot(b))
+    ),
+    "|": lambda a, b: ExpressaoOr(a, b),
+    ">": lambda a, b: ExpressaoOr(ExpressaoNot(a), b),
+}
+
+
+def ler_expressao(texto, precedencia=None, simbolos=None):
+    """Lê uma expressão escrita com os operadores do módulo (~, &, ^, | e >)
+    e retorna a árvore de Expressao correspondente, sem usar eval().
+
+    A precedência padrão é a do Python (~ antes de &, antes de ^, antes de |),
+    com o implica (>) por último e associativo à direita. O dicionário
+    precedencia pode alterar a precedência de qualquer operador; quanto maior
+    o número, mais forte o operador.
+
+    Cada nome é convertido em um único ExpressaoSimbolo, reusado em todas as
+    ocorrências. Se o dicionário simbolos for passado, os símbolos dele são
+    usados, e os símbolos criados são adicionados a ele.
+
+    A leitura é feita em tempo linear e sem recursão, então não há limite
+    para o tamanho do texto nem para o aninhamento dos parênteses. Um texto
+    mal formado gera ValueError. A expressão retornada não é internada (veja
+    Expressao.internar()).
+
+    >>> e = ler_expressao("(A & ~B) > C")
+    >>> str(e)
+    '(~ (A & ~ B) | C)'
+    >>> str(ler_expressao("A | B & C"))
+    '(A | (B & C))'
+    >>> str(ler_expressao("A | B & C", {"|": 5}))
+    '((A | B) & C)'
+    """
+    prec = dict(_precedencia_padrao)
+    if precedencia:
+        for op in precedencia:
+            if op not in prec:
+                raise ValueError("operador desconhecido: %r" % (op, ))
+        prec.update(precedencia)
+    if simbolos is None:
+        simbolos = {}
+
+    # "(" is never popped by an operator.
+    prec["("] = float("-inf")
+
+    operandos = []
+    operadores = []
+    # Token indexes of the open parentheses, for the error messages.
+    abertos = []
+
+    def aplicar(op):
+        if op == "~":
+            operandos[-1] = ExpressaoNot(operandos[-1])
+        else:
+            direita = operandos.pop()
+            operandos[-1] = _operadores_binarios[op](operandos[-1], direita)
+
+    def erro(mensagem, i, *argumentos):
+        raise ValueError(mensagem % ((_posicao_do_token(texto, i), ) + argumentos))
+
+    # Shunting-yard: precedence climbing with explicit stacks.
+    tokens = _token_re.findall(texto)
+    esperando_operando = True
+    for i, token in enumerate(tokens):
+        if esperando_operando:
+            if token == "(":
+                operadores.append(token)
+                abertos.append(i)
+            elif token == "~":
+                operadores.append(token)
+            elif _inicio_de_nome_re.match(token):
+                simbolo = simbolos.get(token)
+                if simbolo is None:
+                    simbolo = simbolos[token] = ExpressaoSimbolo(token)
+                operandos.append(simbolo)
+                esperando_operando = False
+            else:
+                erro("operando esperado na posição %d: %r", i, token)
+        elif token in _operadores_binarios:
+            p = prec[token]
+            if token in _associativos_a_direita:
+                while operadores and prec[operadores[-1]] > p:
+                    aplicar(operadores.pop())
+            else:
+                while operadores and prec[operadores[-1]] >= p:
+                    aplicar(operadores.pop())
+            operadores.append(token)
+            esperando_operando = True
+        elif token == ")":
+            if not abertos:
+                erro("parêntese fechado sem ter sido aberto na posição %d", i)
+            op = operadores.pop()
+            while op != "(":
+                aplicar(op)
+                op = operadores.pop()
+            abertos.pop()
+        else:
+            erro("operador esperado na posição %d: %r", i, token)
+
+    if esperando_operando:
+        raise ValueError("fim inesperado da expressão na posição %d" % (len(texto), ))
+    if abertos:
+        erro("parêntese aberto na posição %d não foi fechado", abertos[-1])
+    while operadores:
+        aplicar(operadores.pop())
+    return operandos[0]
+
+
+def _posicao_do_token(texto, i):
+    """Posição no texto do i-ésimo token de ler_expressao()."""
+    for j, m in enumerate(_token_re.finditer(texto)):
+        if j == i:
+            return m.start()
+
+
+# Binary format of Expressao.serializar(), all little-endian:
+#  - header: magic, width of the integers (1, 2 or 4 bytes), number of
+#    symbol names, size of the names, and number of nodes;
+#  - the size of each name, then the names, in UTF-8;
+#  - padding up to a multiple of the width;
+#  - one integer per node, in post-order: (argument << 3) | opcode.
+_cabecalho_serializado = struct.Struct("<4sB3xIII")
+_magica_serializada = b"LGX\x01"
+_tipos_por_largura = {1: "B", 2: "H", 4: "I"}
+# Every integer, in the header or after it, must be below this.
+_limite_serializado = 1 << 32
+# Names are stored as UTF-8 text, so other types wouldn't be read back.
+_tipos_nomes_serializados = (str, type(u""))
+
+_OP_SIMBOLO = 0     # argument: index of the name
+_OP_NOT = 1
+_OP_AND = 2         # argument: number of children
+_OP_OR = 3          # argument: number of children
+_OP_EXPRESSAO = 4   # argument: number of children
+_OP_REFERENCIA = 5  # argument: number of a node already read
+
+
+def _serializar(raiz):
+    """Veja Expressao.serializar()."""
+    codigos = {
+        Expressao: _OP_EXPRESSAO,
+        ExpressaoNot: _OP_NOT,
+        ExpressaoAnd: _OP_AND,
+        ExpressaoOr: _OP_OR,
+    }
+    indices_nomes = {}
+    nomes = []
+    # Maps id(node) to its number, in the order the nodes are written.
+    numeros = {}
+    operacoes = []
+    pilha = [(raiz, False)]
+    while pilha:
+        e, visitado = pilha.pop()
+        numero = numeros.get(id(e))
+        if numero is not None:
+            operacoes.append((numero << 3) | _OP_REFERENCIA)
+            continue
+        cls = e.__class__
+        if cls is ExpressaoSimbolo:
+            indice = indices_nomes.get(e.name)
+            if indice is None:
+                if type(e.name) not in _tipos_nomes_serializados:
+                    raise TypeError("nome de símbolo não suportado: %r" % (e.name, ))
+                indice = indices_nomes[e.name] = len(nomes)
+                nomes.append(e.name)
+            operacoes.append((indice << 3) | _OP_SIMBOLO)
+        elif cls not in codigos:
+            raise TypeError("expressão não suportada: %s" % (cls.__name__, ))
+        elif not visitado:
+            pilha.append((e, True))
+            for f in reversed(e.children):
+                pilha.append((f, False))
+            continue
+        elif cls is ExpressaoNot:
+            operacoes.append(_OP_NOT)
+        else:
+            operacoes.append((len(e.children) << 3) | codigos[cls])
+        numeros[id(e)] = len(numeros)
+
+    nomes = [
+        nome if isinstance(nome, bytes) else nome.encode("utf-8")
+        for nome in nomes
+    ]
+    tamanhos = [len(nome) for nome in nomes]
+    texto_nomes = b"".join(nomes)
+    maior = max(tamanhos + operacoes)
+    if max(maior, len(texto_nomes), len(operacoes)) >= _limite_serializado:
+        raise OverflowError("expressão grande demais para o formato binário")
+    largura = 1 if maior < 1 << 8 else 2 if maior < 1 << 16 else 4
+    tipo = _tipos_por_largura[largura]
+    partes = [
+        _cabecalho_serializado.pack(
+            _magica_serializada, largura, len(nomes), len(texto_nomes), len(operacoes)
+        ),
+        _inteiros_little_endian(tipo, tamanhos),
+        texto_nomes,
+    ]
+    tamanho = sum(len(p) for p in partes)
+    partes.append(b"\0" * (-tamanho % largura))
+    partes.append(_inteiros_little_endian(tipo, operacoes))
+    return b"".join(partes)
+
+
+def _inteiros_little_endian(tipo, valores):
+    a = array.array(tipo, valores)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tostring() if sys.version_info.major < 3 else a.tobytes()
+
+
+def _ler_inteiros(dados, inicio, tipo, n):
+    """Retorna os n inteiros do tipo (um código do array) que começam em
+    dados[inicio], sem copiá-los sempre que possível."""
+    fim = inicio + n * array.array(tipo).itemsize
+    if fim > len(dados):
+        raise ValueError("dados serializados truncados")
+    if sys.byteorder == "little" and hasattr(dados[inicio:fim], "cast"):
+        return dados[inicio:fim].cast(tipo)
+    a = array.array(tipo, dados[inicio:fim].tobytes())
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+
+def _desserializar(dados):
+    """Veja Expressao.desserializar()."""
+    dados = memoryview(dados)
+    if dados.itemsize != 1:
+        dados = dados.cast("B")
+    if len(dados) < _cabecalho_serializado.size:
+        raise ValueError("dados serializados truncados")
+    magica, largura, nnomes, tamanho_nomes, noperacoes = _cabecalho_serializado.unpack(
+        dados[:_cabecalho_serializado.size].tobytes()
+    )
+    if magica != _magica_serializada or largura not in _tipos_por_largura:
+        raise ValueError("os dados não foram gerados por Expressao.serializar()")
+    tipo = _tipos_por_largura[largura]
+
+    inicio = _cabecalho_serializado.size
+    tamanhos = _ler_inteiros(dados, inicio, tipo, nnomes)
+    inicio += nnomes * largura
+    if inicio + tamanho_nomes > len(dados):
+        raise ValueError("dados serializados truncados")
+    texto_nomes = dados[inicio:inicio + tamanho_nomes].tobytes()
+    inicio += tamanho_nomes
+    inicio += -inicio % largura
+    operacoes = _ler_inteiros(dados, inicio, tipo, noperacoes)
+
+    nomes = []
+    posicao = 0
+    for tamanho in tamanhos:
+        nomes.append(texto_nomes[posicao:posicao + tamanho].decode("utf-8"))
+        posicao += tamanho
+
+    classes = {
+        _OP_EXPRESSAO: Expressao,
+        _OP_AND: ExpressaoAnd,
+        _OP_OR: ExpressaoOr,
+    }
+    nos = []
+    pilha = []
+    try:
+        for valor in operacoes:
+            codigo = valor & 7
+            argumento = valor >> 3
+            if codigo == _OP_REFERENCIA:
+                pilha.append(nos[argumento])
+                continue
+            if codigo == _OP_SIMBOLO:
+                e = ExpressaoSimbolo(nomes[argumento])
+            elif codigo == _OP_NOT:
+                e = ExpressaoNot(pilha.pop())
+            else:
+                cls = classes[codigo]
+                e = cls.__new__(cls)
+                e._children = ()
+                e._guardado = None
+                if argumento:
+                    e._children = tuple(pilha[-argumento:])
+                    del pilha[-argumento:]
+                if len(e._children) != argumento:
+                    raise IndexError
+            pilha.append(e)
+            nos.append(e)
+    except (IndexError, KeyError):
+        raise ValueError("dados serializados inválidos")
+    if len(pilha) != 1:
+        raise ValueError("dados serializados inválidos")
+    return pilha[0]
+
+
+
+
+
+
+class ResolvedorSAT(object):
+    """Resolvedor SAT do tipo CDCL (conflict-driven clause learning).
+
+    As cláusulas usam a mesma notação do formato DIMACS: cada variável é um
+    inteiro positivo, e cada literal é a variável (positivo) ou o seu
+    negativo (negado). Por exemplo, [1, -2] significa (x1 | ~ x2).
+
+    >>> r = ResolvedorSAT([[1, 2], [-1, 2], [1, -2]])
+    >>> r.resolver()
+    [1, 2]
+    >>> r.adicionar_clausula([-1, -2])
+    >>> r.resolver() is None
+    True
+
+    Usa propagação de unidades com dois literais vigiados por cláusula,
+    aprendizado de cláusulas (primeiro ponto de implicação único),
+    heurística de atividade das variáveis (VSIDS), memória de fase e
+    reinícios seguindo a sequência de Luby.
+    """
+
+    # Conflicts between restarts are reinicio_base * luby(i)
+    reinicio_base = 100
+    decaimento = 0.95
+
+    def __init__(self, clausulas=(), nvars=0):
+        self.nvars = 0
+        self.ok = True
+
+        self.clausulas = []
+        # Literals are encoded as 2*v (positive) and 2*v+1 (negative), so
+        # that "lit ^ 1" is the negation. valor[lit] is 1 (true), -1 (false)
+        # or 0 (unassigned). vigias[lit] lists the clauses watching lit.
+        self.valor = [0, 0]
+        self.vigias = [[], []]
+        self.nivel = [0]
+        self.razao = [None]
+        self.atividade = [0.0]
+        self.fase = [False]
+        self.visto = [False]
+
+        self.trilha = []
+        self.limites_trilha = []
+        self.inicio_fila = 0
+        self.heap = []
+        self.incremento = 1.0
+
+        self._garantir_variavel(nvars)
+        for clausula in clausulas:
+            self.adicionar_clausula(clausula)
+
+    def _garantir_variavel(self, v):
+        while self.nvars < v:
+            self.nvars += 1
+            self.valor.extend((0, 0))
+            self.vigias.extend(([], []))
+            self.nivel.append(0)
+            self.razao.append(None)
+            self.atividade.append(0.0)
+            self.fase.append(False)
+            self.visto.append(False)
+            heapq.heappush(self.heap, (0.0, self.nvars))
+
+    def adicionar_clausula(self, clausula):
+        """Adiciona uma cláusula (uma lista de literais não nulos)."""
+        self._retroceder(0)
+        literais = set()
+        for x in clausula:
+            if x == 0:
+                raise ValueError("literal inválido: 0")
+            self._garantir_variavel(abs(x))
+            lit = 2 * x if x > 0 else -2 * x + 1
+            if lit ^ 1 in literais or self.valor[lit] == 1:
+                # Tautological, or already satisfied at level 0
+                return
+            if self.valor[lit] == 0:
+                literais.add(lit)
+
+        if not self.ok:
+            return
+        literais = sorted(literais)
+        if len(literais) == 0:
+            self.ok = False
+        elif len(literais) == 1:
+            self._atribuir(literais[0], None)
+            if self._propagar() is not None:
+                self.ok = False
+        else:
+            self._anexar(literais)
+
+    def _anexar(self, literais):
+        indice = len(self.clausulas)
+        self.clausulas.append(literais)
+        self.vigias[literais[0]].append(indice)
+        self.vigias[literais[1]].append(indice)
+        return indice
+
+    def _atribuir(self, lit, razao):
+        v = lit >> 1
+        self.valor[lit] = 1
+        self.valor[lit ^ 1] = -1
+        self.nivel[v] = len(self.limites_trilha)
+        self.razao[v] = razao
+        self.trilha.append(lit)
+
+    def _propagar(self):
+        """Propagação de unidades. Retorna a cláusula em conflito, ou None."""
+        valor = self.valor
+        clausulas = self.clausulas
+        vigias = self.vigias
+        trilha = self.trilha
+        while self.inicio_fila < len(trilha):
+            falso = trilha[self.inicio_fila] ^ 1
+            self.inicio_fila += 1
+
+            lista = vigias[falso]
+            i = j = 0
+            n = len(lista)
+            while i < n:
+                indice = lista[i]
+                i += 1
+                c = clausulas[indice]
+                # The false literal goes to position 1.
+                if c[0] == falso:
+                    c[0], c[1] = c[1], falso
+                if valor[c[0]] == 1:
+                    lista[j] = indice
+                    j += 1
+                    continue
+                for k in range(2, len(c)):
+                    if valor[c[k]] != -1:
+                        c[1], c[k] = c[k], falso
+                        vigias[c[1]].append(indice)
+                        break
+                else:
+                    lista[j] = indice
+                    j += 1
+                    if valor[c[0]] == -1:
+                        # Conflict: keeping the remaining watches.
+                        while i < n:
+                            lista[j] = lista[i]
+                            j += 1
+                            i += 1
+                        del lista[j:]
+                        return indice
+                    self._atribuir(c[0], indice)
+            del lista[j:]
+        return None
+
+    def _aumentar_atividade(self, v):
+        self.atividade[v] += self.incremento
+        if self.atividade[v] > 1e100:
+            for w in range(1, self.nvars + 1):
+                self.atividade[w] *= 1e-100
+            self.incremento *= 1e-100
+            self._reconstruir_heap()
+        elif self.valor[2 * v] == 0:
+            heapq.heappush(self.heap, (-self.atividade[v], v))
+
+    def _reconstruir_heap(self):
+        self.heap = [
+            (-self.atividade[v], v)
+            for v in range(1, self.nvars + 1)
+            if self.valor[2 * v] == 0
+        ]
+        heapq.heapify(self.heap)
+
+    def _analisar(self, conflito):
+        """Gera a cláusula aprendida a partir de um conflito.
+
+        Retorna (clausula, nivel), na qual clausula[0] é o literal que passa
+        a ser implicado depois de retroceder para o nivel.
+        """
+        nivel_atual = len(self.limites_trilha)
+        visto = self.visto
+        aprendida = [None]
+        contador = 0
+        p = None
+        i = len(self.trilha) - 1
+        c = self.clausulas[conflito]
+
+        while True:
+            for lit in (c if p is None else c[1:]):
+                v = lit >> 1
+                if not visto[v] and self.nivel[v] > 0:
+                    visto[v] = True
+                    self._aumentar_atividade(v)
+                    if self.nivel[v] == nivel_atual:
+                        contador += 1
+                    else:
+                        aprendida.append(lit)
+            # Next literal of the current level on the trail
+            while not visto[self.trilha[i] >> 1]:
+                i -= 1
+            p = self.trilha[i]
+            i -= 1
+            visto[p >> 1] = False
+            contador -= 1
+            if contador == 0:
+                break
+            c = self.clausulas[self.razao[p >> 1]]
+
+        aprendida[0] = p ^ 1
+        for lit in aprendida[1:]:
+            visto[lit >> 1] = False
+
+        if len(aprendida) == 1:
+            return aprendida, 0
+        # The literal with the highest level is watched at position 1.
+        k = max(range(1, len(aprendida)), key=lambda k: self.nivel[aprendida[k] >> 1])
+        aprendida[1], aprendida[k] = aprendida[k], aprendida[1]
+        return aprendida, self.nivel[aprendida[1] >> 1]
+
+    def _retroceder(self, nivel):
+        if len(self.limites_trilha) <= nivel:
+            return
+        limite = self.limites_trilha[nivel]
+        for lit in self.trilha[limite:]:
+            v = lit >> 1
+            self.valor[lit] = self.valor[lit ^ 1] = 0
+            self.razao[v] = None
+            self.fase[v] = not (lit & 1)
+            heapq.heappush(self.heap, (-self.atividade[v], v))
+        del self.trilha[limite:]
+        del self.limites_trilha[nivel:]
+        self.inicio_fila = len(self.trilha)
+
+    def _decidir(self):
+        """Escolhe a próxima variável. Retorna False se todas já tiverem
+        valor."""
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if self.valor[2 * v] == 0:
+                self.limites_trilha.append(len(self.trilha))
+                self._atribuir(2 * v if self.fase[v] else 2 * v + 1, None)
+                return True
+        return False
+
+    def resolver(self):
+        """Retorna um modelo (a lista com um literal verdadeiro para cada
+        variável) ou None se as cláusulas forem insatisfatíveis."""
+        if not self.ok:
+            return None
+        if self._propagar() is not None:
+            self.ok = False
+            return None
+
+        reinicios = 0
+        conflitos = 0
+        limite = self.reinicio_base * _luby(reinicios)
+        while True:
+            conflito = self._propagar()
+            if conflito is not None:
+                if len(self.limites_trilha) == 0:
+                    self.ok = False
+                    return None
+                conflitos += 1
+                aprendida, nivel = self._analisar(conflito)
+                self._retroceder(nivel)
+                if len(aprendida) == 1:
+                    self._atribuir(aprendida[0], None)
+                else:
+                    self._atribuir(aprendida[0], self._anexar(aprendida))
+                self.incremento /= self.decaimento
+                if len(self.heap) > 10 * self.nvars + 100:
+                    self._reconstruir_heap()
+
+            elif conflitos >= limite:
+                reinicios += 1
+                conflitos = 0
+                limite = self.reinicio_base * _luby(reinicios)
+                self._retroceder(0)
+
+            elif not self._decidir():
+                modelo = [
+                    v if self.valor[2 * v] == 1 else -v
+                    for v in range(1, self.nvars + 1)
+                ]
+                self._retroceder(0)
+                return modelo
+
+
+def _luby(i):
+    """Retorna o i-ésimo termo (a partir de 0) da sequência de Luby:
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ..."""
+    tamanho = 1
+    termo = 1
+    while tamanho < i + 1:
+        tamanho = 2 * tamanho + 1
+        termo *= 2
+    while tamanho - 1 != i:
+        tamanho = (tamanho - 1) // 2
+        termo //= 2
+        i = i % tamanho
+    return termo
+
+
+def _clausulas_da_fnc(expr, indices):
+    """Converte uma Expressao na forma normal conjuntiva (por exemplo, o
+    resultado de .transformar_em_forma_normal_conjuntiva()) em uma lista de
+    cláusulas no formato usado pelo ResolvedorSAT.
+
+    indices é um dict que associa o nome de cada símbolo a uma variável.
+    Símbolos que não estiverem no dict são acrescentados a ele.
+    """
+    return list(_iterar_clausulas_da_fnc(expr, indices))
+
+
+def _sem_parenteses(e):
+    while not (e.is_symbol or e.is_not or e.is_and or e.is_or):
+        e = e.children[0]
+    return e
+
+
+def _operandos(e):
+    """Operandos de e, juntando operações iguais aninhadas:
+    (A & (B & C)) tem os operandos A, B e C."""
+    resultado = []
+    pilha = list(reversed(e.children))
+    while pilha:
+        f = _sem_parenteses(pilha.pop())
+        if (f.is_and and e.is_and) or (f.is_or and e.is_or):
+            pilha.extend(reversed(f.children))
+        else:
+            resultado.append(f)
+    return resultado
+
+
+def _literal_da_fnc(lit, indices, expr):
+    """Retorna o literal (no formato do ResolvedorSAT) de um símbolo ou da
+    negação de um símbolo. Veja _clausulas_da_fnc()."""
+    sinal = 1
+    lit = _sem_parenteses(lit)
+    while lit.is_not:
+        sinal = -sinal
+        lit = _sem_parenteses(lit.children[0])
+    if not lit.is_symbol:
+        raise ValueError("a expressão não está na forma normal conjuntiva: %s" % (expr, ))
+    if lit.name not in indices:
+        indices[lit.name] = len(indices) + 1
+    return sinal * indices[lit.name]
+
+
+def _iterar_clausulas_da_fnc(expr, indices):
+    """Igual a _clausulas_da_fnc(), mas gera as cláusulas uma de cada vez."""
+    e = _sem_parenteses(expr)
+    for c in (_operandos(e) if e.is_and else [e]):
+        yield [
+            _literal_da_fnc(lit, indices, expr)
+            for lit in (_operandos(c) if c.is_or else [c])
+        ]
+
+
+def _tseitin(raiz, indices):
+    """Retorna a lista de cláusulas (no formato do ResolvedorSAT) da
+    transformação de Tseitin da expressão raiz.
+
+    indices é um dict que associa o nome de cada símbolo a uma variável. Os
+    símbolos que não estiverem no dict são acrescentados a ele. As variáveis
+    auxiliares também são acrescentadas, com chaves (None, variavel), que não
+    se confundem com nomes. As variáveis são numeradas em sequência, então
+    o dict deve começar vazio ou numerado de 1 a len(indices).
+    """
+
+    # Each operand of a top-level AND becomes a separate clause, and the
+    # operands of a top-level OR go directly into that clause, without an
+    # auxiliary variable.
+    raiz = _sem_parenteses(raiz)
+    raizes = []
+    for e in (_operandos(raiz) if raiz.is_and else [raiz]):
+        raizes.append(_operandos(e) if e.is_or else [e])
+
+    clausulas = []
+    # Maps id(node) to its literal; shared subexpressions are only
+    # converted once.
+    literal = {}
+    filhos_de = {}
+    pilha = [(e, False) for r in reversed(raizes) for e in reversed(r)]
+    while pilha:
+        e, visitado = pilha.pop()
+        if id(e) in literal:
+            continue
+        if e.is_symbol:
+            if e.name not in indices:
+                indices[e.name] = len(indices) + 1
+            literal[id(e)] = indices[e.name]
+        elif not visitado:
+            if e.is_and or e.is_or:
+                filhos_de[id(e)] = _operandos(e)
+            else:
+                filhos_de[id(e)] = e.children
+            pilha.append((e, True))
+            for f in reversed(filhos_de[id(e)]):
+                pilha.append((f, False))
+        else:
+            filhos = [literal[id(f)] for f in filhos_de.pop(id(e))]
+            if e.is_not:
+                literal[id(e)] = -filhos[0]
+            elif (e.is_and or e.is_or) and len(filhos) != 1:
+                x = len(indices) + 1
+                indices[None, x] = x
+                # x <-> (l1 & l2 & ...) gives (~x | li) and (x | ~l1 | ~l2 ...)
+                # x <-> (l1 | l2 | ...) is the same with everything negated.
+                sinal = 1 if e.is_and else -1
+                for l in filhos:
+                    clausulas.append([-sinal * x, sinal * l])
+                clausulas.append([sinal * x] + [-sinal * l for l in filhos])
+                literal[id(e)] = x
+            else:
+                # Parentheses, or an operation with a single operand
+                literal[id(e)] = filhos[0]
+
+    for r in raizes:
+        clausulas.append([literal[id(e)] for e in r])
+    return clausulas
+
+
+def _forma_normal_por_distribuicao(raiz, disjuntiva=False, simplificar=False):
+    """Retorna a lista de cláusulas da forma normal conjuntiva da expressão
+    raiz, calculada empurrando as negações até os símbolos e distribuindo o
+    OR sobre o AND. Cada cláusula é uma tupla de literais (símbolos ou
+    negações de símbolos).
+
+    Se disjuntiva for verdadeiro, retorna a lista de termos da forma normal
+    disjuntiva, distribuindo o AND sobre o OR. Cada termo é uma tupla de
+    literais.
+
+    As operações aninhadas que se tornam a mesma operação depois de
+    empurrar as negações são juntadas, como em _operandos(), então uma
+    cadeia de n operações é calculada de uma vez, e não n vezes. Cada
+    operando é calculado uma única vez para cada sinal (negado ou não), e o
+    resultado é compartilhado entre todos os pais do operando. Se
+    simplificar for verdadeiro, os operandos de cada distribuição, o seu
+    resultado e o resultado final são simplificados (veja
+    _simplificar_forma_normal()), o que evita que cláusulas repetidas ou
+    absorvidas sejam multiplicadas pela distribuição.
+    """
+    negacoes = {}
+    def literal(simbolo, positivo):
+        if positivo:
+            return simbolo
+        if id(simbolo) not in negacoes:
+            negacoes[id(simbolo)] = ExpressaoNot(simbolo)
+        return negacoes[id(simbolo)]
+
+    def sem_negacoes(e, positivo):
+        # Skips parentheses and NOTs, applying the NOTs to the sign.
+        while not (e.is_symbol or e.is_and or e.is_or):
+            if e.is_not:
+                positivo = not positivo
+            e = e.children[0]
+        return e, positivo
+
+    def junta(e, positivo):
+        # In the CNF, an AND, or a negated OR (De Morgan); in the DNF, an
+        # OR, or a negated AND: the clauses of the operands together.
+        return (e.is_and == positivo) != disjuntiva
+
+    def operandos(e, positivo):
+        # The (node, sign) operands of e, joining the nested operations that
+        # become the same operation as e.
+        operacao = junta(e, positivo)
+        resultado = []
+        pilha = [(f, positivo) for f in reversed(e.children)]
+        while pilha:
+            f, sinal = sem_negacoes(*pilha.pop())
+            if (f.is_and or f.is_or) and junta(f, sinal) == operacao:
+                pilha.extend((g, sinal) for g in reversed(f.children))
+            else:
+                resultado.append((f, sinal))
+        return resultado
+
+    # Maps (id(node), positivo) to the clauses of the node, or of its
+    # negation if positivo is false.
+    fnc = {}
+    simplificados = set()
+    def simplificado(chave):
+        if chave not in simplificados:
+            fnc[chave] = _simplificar_forma_normal(fnc[chave])
+            simplificados.add(chave)
+        return fnc[chave]
+
+    raiz, positivo = sem_negacoes(raiz, True)
+    operandos_de = {}
+    pilha = [(raiz, positivo, False)]
+    while pilha:
+        e, positivo, visitado = pilha.pop()
+        chave = (id(e), positivo)
+        if chave in fnc:
+            continue
+        if e.is_symbol:
+            fnc[chave] = [(literal(e, positivo), )]
+            continue
+        if not visitado:
+            operandos_de[chave] = operandos(e, positivo)
+            pilha.append((e, positivo, True))
+            for f, sinal in reversed(operandos_de[chave]):
+                pilha.append((f, sinal, False))
+            continue
+
+        chaves = [(id(f), sinal) for f, sinal in operandos_de.pop(chave)]
+        if junta(e, positivo):
+            fnc[chave] = [c for k in chaves for c in fnc[k]]
+            continue
+        # Equal operands are distributed only once, as in the old
+        # interiorizar_or(); otherwise (A & B) | (A & B) would also give the
+        # redundant clause (A | B).
+        distintas = set()
+        unicas = []
+        for k in chaves:
+            clausulas = tuple(fnc[k])
+            if clausulas not in distintas:
+                distintas.add(clausulas)
+                unicas.append(k)
+        chaves = unicas
+        if not simplificar:
+            # One clause for each combination of a clause from each
+            # operand, the first operand varying slowest.
+            fnc[chave] = [
+                tuple(itertools.chain.from_iterable(combinacao))
+                for combinacao in itertools.product(*[fnc[k] for k in chaves])
+            ]
+        else:
+            # One operand at a time, simplifying each partial product, so
+            # that absorbed clauses are not multiplied by the next operands.
+            # A run of operands with a single clause doesn't multiply the
+            # number of clauses, so it is added as one clause, and the
+            # partial product is only simplified after the other operands.
+            parcial = [()]
+            unica = []
+            for k in chaves:
+                clausulas = simplificado(k)
+                if len(clausulas) == 1:
+                    unica.extend(clausulas[0])
+                    continue
+                if unica:
+                    unica = tuple(unica)
+                    parcial = [c + unica for c in parcial]
+                    unica = []
+                parcial = _simplificar_forma_normal([
+                    c + d for c in parcial for d in clausulas
+                ])
+            if unica:
+                unica = tuple(unica)
+                parcial = _simplificar_forma_normal([c + unica for c in parcial])
+            fnc[chave] = parcial
+            simplificados.add(chave)
+    if simplificar:
+        return simplificado((id(raiz), positivo))
+    return fnc[id(raiz), positivo]
+
+
+def _expressao_da_forma_normal(clausulas, disjuntiva=False):
+    """Monta a Expressao de uma lista de cláusulas (ou de termos, se
+    disjuntiva for verdadeiro) retornada por
+    _forma_normal_por_distribuicao()."""
+    interna, externa = (ExpressaoAnd, ExpressaoOr) if disjuntiva else (ExpressaoOr, ExpressaoAnd)
+    operandos = [
+        c[0] if len(c) == 1 else interna(*c)
+        for c in clausulas
+    ]
+    if len(operandos) == 1:
+        return operandos[0]
+    return externa(*operandos)
+
+
+def _simplificar_forma_normal(clausulas):
+    """Aplica _simplificar_clausulas() a uma lista de cláusulas retornada
+    por _forma_normal_por_distribuicao().
+
+    Na forma normal disjuntiva, a mesma simplificação remove os termos
+    contraditórios (como (A & ~ A)), os literais repetidos e os termos
+    absorvidos por outros: (A) | (A & B) equivale a (A).
+    """
+    indices = {}
+    numeradas = [
+        [_literal_da_fnc(lit, indices, c) for lit in c]
+        for c in clausulas
+    ]
+
+    simplificadas = _simplificar_clausulas(numeradas)
+    if numeradas and not simplificadas:
+        # Only tautologies (or, in the DNF, contradictions): keeping one of
+        # them, without repeated literals.
+        c = []
+        vistos = set()
+        for x in numeradas[0]:
+            if x not in vistos:
+                vistos.add(x)
+                c.append(x)
+        simplificadas = [c]
+
+    # Reusing the original symbols and negations.
+    literais = {}
+    for c, numerada in zip(clausulas, numeradas):
+        for lit, x in zip(c, numerada):
+            literais.setdefault(x, lit)
+    return [tuple(literais[x] for x in c) for c in simplificadas]
+
+
+def _expressao_das_clausulas(clausulas, nomes):
+    """Monta uma Expressao na forma normal conjuntiva a partir de uma lista
+    de cláusulas (no formato do ResolvedorSAT). nomes associa cada variável
+    ao nome do seu símbolo.
+
+    Cada símbolo e cada negação são criados uma única vez e compartilhados
+    entre as cláusulas.
+    """
+    literais = {}
+    def literal(x):
+        if x not in literais:
+            if x > 0:
+                literais[x] = ExpressaoSimbolo(nomes[x])
+            else:
+                literais[x] = ExpressaoNot(literal(-x))
+        return literais[x]
+
+    operandos = []
+    for c in clausulas:
+        if len(c) == 1:
+            operandos.append(literal(c[0]))
+        else:
+            operandos.append(ExpressaoOr(*[literal(x) for x in c]))
+    if len(operandos) == 1:
+        return operandos[0]
+    return ExpressaoAnd(*operandos)
+
+
+def _simplificar_clausulas(clausulas):
+    """Simplifica uma lista de cláusulas (no formato do ResolvedorSAT),
+    retornando uma lista equivalente, na mesma ordem, sem:
+        - literais repetidos dentro de uma cláusula;
+        - cláusulas tautológicas, que contêm um literal e a sua negação;
+        - cláusulas subsumidas por outra, ou seja, que contêm todos os
+          literais de outra cláusula (inclusive cláusulas repetidas, das
+          quais só a primeira é mantida).
+
+    Cada cláusula nova é comparada apenas com as cláusulas que têm algum
+    literal em comum com ela, usando listas de ocorrências de cada literal.
+    """
+    mantidas = []
+    removida = []
+    # Maps each literal to the indices of the kept clauses that contain it.
+    # Removed clauses are only skipped, not deleted from these lists.
+    ocorrencias = {}
+    for c in clausulas:
+        literais = []
+        vistos = set()
+        for x in c:
+            if x not in vistos:
+                vistos.add(x)
+                literais.append(x)
+        if any(-x in vistos for x in literais):
+            continue
+        if not literais:
+            # The empty clause subsumes everything else.
+            return [literais]
+
+        # Forward subsumption: is the new clause subsumed by a kept one?
+        # Such a clause has all of its literals in the new one, so it is
+        # counted once for each of them.
+        contagem = {}
+        subsumida = False
+        for x in literais:
+            for i in ocorrencias.get(x, ()):
+                if removida[i]:
+                    continue
+                contagem[i] = contagem.get(i, 0) + 1
+                if contagem[i] == len(mantidas[i]):
+                    subsumida = True
+                    break
+            if subsumida:
+                break
+        if subsumida:
+            continue
+
+        # Backward subsumption: does the new clause subsume kept ones? They
+        # must contain its rarest literal.
+        raro = min(literais, key=lambda x: len(ocorrencias.get(x, ())))
+        for i in ocorrencias.get(raro, ()):
+            if not removida[i] and vistos.issubset(mantidas[i]):
+                removida[i] = True
+
+        indice = len(mantidas)
+        mantidas.append(literais)
+        removida.append(False)
+        for x in literais:
+            ocorrencias.setdefault(x, []).append(indice)
+
+    return [c for c, r in zip(mantidas, removida) if not r]
+
+
+def resolver_sat(fnc):
+    """Procura uma valoração que satisfaça uma fórmula na forma normal
+    conjuntiva.
+
+    fnc pode ser uma Expressao na forma normal conjuntiva, um
+    ConjuntoClausulas ou uma lista de cláusulas no formato do ResolvedorSAT.
+    Nos dois primeiros casos, retorna um dict com o valor de cada símbolo; no
+    terceiro, uma lista de literais. Se a fórmula for insatisfatível, retorna
+    None.
+
+    >>> A = ExpressaoSimbolo('A')
+    >>> B = ExpressaoSimbolo('B')
+    >>> e = Expressao(A & (~ A | B))
+    >>> sorted(resolver_sat(e).items())
+    [('A', Verdadeiro), ('B', Verdadeiro)]
+    >>> resolver_sat(Expressao(A & ~ A)) is None
+    True
+    """
+    if isinstance(fnc, Expressao):
+        fnc = ConjuntoClausulas.de_expressao(fnc)
+    elif not isinstance(fnc, ConjuntoClausulas):
+        return ResolvedorSAT(fnc).resolver()
+
+    # Symbols that only appear in tautological clauses still need a value.
+    modelo = ResolvedorSAT(fnc, nvars=fnc.nvars).resolver()
+    if modelo is None:
+        return None
+    return dict(
+        (fnc.nome(v), Verdadeiro if modelo[v - 1] > 0 else Falso)
+        for v in range(1, fnc.nvars + 1)
+    )
+
+
+class ConjuntoClausulas(object):
+    """Conjunto de cláusulas (uma fórmula na forma normal conjuntiva) em uma
+    representação compacta.
+
+    Cada símbolo é associado a uma variável (um inteiro positivo), e cada
+    literal é a variável ou o seu negativo, como no ResolvedorSAT. Os
+    literais de todas as cláusulas ficam juntos em .literais, um
+    array('i'), e a cláusula i é literais[inicios[i]:inicios[i + 1]].
+    Assim, cada literal ocupa 4 bytes, em vez de um objeto Expressao.
+
+    >>> A = ExpressaoSimbolo('A')
+    >>> B = ExpressaoSimbolo('B')
+    >>> c = ConjuntoClausulas.de_expressao(Expressao(A & (~ A | B)))
+    >>> c.nomes
+    ['A', 'B']
+    >>> list(c)
+    [[1], [-1, 2]]
+    >>> str(c.expressao())
+    '((A & (~ A | B)))'
+
+    O conjunto pode ser passado para o ResolvedorSAT e para resolver_sat().
+    """
+
+    def __init__(self, clausulas=(), nomes=()):
+        """ConjuntoClausulas(clausulas, nomes)
+
+        clausulas -> cláusulas no formato do ResolvedorSAT
+        nomes     -> lista com o nome do símbolo de cada variável (o nome
+                     da variável v é nomes[v - 1]); as variáveis sem nome
+                     recebem o próprio número como nome.
+        """
+        self.nomes = list(nomes)
+        self.literais = array.array("i")
+        self.inicios = array.array("i", [0])
+        self._maior_variavel = 0
+        for clausula in clausulas:
+            self.adicionar_clausula(clausula)
+
+    @classmethod
+    def de_expressao(cls, expr, converter=False):
+        """Cria o conjunto de cláusulas de uma Expressao na forma normal
+        conjuntiva (veja .transformar_em_forma_normal_conjuntiva()).
+
+        Se converter for verdadeiro, a expressão pode ter qualquer forma: as
+        cláusulas da forma normal conjuntiva equivalente são calculadas e
+        guardadas diretamente no conjunto, sem montar a árvore da forma
+        normal conjuntiva.
+        """
+        conjunto = cls()
+        indices = {}
+        if converter:
+            clausulas = (
+                [_literal_da_fnc(lit, indices, expr) for lit in c]
+                for c in _forma_normal_por_distribuicao(expr)
+            )
+        else:
+            clausulas = _iterar_clausulas_da_fnc(expr, indices)
+        for clausula in clausulas:
+            conjunto.adicionar_clausula(clausula)
+        for nome, v in sorted(indices.items(), key=lambda x: x[1]):
+            conjunto.nomes.append(nome)
+        return conjunto
+
+    def __repr__(self):
+        return "%s(%r, %r)" % (self.__class__.__name__, list(self), self.nomes)
+
+    def __eq__(self, other):
+        return (
+                isinstance(other, ConjuntoClausulas)
+            ) and (
+                self.nomes == other.nomes
+            ) and (
+                self.inicios == other.inicios
+            ) and (
+                self.literais == other.literais
+            )
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    @property
+    def nvars(self):
+        """Maior variável usada (ou com nome)."""
+        return max(self._maior_variavel, len(self.nomes))
+
+    def adicionar_clausula(self, clausula):
+        """Acrescenta uma cláusula (uma sequência de literais)."""
+        inicio = len(self.literais)
+        self.literais.extend(clausula)
+        if len(self.literais) > inicio:
+            maior = max(map(abs, self.literais[inicio:]))
+            self._maior_variavel = max(self._maior_variavel, maior)
+        self.inicios.append(len(self.literais))
+
+    def simplificar(self):
+        """Remove os literais repetidos, as cláusulas tautológicas e as
+        cláusulas subsumidas por outras (que contêm todos os literais de
+        outra cláusula). As cláusulas restantes mantêm a ordem.
+
+        >>> c = ConjuntoClausulas([[1, 2, 1], [2, -2], [1, 2, 3], [-3]])
+        >>> c.simplificar()
+        >>> list(c)
+        [[1, 2], [-3]]
+        """
+        clausulas = _simplificar_clausulas(self)
+        self.literais = array.array("i")
+        self.inicios = array.array("i", [0])
+        for clausula in clausulas:
+            self.adicionar_clausula(clausula)
+
+    def __len__(self):
+        return len(self.inicios) - 1
+
+    def __getitem__(self, i):
+        """Retorna a lista de literais da i-ésima cláusula."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("índice de cláusula fora do intervalo")
+        return self.literais[self.inicios[i]:self.inicios[i + 1]].tolist()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.literais[self.inicios[i]:self.inicios[i + 1]].tolist()
+
+    def nome(self, v):
+        """Retorna o nome do símbolo da variável v."""
+        if v <= len(self.nomes):
+            return self.nomes[v - 1]
+        return str(v)
+
+    def expressao(self):
+        """Retorna a Expressao na forma normal conjuntiva destas cláusulas.
+
+        Cada símbolo e cada negação são criados uma única vez e
+        compartilhados entre as cláusulas.
+        """
+        nomes = dict((v, self.nome(v)) for v in range(1, self.nvars + 1))
+        return Expressao(_expressao_das_clausulas(self, nomes))
+
+
+def escrever_dimacs(fnc, arquivo, nvars=None, nclausulas=None):
+    """Escreve uma fórmula na forma normal conjuntiva no formato DIMACS
+    ("p cnf").
+
+    fnc pode ser uma Expressao na forma normal conjuntiva, um
+    ConjuntoClausulas ou um iterável de cláusulas no formato do
+    ResolvedorSAT, como em resolver_sat(). arquivo pode ser um nome de
+    arquivo ou um arquivo aberto em modo texto.
+
+    As cláusulas são escritas aos poucos, sem montar o texto inteiro na
+    memória. O nome do símbolo de cada variável é escrito em um comentário
+    "c nome <variável> <nome>", que ler_dimacs() usa para restaurar os nomes.
+    Os nomes que não seriam lidos de volta como estão (vazios, com espaços
+    nas pontas, com quebras de linha ou começando com aspas) são escritos
+    entre aspas, como strings JSON.
+
+    O cabeçalho vem antes das cláusulas, mas um gerador de cláusulas só
+    pode ser percorrido uma vez. Nesse caso, nvars e nclausulas podem ser
+    passados; senão, o cabeçalho é escrito com espaços no lugar dos números
+    e reescrito no final, o que exige um arquivo que aceite seek(). Para
+    uma Expressao ou um ConjuntoClausulas, nvars pode declarar mais
+    variáveis do que as cláusulas usam; um nvars menor, ou um nclausulas
+    diferente do número de cláusulas, gera ValueError.
+
+    >>> import io
+    >>> A = ExpressaoSimbolo('A')
+    >>> B = ExpressaoSimbolo('B')
+    >>> arquivo = io.StringIO()
+    >>> escrever_dimacs(Expressao(A & (~ A | B)), arquivo)
+    >>> print(arquivo.getvalue().strip())
+    c nome 1 A
+    c nome 2 B
+    p cnf 2 2
+    1 0
+    -1 2 0
+    """
+    if not hasattr(arquivo, "write"):
+        with open(arquivo, "w") as f:
+            escrever_dimacs(fnc, f, nvars, nclausulas)
+        return
+
+    if isinstance(fnc, Expressao):
+        # The header comes first, so the clauses are counted in a first pass
+        # over the tree.
+        indices = {}
+        contadas = 0
+        for clausula in _iterar_clausulas_da_fnc(fnc, indices):
+            contadas += 1
+        nomes = [nome for nome, v in sorted(indices.items(), key=lambda x: x[1])]
+        nvars = _conferir_dimacs("nvars", nvars, len(nomes))
+        nclausulas = _conferir_dimacs("nclausulas", nclausulas, contadas)
+        clausulas = _iterar_clausulas_da_fnc(fnc, indices)
+    elif isinstance(fnc, ConjuntoClausulas):
+        nomes = fnc.nomes
+        nvars = _conferir_dimacs("nvars", nvars, fnc.nvars)
+        nclausulas = _conferir_dimacs("nclausulas", nclausulas, len(fnc))
+        clausulas = fnc
+    else:
+        nomes = []
+        clausulas = fnc
+        if isinstance(fnc, (list, tuple)):
+            if nvars is None:
+                nvars = max([abs(x) for c in fnc for x in c] or [0])
+            if nclausulas is None:
+                nclausulas = len(fnc)
+
+    for v, nome in enumerate(nomes, 1):
+        if nome != str(v):
+            arquivo.write("c nome %d %s\n" % (v, _nome_dimacs(nome)))
+    # Room for two 20-digit numbers, enough for any 64-bit count.
+    largura = len("p cnf ") + 20 + 1 + 20
+    if nvars is None or nclausulas is None:
+        try:
+            posicao = arquivo.tell()
+        except (AttributeError, EnvironmentError):
+            posicao = None
+        if posicao is None or not getattr(arquivo, "seekable", lambda: True)():
+            raise ValueError("informe nvars e nclausulas para escrever em um arquivo sem seek()")
+        arquivo.write("p cnf".ljust(largura) + "\n")
+    else:
+        posicao = None
+        arquivo.write("p cnf %d %d\n" % (nvars, nclausulas))
+
+    contadas = 0
+    maior = 0
+    linhas = []
+    for clausula in clausulas:
+        contadas += 1
+        if nvars is None and clausula:
+            maior = max(maior, max(abs(x) for x in clausula))
+        linhas.append(" ".join(map(str, clausula)) + " 0\n")
+        if len(linhas) >= 4096:
+            arquivo.write("".join(linhas))
+            del linhas[:]
+    arquivo.write("".join(linhas))
+
+    if posicao is not None:
+        cabecalho = "p cnf %d %d" % (
+            maior if nvars is None else nvars,
+            contadas if nclausulas is None else nclausulas,
+        )
+        arquivo.seek(posicao)
+        arquivo.write(cabecalho.ljust(largura))
+        arquivo.seek(0, 2)
+
+
+def _conferir_dimacs(parametro, valor, contado):
+    """Retorna o valor de nvars ou nclausulas passado a escrever_dimacs(), ou
+    o contado nas cláusulas se não foi passado."""
+    if valor is None:
+        return contado
+    # Declaring more variables than the clauses use is valid DIMACS.
+    if (valor < contado) if parametro == "nvars" else (valor != contado):
+        raise ValueError("%s=%d não combina com as cláusulas (%d)" % (parametro, valor, contado))
+    return valor
+
+
+def _nome_dimacs(nome):
+    """Retorna o nome como é escrito em um comentário "c nome" (veja
+    escrever_dimacs())."""
+    if nome and nome == nome.strip() and nome[0] != '"' and not any(
+        c.isspace() and c != " " for c in nome
+    ):
+        return nome
+    return json.dumps(nome)
+
+
+def _clausulas_dimacs(linhas, nomes):
+    """Gera as cláusulas das linhas (bytes) de um texto DIMACS, guardando em
+    nomes os nomes lidos dos comentários "c nome"."""
+    clausula = []
+    for numero, linha in enumerate(linhas, 1):
+        partes = linha.split()
+        if not partes:
+            continue
+        inicio = partes[0][:1]
+        if inicio == b"c":
+            if len(partes) >= 4 and partes[1] == b"nome":
+                nome = linha.split(None, 3)[3].strip().decode("utf-8")
+                if nome.startswith('"'):
+                    try:
+                        nome = json.loads(nome)
+                    except ValueError:
+                        raise ValueError("nome inválido na linha %d: %r" % (numero, linha.strip()))
+                nomes[int(partes[2])] = nome
+            continue
+        if inicio == b"p":
+            if len(partes) != 4 or partes[1] != b"cnf":
+                raise ValueError("cabeçalho DIMACS não suportado: %r" % (linha.strip(), ))
+            continue
+        if inicio == b"%":
+            # End of the formula in the SATLIB files.
+            break
+        try:
+            literais = [int(x) for x in partes]
+        except ValueError:
+            raise ValueError("literal inválido na linha %d: %r" % (numero, linha.strip()))
+        if not clausula and literais[-1] == 0 and literais.count(0) == 1:
+            # The usual case: one clause per line.
+            literais.pop()
+            yield literais
+            continue
+        for x in literais:
+            if x:
+                clausula.append(x)
+            else:
+                yield clausula
+                clausula = []
+    if clausula:
+        # The last clause may lack its 0.
+        yield clausula
+
+
+def iterar_dimacs(arquivo, nomes=None):
+    """Gera as cláusulas (no formato do ResolvedorSAT) de um arquivo no
+    formato DIMACS, uma de cada vez.
+
+    arquivo pode ser um nome de arquivo ou um arquivo aberto, que é lido a
+    partir da sua posição atual. Sempre que possível, o arquivo é mapeado
+    na memória (mmap) em vez de lido, então arquivos grandes não são
+    carregados inteiros; nesse caso, a posição do arquivo não muda. Se o
+    dict nomes for passado, ele recebe o nome de cada variável que tiver um
+    comentário "c nome" (veja escrever_dimacs()).
+    """
+    if nomes is None:
+        nomes = {}
+    if not hasattr(arquivo, "read"):
+        with open(arquivo, "rb") as f:
+            for clausula in iterar_dimacs(f, nomes):
+                yield clausula
+        return
+
+    try:
+        posicao = arquivo.tell()
+        dados = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, EnvironmentError, ValueError):
+        # Not a real file (or an empty one, which can't be mapped).
+        dados = arquivo.read()
+        if not isinstance(dados, bytes):
+            dados = dados.encode("utf-8")
+        linhas = io.BytesIO(dados)
+    else:
+        dados.seek(posicao)
+        linhas = iter(dados.readline, b"")
+    try:
+        for clausula in _clausulas_dimacs(linhas, nomes):
+            yield clausula
+    finally:
+        if isinstance(dados, mmap.mmap):
+            dados.close()
+
+
+def ler_dimacs(arquivo, expressao=False):
+    """Lê um arquivo no formato DIMACS (veja iterar_dimacs()).
+
+    Retorna um ConjuntoClausulas ou, se expressao for verdadeiro, a Expressao
+    na forma normal conjuntiva correspondente.
+
+    >>> import io
+    >>> arquivo = io.StringIO(u"c nome 1 A\\np cnf 2 2\\n1 0\\n-1 2 0\\n")
+    >>> c = ler_dimacs(arquivo)
+    >>> c.nomes, c.nome(2), list(c)
+    (['A'], '2', [[1], [-1, 2]])
+    """
+    nomes = {}
+    conjunto = ConjuntoClausulas()
+    for clausula in iterar_dimacs(arquivo, nomes):
+        conjunto.adicionar_clausula(clausula)
+    if nomes:
+        conjunto.nomes = [nomes.get(v, str(v)) for v in range(1, max(nomes) + 1)]
+    if expressao:
+        return conjunto.expressao()
+    return conjunto
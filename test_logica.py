@@ -3,10 +3,33 @@
 # vi:ts=4 sw=4 et foldmethod=indent foldlevel=1
 
 import unittest
+import copy
+import io
+import itertools
+import os
+import pickle
+import random
+import shutil
 import string
 import sys
+import tempfile
+import weakref
+import logica
 from logica import *
 
+if sys.version_info.major >= 3:
+    from functools import reduce
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
 ascii_uppercase = string.ascii_uppercase if sys.version_info.major >= 3 else string.uppercase
 
 # Este arquivo executa dois tipos de teste:
@@ -14,6 +37,25 @@ ascii_uppercase = string.ascii_uppercase if sys.version_info.major >= 3 else str
 # * testes de documentação, usando o módulo 'doctest'
 
 
+def expressao_aleatoria(aleatorio, simbolos, profundidade):
+    if profundidade == 0 or aleatorio.random() < 0.2:
+        return aleatorio.choice(simbolos)
+    operador = aleatorio.choice(("&", "|", "~", ">", "^", "()"))
+    a = expressao_aleatoria(aleatorio, simbolos, profundidade - 1)
+    b = expressao_aleatoria(aleatorio, simbolos, profundidade - 1)
+    if operador == "&":
+        return a & b
+    if operador == "|":
+        return a | b
+    if operador == "~":
+        return ~ a
+    if operador == ">":
+        return a > b
+    if operador == "^":
+        return a ^ b
+    return Expressao(a)
+
+
 class TestarExpressoes(unittest.TestCase):
     def setUp(self):
         # Ugly... Writing to globals()...
@@ -232,6 +274,122 @@ class TestarExpressoes(unittest.TestCase):
             self.assertEqual(e == f, equal, "%s == %s  ==>  %s" % (str(e), str(f), not equal))
             self.assertEqual(e.comparar_ignorando_ordem(f), comparacao, "%s .comparar_ignorando_ordem( %s )  ==>  return '%s' == '%s'" % (str(e), str(f), e.sort_key, f.sort_key))
 
+    def test_chaves_de_ordenacao_em_cache(self):
+        e = Expressao((A & (B | C)) | ~ D)
+        f = Expressao(~ D | ((C | B) & A))
+        g = Expressao(~ D | ((C | B) & A))
+        self.assertTrue(isinstance(e.sort_key, int))
+        self.assertTrue(e.comparar_ignorando_ordem(f))
+        self.assertTrue(f.comparar_ignorando_ordem(g))
+
+        # Changing a node deep inside f makes all the keys stale.
+        ou = f.children[0].children[1].children[0]
+        ou.children = [C, D]
+        self.assertFalse(e.comparar_ignorando_ordem(f))
+        self.assertFalse(f.comparar_ignorando_ordem(g))
+        ou.children = [B, C]
+        self.assertTrue(e.comparar_ignorando_ordem(f))
+
+        # Transformations invalidate the keys too.
+        e.remover_associativas()
+        e.transformar_em_forma_normal_conjuntiva()
+        f.transformar_em_forma_normal_conjuntiva()
+        self.assertTrue(e.comparar_ignorando_ordem(f))
+        self.assertFalse(e.comparar_ignorando_ordem(g))
+
+        # The key of a symbol follows its name.
+        s = ExpressaoSimbolo("X")
+        chave = s.sort_key
+        s.name = "Y"
+        self.assertNotEqual(s.sort_key, chave)
+        self.assertEqual(s.sort_key, ExpressaoSimbolo("Y").sort_key)
+
+        # Parentheses are not ignored.
+        self.assertFalse(Expressao(A).comparar_ignorando_ordem(A))
+        self.assertFalse((A & B).comparar_ignorando_ordem(A | B))
+
+    def test_chaves_de_outras_expressoes(self):
+        s = A & B
+        e = Expressao(s | C)
+        f = Expressao(~ s)
+        g = Expressao(A | (C & D))
+        chaves = [x.sort_key for x in (e, f, g)]
+        hashes = [hash(x) for x in (e, f, g)]
+
+        # Changing an unrelated expression doesn't change the keys.
+        h = Expressao(A & C)
+        h.sort_key
+        h.children[0].children = [D, B]
+        self.assertEqual([x.sort_key for x in (e, f, g)], chaves)
+
+        # Changing a shared node changes every expression that uses it.
+        s.children = [A, D]
+        self.assertEqual(e.sort_key, Expressao((A & D) | C).sort_key)
+        self.assertEqual(hash(f), hash(Expressao(~ (A & D))))
+        self.assertEqual(g.sort_key, chaves[2])
+        self.assertEqual(hash(g), hashes[2])
+        self.assertNotEqual(e.sort_key, chaves[0])
+
+        # So does replacing a child, even if the old one is changed later.
+        e.children[0].children = [s, D]
+        self.assertEqual(e.sort_key, Expressao((A & D) | D).sort_key)
+        self.assertEqual(e.simbolos(), set("AD"))
+        x = ExpressaoSimbolo("x")
+        e.children[0].children = [s, x]
+        self.assertEqual(e.simbolos(), set(["A", "D", "x"]))
+        x.name = "y"
+        self.assertEqual(e.simbolos(), set(["A", "D", "y"]))
+        self.assertEqual(e.sort_key, Expressao((A & D) | ExpressaoSimbolo("y")).sort_key)
+
+    def test_hash(self):
+        expressoes = [
+            Expressao((A & B) | ~ C),
+            Expressao((A & B) | ~ C),
+            Expressao((B & A) | ~ C),
+            Expressao(~ C | (A & B)),
+            (A & B) | ~ C,
+            A & B,
+            B & A,
+        ]
+        for e in expressoes:
+            for f in expressoes:
+                if e == f:
+                    self.assertEqual(hash(e), hash(f))
+                if e.comparar_ignorando_ordem(f):
+                    self.assertEqual(e.hash_ignorando_ordem(), f.hash_ignorando_ordem())
+        self.assertEqual(len(set(expressoes)), 6)
+        self.assertEqual(len(set(e.hash_ignorando_ordem() for e in expressoes)), 3)
+
+        d = {expressoes[0]: 1}
+        self.assertEqual(d[expressoes[1]], 1)
+        self.assertFalse(expressoes[2] in d)
+
+        # Changing the children gives a new hash.
+        e = Expressao((A & B) | ~ C)
+        h = hash(e)
+        e.children[0].children[1].children = [D]
+        self.assertNotEqual(hash(e), h)
+        self.assertEqual(hash(e), hash(Expressao((A & B) | ~ D)))
+
+        # == uses the cached hashes, which must follow the changes.
+        f = Expressao((A & B) | ~ D)
+        hash(f)
+        self.assertTrue(e == f)
+        e.children[0].children[1].children = [C]
+        self.assertFalse(e == f)
+        self.assertTrue(e == Expressao((A & B) | ~ C))
+
+    def test_chaves_de_ordenacao_internadas(self):
+        e = ((A & B) | C).internar()
+        f = (C | (B & A)).internar()
+        self.assertTrue(e.comparar_ignorando_ordem(f))
+        # Keys of mutable expressions changing elsewhere don't affect them.
+        g = A & B
+        g.sort_key
+        g.children = [B, C]
+        self.assertTrue(e.comparar_ignorando_ordem(f))
+        self.assertEqual(e.sort_key, (C | (A & B)).sort_key)
+
     #################################################################
     # Testes de manipulações
     #
@@ -512,6 +670,120 @@ class TestarExpressoes(unittest.TestCase):
             e.transformar_em_forma_normal_conjuntiva()
             self.assertEqual(e, r)
 
+    def test_forma_normal_conjuntiva_aninhada(self):
+        # ORs and ANDs alternating in several levels
+        e = Expressao((((A & B) | C) & D) | E)
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(
+            ExpressaoOr(A, C, E),
+            ExpressaoOr(B, C, E),
+            ExpressaoOr(D, E),
+        )))
+
+        e = Expressao(~ ((~ A | B) & (C | ~ (D & E))) | F)
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(
+            ExpressaoOr(A, ~ C, F),
+            ExpressaoOr(A, D, F),
+            ExpressaoOr(A, E, F),
+            ExpressaoOr(~ B, ~ C, F),
+            ExpressaoOr(~ B, D, F),
+            ExpressaoOr(~ B, E, F),
+        )))
+
+        # Parentheses don't stop the transformation
+        e = Expressao(~ Expressao(A | Expressao(B & C)))
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(~ A, ExpressaoOr(~ B, ~ C))))
+
+    def test_forma_normal_conjuntiva_operandos_iguais(self):
+        # Equal operands are distributed once, with no (A | B) clause
+        e = Expressao((A & B) | (A & B))
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(A, B)))
+
+        e = Expressao(((A & B) | C) | (A & B))
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(
+            ExpressaoOr(A, C),
+            ExpressaoOr(B, C),
+        )))
+
+    def test_forma_normal_conjuntiva_aleatoria(self):
+        aleatorio = random.Random(12)
+        for _ in range(200):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D], 4))
+            f = Expressao(e.children[0])
+            f.transformar_em_forma_normal_conjuntiva()
+            # resolver_sat() rejects expressions not in the CNF.
+            resolver_sat(f)
+            self.assertTrue(Formula(f) == Formula(e))
+
+    def test_forma_normal_conjuntiva_simplificada(self):
+        e = Expressao((A | B) & (A | B | C) & A & (B | ~ B | A) & (C | C | ~ A))
+        e.transformar_em_forma_normal_conjuntiva(simplificar=True)
+        self.assertEqual(str(e), "((A & (C | ~ A)))")
+
+        e = ExpressaoAnd(A | ~ A, ~ B | B)
+        e.transformar_em_forma_normal_conjuntiva(simplificar=True)
+        self.assertEqual(str(e), "((A | ~ A))")
+
+        aleatorio = random.Random(14)
+        for _ in range(200):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D], 4))
+            f = Expressao(e.children[0])
+            f.transformar_em_forma_normal_conjuntiva()
+            g = Expressao(e.children[0])
+            g.transformar_em_forma_normal_conjuntiva(simplificar=True)
+            resolver_sat(g)
+            self.assertTrue(len(ConjuntoClausulas.de_expressao(g)) <=
+                            len(ConjuntoClausulas.de_expressao(f)))
+            for valores in itertools.product([Verdadeiro, Falso], repeat=4):
+                valores = dict(zip("ABCD", valores))
+                self.assertEqual(g.eval(valores), e.eval(valores))
+
+    def test_forma_normal_disjuntiva(self):
+        e = Expressao(~ (A | B) & (C | D))
+        e.transformar_em_forma_normal_disjuntiva(simplificar=False)
+        self.assertEqual(str(e), "(((~ A & ~ B & C) | (~ A & ~ B & D)))")
+
+        e = Expressao((A | B) & (A | C) & (B | ~ B))
+        e.transformar_em_forma_normal_disjuntiva()
+        self.assertEqual(str(e), "(((A & B) | (A & ~ B) | (B & C)))")
+
+        e = Expressao(A & ~ A & (B | C))
+        e.transformar_em_forma_normal_disjuntiva()
+        self.assertEqual(str(e), "((A & ~ A & B))")
+
+        e = ExpressaoOr(A & B, ~ (~ A | C), A)
+        e.transformar_em_forma_normal_disjuntiva()
+        self.assertEqual(str(e), "(A)")
+
+        aleatorio = random.Random(15)
+        for _ in range(200):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D], 4))
+            for simplificar in (False, True):
+                f = Expressao(e.children[0])
+                f.transformar_em_forma_normal_disjuntiva(simplificar)
+                # The negation of a DNF, with the negations pushed inwards,
+                # is in the CNF.
+                g = Expressao(~ f.children[0])
+                g.interiorizar_negacao()
+                g.remover_duplas_negacoes()
+                resolver_sat(g)
+                for valores in itertools.product([Verdadeiro, Falso], repeat=4):
+                    valores = dict(zip("ABCD", valores))
+                    self.assertEqual(f.eval(valores), e.eval(valores))
+
+    def test_forma_normal_disjuntiva_absorcao(self):
+        # Without absorption during the distribution, this would have 2**n
+        # terms before any simplification.
+        n = 40
+        simbolos = [ExpressaoSimbolo("S%d" % i) for i in range(n)]
+        e = Expressao(ExpressaoAnd(*[A | s for s in simbolos]))
+        e.transformar_em_forma_normal_disjuntiva()
+        self.assertEqual(e, Expressao(A | ExpressaoAnd(*simbolos)))
+
     def test_remover_operacoes_vazias(self):
         expressoes = (
             Expressao(ExpressaoAnd()),
@@ -651,6 +923,1685 @@ class TestarExpressoes(unittest.TestCase):
 
 
 
+class SimbolosGlobais(object):
+    """Cria um símbolo para cada letra maiúscula em globals() antes de cada
+    teste, e os remove depois."""
+
+    def setUp(self):
+        # Ugly... Writing to globals()...
+        # But it is damn handy! :)
+        criar_simbolos_no_namespace(ascii_uppercase, globals())
+
+    def tearDown(self):
+        for i in ascii_uppercase:
+            del globals()[i]
+
+
+class TestarFormula(SimbolosGlobais, unittest.TestCase):
+    # Fórmulas usadas em vários testes
+    lambdas = (
+        (lambda A,B,C: ((~A & (A|B)) > B), 3),
+        (lambda A: A & ~A, 1),
+        (lambda A: A | ~A, 1),
+        (lambda A,B,C: ~(A & B & ~C), 3),
+        (lambda A,B,C,D: (A ^ B) | (C > D), 4),
+        (lambda A,B: Verdadeiro, 2),
+        (lambda A,B: A & Falso, 2),
+    )
+
+    def test_operadores_booleano(self):
+        valores = (Verdadeiro, Falso)
+        for a in valores:
+            self.assertTrue(~ a is Booleano(not a))
+            self.assertTrue(- a is Booleano(not a))
+            for b in valores:
+                self.assertTrue(a & b is Booleano(a and b))
+                self.assertTrue(a | b is Booleano(a or b))
+                self.assertTrue(a ^ b is Booleano(a != b))
+                self.assertTrue((a > b) is Booleano(not a or b))
+                # Operands of other types
+                for outro in (bool(b), int(b)):
+                    self.assertTrue(a & outro is Booleano(a and b))
+                    self.assertTrue(a | outro is Booleano(a or b))
+                    self.assertTrue(a ^ outro is Booleano(a != b))
+                    self.assertEqual(a > outro, not a or b)
+                # Booleano is a subclass of int, so its reflected operators
+                # are tried first (but not for bool, which handles them).
+                self.assertTrue(int(b) & a is Booleano(a and b))
+                self.assertTrue(int(b) | a is Booleano(a or b))
+
+    #################################################################
+    # Testes da tabela verdade bit-paralela
+
+    def test_mascara_variavel(self):
+        f = Formula(lambda A,B,C: A, 3)
+        self.assertEqual(f.tbverdade, [Verdadeiro]*4 + [Falso]*4)
+        f = Formula(lambda A,B,C: B, 3)
+        self.assertEqual(f.tbverdade, [Verdadeiro]*2 + [Falso]*2 + [Verdadeiro]*2 + [Falso]*2)
+        f = Formula(lambda A,B,C: C, 3)
+        self.assertEqual(f.tbverdade, [Verdadeiro, Falso]*4)
+
+    def test_bitparalelo_igual_linha_a_linha(self):
+        for expr, nvars in self.lambdas:
+            f = Formula(expr, nvars)
+            g = Formula(expr, nvars, bitparalelo=False)
+            self.assertEqual(f.tbverdade, g.tbverdade)
+            self.assertEqual(f.tbmascara, g.tbmascara)
+            self.assertEqual(f.tautologia(), g.tautologia())
+            self.assertEqual(f.contradicao(), g.contradicao())
+            self.assertTrue(f == g)
+
+    def test_bitparalelo_fallback(self):
+        # "and", "or" e "if" não funcionam com VetorBooleano.
+        f = Formula(lambda A,B: A and not B, 2)
+        self.assertEqual(f.tbverdade, [False, True, Falso, Falso])
+        self.assertEqual(f.contradicao(), Falso)
+        self.assertEqual(f.tautologia(), Falso)
+        self.assertTrue(f == Formula(lambda A,B: A & ~B, 2))
+
+    def test_bitparalelo_constante_a_esquerda(self):
+        # "c < A" chama A.__gt__(c), que é a implicação.
+        for c in (Verdadeiro, Falso, True, False, 1, 0):
+            for expr in (
+                lambda A: c < A,
+                lambda A: A > c,
+                lambda A: c > A,
+                lambda A, B: (c < A) | (B > c),
+            ):
+                nvars = expr.__code__.co_argcount
+                f = Formula(expr, nvars)
+                g = Formula(expr, nvars, bitparalelo=False)
+                self.assertEqual(f.tbverdade, g.tbverdade)
+
+    def test_bitparalelo_expressao(self):
+        e = Expressao((A & B & C) | (~A & ~B) | ~C)
+        f = Formula(e)
+        g = Formula(lambda A,B,C: (A & B & C) | (~A & ~B) | ~C, 3, bitparalelo=False)
+        self.assertEqual(f.nvars, 3)
+        self.assertEqual(f.tbverdade, g.tbverdade)
+        self.assertTrue(f == g)
+
+    def test_formulas_diferentes(self):
+        self.assertFalse(Formula(lambda A,B: A & B, 2) == Formula(lambda A,B: A | B, 2))
+        self.assertFalse(Formula(lambda A: A | ~A, 1) == Formula(lambda A,B: A | ~A, 2))
+
+    #################################################################
+    # Testes da tabela verdade calculada em blocos
+
+    def test_blocos_igual_tabela(self):
+        for expr, nvars in self.lambdas:
+            f = Formula(expr, nvars)
+            g = Formula(expr, nvars, materializar=False)
+            self.assertEqual(g.tbverdade, None)
+            self.assertEqual(list(g.linhas()), f.tbverdade)
+            self.assertEqual(list(f.linhas()), f.tbverdade)
+            self.assertEqual(g.contar_verdadeiros(), f.tbverdade.count(Verdadeiro))
+            self.assertEqual(g.tautologia(), f.tautologia())
+            self.assertEqual(g.contradicao(), f.contradicao())
+            self.assertTrue(f == g)
+            self.assertTrue(g == f)
+
+    def test_blocos_pequenos(self):
+        f = Formula(lambda A,B,C,D: (A ^ B) | (C > D), 4)
+        for bitparalelo in (True, False):
+            g = Formula(lambda A,B,C,D: (A ^ B) | (C > D), 4,
+                bitparalelo=bitparalelo, materializar=False)
+            g.bits_por_bloco = 2
+            blocos = list(g.blocos())
+            self.assertEqual([(p, n) for p, n, m in blocos], [(0, 4), (4, 4), (8, 4), (12, 4)])
+            self.assertEqual(list(g.linhas()), f.tbverdade)
+            self.assertTrue(f == g)
+
+    def test_muitas_variaveis(self):
+        f = Formula(lambda *args: args[0] | ~ args[0] | args[19], 20)
+        self.assertEqual(f.nvars, 20)
+        self.assertEqual(f.tbverdade, None)
+        self.assertEqual(f.tautologia(), Verdadeiro)
+        self.assertEqual(f.contradicao(), Falso)
+        self.assertEqual(f.contar_verdadeiros(), 2 ** 20)
+
+        g = Formula(lambda *args: args[7] & ~ args[19], 20)
+        self.assertEqual(g.tautologia(), Falso)
+        self.assertEqual(g.contradicao(), Falso)
+        self.assertEqual(g.contar_verdadeiros(), 2 ** 18)
+        self.assertFalse(f == g)
+        self.assertTrue(g == Formula(lambda *args: ~ (~ args[7] | args[19]), 20))
+
+    def test_muitas_variaveis_expressao(self):
+        simbolos = [ExpressaoSimbolo(c) for c in ascii_uppercase[:20]]
+        e = reduce(lambda x, y: x | y, simbolos)
+        f = Formula(e)
+        self.assertEqual(f.nvars, 20)
+        self.assertEqual(f.contar_verdadeiros(), 2 ** 20 - 1)
+        self.assertEqual(f.tautologia(), Falso)
+        self.assertEqual(f.contradicao(), Falso)
+
+    def test_parar_no_primeiro_bloco(self):
+        chamadas = []
+        def expr(*args):
+            chamadas.append(args)
+            return args[17] and args[0]
+        f = Formula(expr, 18)
+        self.assertEqual(f.tautologia(), Falso)
+        self.assertFalse(f.bitparalelo)
+        # Uma chamada com VetorBooleano, depois as duas primeiras linhas.
+        self.assertEqual(len(chamadas), 3)
+
+    #################################################################
+    # Testes de exemplos e contraexemplos
+
+    def test_tabela_calculada_sob_demanda(self):
+        chamadas = []
+        def expr(A, B):
+            chamadas.append((A, B))
+            return A | B
+        f = Formula(expr, 2, bitparalelo=False)
+        self.assertEqual(chamadas, [])
+        self.assertEqual(f.contradicao(), Falso)
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(f.tbverdade, [Verdadeiro, Verdadeiro, Verdadeiro, Falso])
+
+    def test_exemplo_contraexemplo(self):
+        for bitparalelo in (True, False):
+            f = Formula(lambda A,B,C: (A & ~B) > C, 3, bitparalelo=bitparalelo)
+            self.assertEqual(f.contraexemplo(), (Verdadeiro, Falso, Falso))
+            self.assertEqual(f.exemplo(), (Verdadeiro, Verdadeiro, Verdadeiro))
+
+            f = Formula(lambda A,B: A | ~ A, 2, bitparalelo=bitparalelo)
+            self.assertEqual(f.contraexemplo(), None)
+            self.assertEqual(f.exemplo(), (Verdadeiro, Verdadeiro))
+
+            f = Formula(lambda A,B: A & ~ A, 2, bitparalelo=bitparalelo)
+            self.assertEqual(f.contraexemplo(), (Verdadeiro, Verdadeiro))
+            self.assertEqual(f.exemplo(), None)
+
+    def test_contraexemplo_muitas_variaveis(self):
+        f = Formula(lambda *args: args[0] | args[1] | args[19], 20)
+        self.assertEqual(f.contraexemplo(), (Falso, Falso) + (Verdadeiro,) * 17 + (Falso, ))
+        self.assertEqual(f.exemplo(), (Verdadeiro,) * 20)
+
+    def test_diferenca(self):
+        f = Formula(lambda A,B,C: A & (B | C), 3)
+        for bitparalelo in (True, False):
+            g = Formula(lambda A,B,C: (A & B) | (A & C), 3, bitparalelo=bitparalelo)
+            h = Formula(lambda A,B,C: (A & B) | C, 3, bitparalelo=bitparalelo)
+            self.assertEqual(f.diferenca(g), None)
+            self.assertEqual(g.diferenca(f), None)
+            self.assertEqual(f.diferenca(h), (Falso, Verdadeiro, Verdadeiro))
+            self.assertEqual(h.diferenca(f), (Falso, Verdadeiro, Verdadeiro))
+
+    def test_diferenca_blocos_diferentes(self):
+        f = Formula(lambda *args: args[3] & args[18], 20)
+        g = Formula(lambda *args: args[3] and args[18] and (args[16] or args[19]), 20)
+        self.assertEqual(f.diferenca(g), (Verdadeiro,) * 16 + (Falso, Verdadeiro, Verdadeiro, Falso))
+        self.assertFalse(f == g)
+        self.assertFalse(g == f)
+
+    #################################################################
+    # Testes de Expressao.compilar()
+
+    def test_compilar_igual_eval(self):
+        expressoes = (
+            A,
+            ~ A,
+            Expressao(A & B),
+            Expressao(ExpressaoNot(Expressao(A))),
+            ExpressaoAnd(A, B, C),
+            ExpressaoOr(A, B, C),
+            (A & ~B) > C,
+            (A ^ B) | ~ (C & D),
+        )
+        for e in expressoes:
+            simbolos = sorted(e.simbolos())
+            f = e.compilar()
+            for linha in itertools.product((Verdadeiro, Falso), repeat=len(simbolos)):
+                self.assertEqual(f(*linha), e.eval(dict(zip(simbolos, linha))))
+
+    def test_compilar_cache(self):
+        e = Expressao(A & B)
+        f = e.compilar()
+        self.assertTrue(e.compilar() is f)
+        self.assertEqual(f(Verdadeiro, Falso), Falso)
+
+        # Modificar a expressão invalida a função guardada.
+        e.children = [A | B]
+        g = e.compilar()
+        self.assertFalse(g is f)
+        self.assertEqual(g(Verdadeiro, Falso), Verdadeiro)
+
+        # So does modifying a node deep inside it.
+        e.children[0].children = [A, ~ B]
+        h = e.compilar()
+        self.assertFalse(h is g)
+        self.assertEqual(h(Falso, Verdadeiro), Falso)
+        x = ExpressaoSimbolo("x")
+        e.children[0].children[1].children = [x]
+        self.assertEqual(e.compilar()(Falso, Verdadeiro), Falso)
+        # The arguments are now ("0", "A").
+        x.name = "0"
+        self.assertEqual(e.compilar()(Verdadeiro, Falso), Falso)
+        self.assertTrue(e.compilar() is e.compilar())
+
+    def test_compilar_subexpressao_compartilhada(self):
+        x = A & B
+        e = x | ~ x
+        self.assertEqual(e._gerar_fonte(TabelaSimbolos(["A", "B"])).count("&"), 1)
+        self.assertTrue(Formula(e).tautologia())
+
+    def test_compilar_operacao_vazia(self):
+        self.assertRaises(TypeError, Expressao(A | ExpressaoAnd()).compilar)
+
+    def test_compilar_na_formula(self):
+        # The bit-parallel path calls the function once, with .eval();
+        # evaluating row by row compiles it.
+        e = Expressao((A & B) | ~ C)
+        f = Formula(e)
+        self.assertEqual(f.tautologia(), Falso)
+        self.assertFalse(f.expr is e.compilar())
+        g = Formula(e, bitparalelo=False)
+        self.assertEqual(g.tbverdade, f.tbverdade)
+        self.assertTrue(g.expr is e.compilar())
+
+    def test_formula_sem_variaveis(self):
+        f = Formula(lambda: Verdadeiro, 0)
+        self.assertEqual(f.tbverdade, [])
+        self.assertEqual(f.tautologia(), Verdadeiro)
+        self.assertEqual(f.contradicao(), Verdadeiro)
+
+    def test_eval_and_or_n_ario(self):
+        e = ExpressaoAnd(A, B, C)
+        f = ExpressaoOr(A, B, C)
+        for a in (Verdadeiro, Falso):
+            for b in (Verdadeiro, Falso):
+                for c in (Verdadeiro, Falso):
+                    d = {"A": a, "B": b, "C": c}
+                    self.assertEqual(e.eval(d), a & b & c)
+                    self.assertEqual(f.eval(d), a | b | c)
+
+
+
+
+
+@unittest.skipIf(numpy is None, "numpy não está instalado")
+class TestarAvaliacaoEmLote(SimbolosGlobais, unittest.TestCase):
+    def test_avaliar_lote_igual_eval(self):
+        expressoes = (
+            A,
+            ~ A,
+            Expressao(A & B),
+            A | B | C,
+            ExpressaoAnd(A, B, C),
+            (A & ~B) > C,
+            (A ^ B) | ~ (C & D),
+        )
+        for e in expressoes:
+            simbolos = sorted(e.simbolos())
+            valoracoes = list(itertools.product((True, False), repeat=len(simbolos)))
+            resultado = e.avaliar_lote(valoracoes)
+            self.assertEqual(resultado.shape, (len(valoracoes), ))
+            self.assertEqual(resultado.dtype, numpy.bool_)
+            for linha, valor in zip(valoracoes, resultado):
+                d = dict(
+                    (s, Verdadeiro if v else Falso)
+                    for s, v in zip(simbolos, linha)
+                )
+                self.assertEqual(bool(e.eval(d)), bool(valor))
+
+    def test_avaliar_lote_nao_altera_entrada(self):
+        valoracoes = numpy.array([[True], [False]])
+        resultado = A.avaliar_lote(valoracoes)
+        resultado[0] = False
+        self.assertTrue(valoracoes[0, 0])
+
+    def test_avaliar_lote_colunas_erradas(self):
+        self.assertRaises(AssertionError, (A & B).avaliar_lote, [[True]])
+
+
+
+
+
+class TestarResolvedorSAT(SimbolosGlobais, unittest.TestCase):
+    def satisfaz(self, modelo, clausulas):
+        verdadeiros = set(modelo)
+        return all(any(x in verdadeiros for x in c) for c in clausulas)
+
+    def forca_bruta(self, clausulas, nvars):
+        for valores in itertools.product((True, False), repeat=nvars):
+            modelo = [v if valores[v - 1] else -v for v in range(1, nvars + 1)]
+            if self.satisfaz(modelo, clausulas):
+                return True
+        return False
+
+    def casa_dos_pombos(self, pombos, casas):
+        """Cláusulas (insatisfatíveis se pombos > casas) que colocam cada
+        pombo em uma casa, sem dois pombos na mesma casa."""
+        v = lambda i, j: i * casas + j + 1
+        clausulas = [[v(i, j) for j in range(casas)] for i in range(pombos)]
+        for j in range(casas):
+            for a in range(pombos):
+                for b in range(a + 1, pombos):
+                    clausulas.append([-v(a, j), -v(b, j)])
+        return clausulas
+
+    def test_clausulas_aleatorias(self):
+        aleatorio = random.Random(42)
+        for _ in range(300):
+            nvars = aleatorio.randint(1, 8)
+            clausulas = [
+                [aleatorio.choice((1, -1)) * aleatorio.randint(1, nvars)
+                    for _ in range(aleatorio.randint(1, 3))]
+                for _ in range(aleatorio.randint(1, 40))
+            ]
+            modelo = ResolvedorSAT(clausulas).resolver()
+            self.assertEqual(modelo is not None, self.forca_bruta(clausulas, nvars))
+            if modelo is not None:
+                self.assertTrue(self.satisfaz(modelo, clausulas))
+
+    def test_casa_dos_pombos(self):
+        self.assertEqual(ResolvedorSAT(self.casa_dos_pombos(6, 5)).resolver(), None)
+        clausulas = self.casa_dos_pombos(5, 5)
+        modelo = ResolvedorSAT(clausulas).resolver()
+        self.assertTrue(self.satisfaz(modelo, clausulas))
+
+    def test_3sat_aleatorio(self):
+        aleatorio = random.Random(7)
+        nvars = 100
+        clausulas = [
+            [aleatorio.choice((1, -1)) * v for v in aleatorio.sample(range(1, nvars + 1), 3)]
+            for _ in range(350)
+        ]
+        modelo = ResolvedorSAT(clausulas).resolver()
+        self.assertEqual(len(modelo), nvars)
+        self.assertTrue(self.satisfaz(modelo, clausulas))
+
+    def test_clausulas_triviais(self):
+        self.assertEqual(ResolvedorSAT([]).resolver(), [])
+        self.assertEqual(ResolvedorSAT([[]]).resolver(), None)
+        self.assertEqual(ResolvedorSAT([[1, -1]]).resolver(), [-1])
+        self.assertEqual(ResolvedorSAT([[2], [-1, -2]]).resolver(), [-1, 2])
+        self.assertEqual(ResolvedorSAT([[1], [-1]]).resolver(), None)
+        self.assertRaises(ValueError, ResolvedorSAT, [[1, 0]])
+
+    def test_resolvedor_incremental(self):
+        r = ResolvedorSAT([[1, 2, 3]])
+        self.assertTrue(self.satisfaz(r.resolver(), [[1, 2, 3]]))
+        r.adicionar_clausula([-1])
+        r.adicionar_clausula([-2])
+        self.assertEqual(r.resolver(), [-1, -2, 3])
+        r.adicionar_clausula([-3])
+        self.assertEqual(r.resolver(), None)
+
+    def test_resolver_sat_expressao(self):
+        e = Expressao((A | B) & (~ A | C) & (~ C | ~ B))
+        e.transformar_em_forma_normal_conjuntiva()
+        modelo = resolver_sat(e)
+        self.assertEqual(sorted(modelo), ['A', 'B', 'C'])
+        self.assertEqual(e.eval(modelo), Verdadeiro)
+
+        e = Expressao((A | B) & ~ A & ~ B)
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(resolver_sat(e), None)
+
+        self.assertRaises(ValueError, resolver_sat, Expressao(A | (B & C)))
+
+        # A only appears in a tautological clause
+        modelo = resolver_sat(Expressao((A | ~ A) & B))
+        self.assertEqual(sorted(modelo), ['A', 'B'])
+
+    def test_formula_usar_sat(self):
+        expressoes = (
+            Expressao((A & (A | B)) > B),
+            Expressao(A | ~ A),
+            Expressao(A & ~ A),
+            Expressao(~ (A & B & ~ C)),
+            Expressao((A ^ B) | (C > D)),
+        )
+        for e in expressoes:
+            f = Formula(e)
+            g = Formula(e, usar_sat=True)
+            self.assertEqual(g.tautologia(), f.tautologia())
+            self.assertEqual(g.contradicao(), f.contradicao())
+            if g.exemplo() is not None:
+                self.assertEqual(g.expr(*g.exemplo()), Verdadeiro)
+            if g.contraexemplo() is not None:
+                self.assertEqual(g.expr(*g.contraexemplo()), Falso)
+
+    def test_formula_equivalencia_sat(self):
+        f = Formula(Expressao(A & (B | C)), usar_sat=True)
+        g = Formula(Expressao((A & B) | (A & C)), usar_sat=True)
+        h = Formula(Expressao((A & B) | C), usar_sat=True)
+        self.assertTrue(f == g)
+        self.assertFalse(f == h)
+        valoracao = f.diferenca(h)
+        self.assertNotEqual(f.expr(*valoracao), h.expr(*valoracao))
+
+    def test_formula_muitas_variaveis_sat(self):
+        simbolos = [ExpressaoSimbolo(c) for c in string.ascii_letters[:40]]
+        # ((x0 > x1) & (x1 > x2) & ... ) > (x0 > x39)
+        cadeia = reduce(lambda x, y: x & y, [a > b for a, b in zip(simbolos, simbolos[1:])])
+        f = Formula(Expressao(cadeia > (simbolos[0] > simbolos[-1])))
+        self.assertEqual(f.nvars, 40)
+        self.assertTrue(f.usar_sat)
+        self.assertEqual(f.tautologia(), Verdadeiro)
+        self.assertEqual(f.contradicao(), Falso)
+
+        g = Formula(Expressao(cadeia > (simbolos[-1] > simbolos[0])))
+        self.assertEqual(g.tautologia(), Falso)
+        valoracao = g.contraexemplo()
+        self.assertEqual(g.expr(*valoracao), Falso)
+        self.assertFalse(f == g)
+        valoracao = f.diferenca(g)
+        self.assertNotEqual(f.expr(*valoracao), g.expr(*valoracao))
+
+    #################################################################
+    # Testes da transformação de Tseitin
+
+    def test_tseitin_equisatisfativel(self):
+        aleatorio = random.Random(3)
+        for _ in range(200):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D], 5))
+            t = Expressao(e.children[0])
+            auxiliares = t.transformar_em_forma_normal_conjuntiva_equisatisfativel()
+            modelo = resolver_sat(t)
+            self.assertEqual(modelo is None, bool(Formula(e).contradicao()))
+            if modelo is not None:
+                self.assertEqual(sorted(modelo), sorted(set(auxiliares) | e.simbolos()))
+                self.assertEqual(e.eval(modelo), Verdadeiro)
+
+    def test_tseitin_tamanho_linear(self):
+        # (A1 & B1) | (A2 & B2) | ... tem 2**n cláusulas na FNC equivalente.
+        simbolos = [ExpressaoSimbolo(c) for c in string.ascii_letters[:40]]
+        e = Expressao(reduce(lambda x, y: x | y, [
+            a & b for a, b in zip(simbolos[0::2], simbolos[1::2])
+        ]))
+        auxiliares = e.transformar_em_forma_normal_conjuntiva_equisatisfativel()
+        self.assertEqual(len(auxiliares), 20)
+        self.assertEqual(len(e.children[0].children), 3 * 20 + 1)
+        self.assertTrue(resolver_sat(e) is not None)
+
+    def test_tseitin_prefixo(self):
+        e = Expressao(A | (B & ~ C))
+        self.assertEqual(
+            e.transformar_em_forma_normal_conjuntiva_equisatisfativel(prefixo="X"),
+            ["X1"]
+        )
+        self.assertEqual(e, Expressao(ExpressaoAnd(
+            ExpressaoOr(~ ExpressaoSimbolo("X1"), B),
+            ExpressaoOr(~ ExpressaoSimbolo("X1"), ~ C),
+            ExpressaoOr(ExpressaoSimbolo("X1"), ~ B, C),
+            ExpressaoOr(A, ExpressaoSimbolo("X1")),
+        )))
+
+    def test_tseitin_sem_operadores(self):
+        for antes, depois in (
+            (A, A),
+            (~ A, ~ A),
+            (A | ~ B, A | ~ B),
+            (A & ~ B, ExpressaoAnd(A, ~ B)),
+        ):
+            e = Expressao(antes)
+            self.assertEqual(e.transformar_em_forma_normal_conjuntiva_equisatisfativel(), [])
+            self.assertEqual(e, Expressao(depois))
+
+
+
+class TestarInternamento(SimbolosGlobais, unittest.TestCase):
+    def test_subexpressoes_compartilhadas(self):
+        e = ((A & B) | (C > (A & B))).internar()
+        self.assertIs(e.children[0], e.children[1].children[1])
+        self.assertIs(e.children[0].children[0], e.children[1].children[1].children[0])
+        self.assertIs(e, ((A & B) | (C > (A & B))).internar())
+        self.assertEqual(e, (A & B) | (C > (A & B)))
+
+    def test_forma_normal_conjuntiva(self):
+        # The distribution copies subtrees; interning shares them again.
+        e = Expressao((A & B & C) | (D & E))
+        e.transformar_em_forma_normal_conjuntiva()
+        i = e.internar()
+        self.assertEqual(i, e)
+        ors = i.children[0].children
+        self.assertEqual(len(ors), 6)
+        self.assertIs(ors[0].children[0], ors[1].children[0])
+        self.assertIs(ors[0].children[1], ors[2].children[1])
+
+    def test_tabela_fraca(self):
+        import gc
+        e = (ExpressaoSimbolo("inexistente1") & ExpressaoSimbolo("inexistente2")).internar()
+        referencias = [weakref.ref(x) for x in (e, ) + e.children]
+        del e
+        gc.collect()
+        self.assertEqual([r() for r in referencias], [None, None, None])
+
+    def test_operadores(self):
+        a = A.internar()
+        b = B.internar()
+        for e in (a & b, a | b, ~ a, a > b, a ^ b, a & B):
+            self.assertTrue(e.internado or e == (a & B))
+        self.assertIs(a & b, a & b)
+        self.assertIs(a ^ b, a ^ b)
+        self.assertFalse((a & B).internado)
+
+    def test_hash(self):
+        self.assertEqual(hash((A | ~ B).internar()), hash((A | ~ B).internar()))
+        self.assertEqual(len(set([A.internar(), (A & B).internar(), (A & B).internar()])), 2)
+        # Interned and mutable expressions hash alike, as they compare equal.
+        self.assertEqual(hash((A | ~ B).internar()), hash(A | ~ B))
+        self.assertEqual(hash(A.internar()), hash(A))
+        self.assertTrue(A | ~ B in set([(A | ~ B).internar()]))
+
+    def test_hash_depois_de_modificar(self):
+        import copy
+        i = (A & (B | C)).internar()
+        e = copy.deepcopy(i)
+        conjunto = set([i])
+        self.assertEqual(hash(e), hash(i))
+        self.assertTrue(e in conjunto)
+        e.children[1].children = [C, B]
+        self.assertEqual(hash(e), hash(A & (C | B)))
+        self.assertFalse(e in conjunto)
+        e.children[1].children = [B, C]
+        self.assertEqual(hash(e), hash(i))
+        self.assertTrue(e in conjunto)
+        self.assertEqual(hash(i), hash(A & (B | C)))
+
+    def test_imutavel(self):
+        e = (A & (B | C)).internar()
+        self.assertRaises(AttributeError, setattr, e, "children", [A])
+        self.assertRaises(AttributeError, e.remover_associativas)
+
+    def test_copia(self):
+        import copy
+        e = (A & (B | C)).internar()
+        for c in (copy.copy(e), copy.deepcopy(e)):
+            self.assertFalse(c.internado)
+            self.assertEqual(c, e)
+            self.assertEqual(e, c)
+        c = copy.deepcopy(e)
+        c.children = [A, B]
+        self.assertEqual(c, A & B)
+        self.assertEqual(e, A & (B | C))
+
+
+
+
+class TestarBDD(SimbolosGlobais, unittest.TestCase):
+    def test_canonico(self):
+        g = GerenciadorBDD()
+        a, b, c = [g.variavel(x) for x in "abc"]
+        self.assertEqual(((a & b) | (a & ~ b)).no, a.no)
+        self.assertEqual((a > (b > c)).no, ((a & b) > c).no)
+        self.assertEqual((a ^ b ^ a).no, b.no)
+        self.assertTrue((a | ~ a).tautologia())
+        self.assertTrue((a & ~ a).contradicao())
+        self.assertFalse((a | b).tautologia())
+        self.assertEqual(((a & b & c) | (a & b & ~ c)).no, (a & b).no)
+        self.assertEqual((~ (~ a | ~ b)).no, (a & b).no)
+
+    def test_operadores(self):
+        g = GerenciadorBDD()
+        a, b = g.variavel("a"), g.variavel("b")
+        for operador, esperado in (
+            (lambda x, y: x & y, [True, False, False, False]),
+            (lambda x, y: x | y, [True, True, True, False]),
+            (lambda x, y: x ^ y, [False, True, True, False]),
+            (lambda x, y: x > y, [True, False, True, True]),
+            (lambda x, y: x < y, [False, False, True, False]),
+            (lambda x, y: x <= y, [True, False, True, True]),
+            (lambda x, y: x >= y, [True, True, False, True]),
+            (lambda x, y: x == y, [True, False, False, True]),
+            (lambda x, y: x != y, [False, True, True, False]),
+            (lambda x, y: ~ x & - y, [False, False, False, True]),
+        ):
+            verdadeiras = set(operador(a, b).valoracoes(["a", "b"]))
+            linhas = list(itertools.product((Verdadeiro, Falso), repeat=2))
+            self.assertEqual([l in verdadeiras for l in linhas], esperado)
+        self.assertTrue((a & Verdadeiro).equivalente(a))
+        self.assertTrue((Verdadeiro & a).equivalente(a))
+        self.assertTrue((Falso | a).equivalente(a))
+        self.assertTrue((Verdadeiro ^ a).equivalente(~ a))
+        self.assertTrue((a | 1).tautologia())
+        self.assertRaises(TypeError, bool, a)
+        self.assertRaises(ValueError, lambda: a & GerenciadorBDD().variavel("a"))
+
+    def test_contagem_e_valoracoes(self):
+        g = GerenciadorBDD()
+        a, b, c = [g.variavel(x) for x in "abc"]
+        f = (a & b) | c
+        self.assertEqual(f.contar_verdadeiros(), 5)
+        self.assertEqual(f.contar_verdadeiros(["a", "b", "c", "d"]), 10)
+        self.assertEqual(f.suporte(), ["a", "b", "c"])
+        self.assertEqual(list((a & ~ c).valoracoes()), [(Verdadeiro, Falso)])
+        self.assertEqual(list((a & ~ c).valoracoes(["c", "a"])), [(Falso, Verdadeiro)])
+        self.assertEqual(list((a & ~ c).valoracoes(["a", "b", "c"])), [
+            (Verdadeiro, Verdadeiro, Falso),
+            (Verdadeiro, Falso, Falso),
+        ])
+        self.assertEqual(g.constante(Verdadeiro).contar_verdadeiros(["a", "b"]), 4)
+        self.assertEqual(g.constante(Falso).exemplo(), None)
+        self.assertRaises(ValueError, f.contar_verdadeiros, ["a", "b"])
+
+    def test_importar(self):
+        g = GerenciadorBDD()
+        a, b, c = [g.variavel(x) for x in "abc"]
+        f = (a & ~ b) | c
+        # Another variable order.
+        h = GerenciadorBDD()
+        c2, b2, a2 = [h.variavel(x) for x in "cba"]
+        f2 = h.importar(f)
+        self.assertTrue(f2.gerenciador is h)
+        self.assertEqual(f2.no, ((a2 & ~ b2) | c2).no)
+        self.assertEqual(set(f2.valoracoes(["a", "b", "c"])), set(f.valoracoes(["a", "b", "c"])))
+        self.assertTrue(g.importar(f) is f)
+        self.assertTrue(f.equivalente(f2))
+        self.assertFalse(f2.equivalente(a))
+        self.assertTrue(h.importar(g.constante(Verdadeiro)).tautologia())
+
+    def test_expressao(self):
+        self.assertTrue((A > B).bdd().equivalente((~ B > ~ A).bdd()))
+        self.assertFalse((A & B).bdd().equivalente((B & C).bdd()))
+        self.assertTrue(Expressao((A & (B | C))).bdd().equivalente(((A & B) | (A & C)).bdd()))
+        self.assertEqual((A | B | C).bdd().contar_verdadeiros(), 7)
+        g = GerenciadorBDD()
+        self.assertTrue(((A > B).bdd(g) ^ (~ A | B).bdd(g)).contradicao())
+        self.assertTrue((A & B).bdd().gerenciador is not (A & B).bdd().gerenciador)
+
+    def test_formula_igual_a_tabela_verdade(self):
+        aleatorio = random.Random(9)
+        simbolos = [A, B, C, D, E]
+        anterior = None
+        for _ in range(200):
+            e = Expressao(expressao_aleatoria(aleatorio, simbolos, 5))
+            f = Formula(e)
+            g = Formula(e, usar_bdd=True)
+            self.assertTrue(g.bdd is not None)
+            self.assertEqual(g.tautologia(), f.tautologia())
+            self.assertEqual(g.contradicao(), f.contradicao())
+            self.assertEqual(g.exemplo(), f.exemplo())
+            self.assertEqual(g.contraexemplo(), f.contraexemplo())
+            self.assertEqual(g.contar_verdadeiros(), f.contar_verdadeiros())
+            self.assertEqual(g.tbverdade, f.tbverdade)
+            if anterior is not None and anterior[0].nvars == f.nvars:
+                self.assertEqual(g == anterior[1], f == anterior[0])
+                self.assertEqual(g.diferenca(anterior[1]), f.diferenca(anterior[0]))
+            anterior = (f, g)
+
+    def test_formula_lambda(self):
+        f = Formula(lambda A, B, C: (A & B) > C, 3, usar_bdd=True)
+        self.assertTrue(f.bdd is not None)
+        self.assertEqual(f.contar_verdadeiros(), 7)
+        self.assertEqual(f.contraexemplo(), (Verdadeiro, Verdadeiro, Falso))
+        self.assertTrue(f == Formula(lambda A, B, C: A > (B > C), 3, usar_bdd=True))
+        self.assertTrue(Formula(lambda A: Verdadeiro, 1, usar_bdd=True).tautologia())
+
+        # Each formula has its own manager, unless one is given.
+        g = Formula(lambda A, B, C: A > (B > C), 3, usar_bdd=True)
+        self.assertTrue(f.bdd.gerenciador is not g.bdd.gerenciador)
+        gerenciador = GerenciadorBDD()
+        f = Formula(lambda A, B, C: (A & B) > C, 3, usar_bdd=True, gerenciador=gerenciador)
+        g = Formula(lambda A, B, C: A > (B > C), 3, usar_bdd=True, gerenciador=gerenciador)
+        self.assertTrue(f.bdd.gerenciador is gerenciador)
+        self.assertEqual(f.bdd.no, g.bdd.no)
+
+        # Functions that convert their arguments to bool don't support BDDs.
+        f = Formula(lambda A, B: A and not B, 2, usar_bdd=True)
+        self.assertEqual(f.contar_verdadeiros(), 1)
+        self.assertFalse(f.usar_bdd)
+        self.assertTrue(f.bdd is None)
+
+        f = Formula(lambda: Verdadeiro, 0, usar_bdd=True)
+        self.assertFalse(f.usar_bdd)
+        self.assertEqual(f.contar_verdadeiros(), 0)
+
+    def test_formula_constante_a_esquerda(self):
+        # "c < A" chama A.__gt__(c), que é a implicação.
+        for c in (Verdadeiro, Falso, True, False, 1, 0):
+            for expr in (
+                lambda A: c < A,
+                lambda A: A > c,
+                lambda A: c > A,
+                lambda A, B: (c < A) | (B > c),
+            ):
+                nvars = expr.__code__.co_argcount
+                f = Formula(expr, nvars, usar_bdd=True)
+                g = Formula(expr, nvars, bitparalelo=False)
+                self.assertEqual(f.tautologia(), g.tautologia())
+                self.assertEqual(f.contradicao(), g.contradicao())
+                self.assertEqual(f.contar_verdadeiros(), g.contar_verdadeiros())
+
+    def test_formula_grande(self):
+        # Parity of 64 variables: far too big for a truth table, and hard for
+        # the SAT solver, but the BDD has one node per variable and level.
+        n = 64
+        gerenciador = GerenciadorBDD()
+        f = Formula(lambda *a: reduce(lambda x, y: x ^ y, a), n, usar_bdd=True, gerenciador=gerenciador)
+        g = Formula(lambda *a: reduce(lambda x, y: y ^ x, reversed(a)), n, usar_bdd=True)
+        h = Formula(lambda *a: ~ reduce(lambda x, y: x ^ y, a), n, usar_bdd=True, gerenciador=gerenciador)
+        self.assertTrue(f == g)
+        self.assertFalse(f == h)
+        self.assertEqual(f.contar_verdadeiros(), 1 << (n - 1))
+        self.assertEqual(f.exemplo(), (Verdadeiro, ) * (n - 1) + (Falso, ))
+        self.assertEqual(f.contraexemplo(), (Verdadeiro, ) * n)
+        self.assertEqual(f.diferenca(h), (Verdadeiro, ) * n)
+        self.assertFalse(f.tautologia())
+        self.assertTrue((f.bdd ^ h.bdd).tautologia())
+
+    def test_profunda(self):
+        # One level per variable, deeper than the default recursion limit.
+        n = 1500
+        simbolos = [ExpressaoSimbolo("x%04d" % i) for i in range(n)]
+        e = d = simbolos[-1]
+        for s in reversed(simbolos[:-1]):
+            e = s & e
+            d = s | d
+        f = Formula(Expressao(e), usar_bdd=True)
+        g = Formula(Expressao(d), usar_bdd=True)
+        self.assertFalse(f.tautologia())
+        self.assertFalse(g.contradicao())
+        self.assertEqual(f.contar_verdadeiros(), 1)
+        self.assertEqual(g.contar_verdadeiros(), (1 << n) - 1)
+        self.assertEqual(f.exemplo(), (Verdadeiro, ) * n)
+        self.assertEqual(g.contraexemplo(), (Falso, ) * n)
+        self.assertFalse(f == g)
+        self.assertTrue(f.bdd.equivalente(~ (~ f.bdd)))
+        self.assertTrue((~ g.bdd).equivalente(GerenciadorBDD().importar(~ g.bdd)))
+        self.assertTrue(f.usar_bdd and g.usar_bdd)
+
+    def test_recursao_na_funcao(self):
+        def profunda(A):
+            return profunda(A)
+        f = Formula(profunda, 1, usar_bdd=True)
+        self.assertTrue(f.bdd is None)
+        self.assertFalse(f.usar_bdd)
+
+
+
+class TestarAvaliacaoParcial(SimbolosGlobais, unittest.TestCase):
+    def test_tres_valores(self):
+        e = Expressao((A & B) | ~ C)
+        self.assertEqual(e.avaliar_parcial({}), None)
+        self.assertEqual(e.avaliar_parcial({"C": Falso}), Verdadeiro)
+        self.assertEqual(e.avaliar_parcial({"C": Verdadeiro}), None)
+        self.assertEqual(e.avaliar_parcial({"C": Verdadeiro, "A": Falso}), Falso)
+        self.assertEqual(e.avaliar_parcial({"C": True, "A": True, "B": True}), Verdadeiro)
+        self.assertEqual((A ^ B).avaliar_parcial({"A": Verdadeiro}), None)
+        self.assertEqual((A ^ A).avaliar_parcial({}), None)
+        self.assertRaises(TypeError, ExpressaoAnd().avaliar_parcial, {})
+
+    def test_igual_a_eval(self):
+        aleatorio = random.Random(4)
+        nomes = "ABCD"
+        for _ in range(30):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D], 5))
+            for valores in itertools.product((Verdadeiro, Falso, None), repeat=4):
+                parcial = dict((n, v) for n, v in zip(nomes, valores) if v is not None)
+                valor = e.avaliar_parcial(parcial)
+                completas = [
+                    e.eval(dict(zip(nomes, resto)))
+                    for resto in itertools.product(*[
+                        (v, ) if v is not None else (Verdadeiro, Falso)
+                        for v in valores
+                    ])
+                ]
+                if valor is not None:
+                    # A decided value must hold for every completion.
+                    self.assertEqual(set(completas), set([valor]))
+                elif len(parcial) == 4:
+                    self.fail("valoração completa sem valor")
+
+    def test_simbolos_por_frequencia(self):
+        e = Expressao((B & C) | (C & ~ A) | (A > C))
+        self.assertEqual(e.simbolos_por_frequencia(), ["C", "A", "B"])
+
+    def test_formula_podada(self):
+        aleatorio = random.Random(6)
+        for _ in range(100):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D, E], 5))
+            f = Formula(e)
+            g = Formula(e, podar=True)
+            self.assertEqual(g.tbverdade, f.tbverdade)
+            g = Formula(e, podar=True)
+            g.bits_por_bloco = 2
+            g.materializar = False
+            self.assertEqual(list(g.linhas()), f.tbverdade)
+            self.assertEqual(g.exemplo(), f.exemplo())
+            self.assertEqual(g.contraexemplo(), f.contraexemplo())
+
+    def test_poda(self):
+        # A is the most frequent symbol, and with A = Falso the other 19
+        # variables don't matter.
+        resto = reduce(lambda x, y: x | y, [globals()[c] for c in "CDEFGHIJKLMNOPQRST"])
+        chamadas = [0]
+        class ExpressaoContada(Expressao):
+            def avaliar_parcial(self, valores):
+                chamadas[0] += 1
+                return Expressao.avaliar_parcial(self, valores)
+        e = ExpressaoContada(A & (A | B) & resto)
+        f = Formula(e, podar=True, materializar=True, usar_sat=False)
+
+        self.assertEqual(f.contar_verdadeiros(), (1 << 19) - 2)
+        # Each decided partial valuation fills all of its rows at once.
+        self.assertTrue(chamadas[0] < 100, chamadas[0])
+        self.assertEqual(f.tbmascara >> (1 << 19), 0)
+
+        # The most frequent symbol is assigned first.
+        e = Expressao((A & B) | (C & ~ C & D & ~ D))
+        f = Formula(e, podar=True)
+        self.assertEqual(e.simbolos_por_frequencia()[:2], ["C", "D"])
+        self.assertEqual(f.tbverdade, Formula(e).tbverdade)
+
+
+
+class TestarExpressoesProfundas(SimbolosGlobais, unittest.TestCase):
+    # Deeper than the default recursion limit
+    profundidade = 5000
+
+    def cadeia(self, operador, n=None):
+        simbolos = [ExpressaoSimbolo("x%d" % i) for i in range(n or self.profundidade)]
+        return simbolos, Expressao(reduce(operador, simbolos))
+
+    def test_consultas(self):
+        simbolos, e = self.cadeia(lambda x, y: x & y)
+        _, f = self.cadeia(lambda x, y: x & y)
+        valores = dict((s.name, Verdadeiro) for s in simbolos)
+        self.assertEqual(e.eval(valores), Verdadeiro)
+        valores["x0"] = Falso
+        self.assertEqual(e.eval(valores), Falso)
+        self.assertEqual(e.avaliar_parcial({"x0": Falso}), Falso)
+        self.assertEqual(e.avaliar_parcial({}), None)
+        self.assertTrue(e == f)
+        no = f.children[0].children[0].children[0]
+        no.children = (no.children[0], ExpressaoSimbolo("y"))
+        self.assertFalse(e == f)
+        self.assertEqual(e.simbolos(), Expressao(ExpressaoAnd(*simbolos)).simbolos())
+        self.assertEqual(len(e.simbolos_por_frequencia()), self.profundidade)
+        self.assertTrue(str(e).startswith("(" * self.profundidade + "x0 & x1) & x2)"))
+        self.assertTrue(repr(e).endswith("ExpressaoSimbolo('x%d')))" % (self.profundidade - 1, )))
+
+    def test_eval_limite(self):
+        # Every tree below exceeds limite_eval_recursivo partway through
+        e = Expressao(~ (A > B) & (C | ~ A) & ~ (B & C | ~ C))
+        linhas = [dict(zip("ABC", l)) for l in itertools.product((Verdadeiro, Falso), repeat=3)]
+        esperado = [e.eval(l) for l in linhas]
+        limite_original = Expressao.limite_eval_recursivo
+        try:
+            for limite in range(8):
+                Expressao.limite_eval_recursivo = limite
+                self.assertEqual([e.eval(l) for l in linhas], esperado)
+        finally:
+            Expressao.limite_eval_recursivo = limite_original
+
+    def test_eq_limite(self):
+        # Every comparison below exceeds limite_eq_recursivo partway through
+        e = ~ (A > B) & (C | ~ A) & ~ (B & C | ~ C)
+        iguais = ~ (A > B) & (C | ~ A) & ~ (B & C | ~ C)
+        diferentes = [
+            ~ (A > B) & (C | ~ A) & ~ (B & C | ~ B),
+            ~ (A > B) & (C | A) & ~ (B & C | ~ C),
+            ~ (A > B) & (C | ~ A) & ~ (B & C | C),
+        ]
+        limite_original = Expressao.limite_eq_recursivo
+        try:
+            for limite in range(12):
+                Expressao.limite_eq_recursivo = limite
+                self.assertTrue(e == iguais)
+                for f in diferentes:
+                    self.assertFalse(e == f)
+        finally:
+            Expressao.limite_eq_recursivo = limite_original
+
+    def test_escrever_limite(self):
+        # Every tree below exceeds limite_escrever_recursivo partway through
+        e = Expressao(~ (A > B) & (C | ~ A) & ~ (B & C | ~ C))
+        esperado = (str(e), repr(e))
+        limite_original = Expressao.limite_escrever_recursivo
+        try:
+            for limite in range(10):
+                Expressao.limite_escrever_recursivo = limite
+                self.assertEqual((str(e), repr(e)), esperado)
+        finally:
+            Expressao.limite_escrever_recursivo = limite_original
+
+    def test_transformacoes(self):
+        simbolos, e = self.cadeia(lambda x, y: x | y)
+        e.remover_associativas()
+        self.assertEqual(e, Expressao(ExpressaoOr(*simbolos)))
+
+        simbolos, e = self.cadeia(lambda x, y: x & y)
+        e = Expressao(~ ~ e.children[0])
+        e.remover_duplas_negacoes()
+        e.remover_operacoes_vazias()
+        e.interiorizar_or()
+        e.remover_associativas()
+        self.assertEqual(e, Expressao(ExpressaoAnd(*simbolos)))
+
+        simbolos, e = self.cadeia(lambda x, y: x & y)
+        e = Expressao(~ e.children[0])
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoOr(*[~ s for s in simbolos])))
+
+    def test_forma_normal_conjuntiva_grande(self):
+        # Each nested AND is joined to its parent before the clauses are
+        # concatenated, so the conversion is linear in the size of the chain.
+        simbolos, e = self.cadeia(lambda x, y: x & y, self.profundidade)
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(*simbolos)))
+
+        simbolos, e = self.cadeia(lambda x, y: x | y, self.profundidade)
+        e = Expressao(~ ~ e.children[0] & simbolos[0])
+        e.transformar_em_forma_normal_conjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(ExpressaoOr(*simbolos), simbolos[0])))
+
+    def test_forma_normal_disjuntiva_grande(self):
+        simbolos, e = self.cadeia(lambda x, y: x | y, self.profundidade)
+        e.transformar_em_forma_normal_disjuntiva(simplificar=False)
+        self.assertEqual(e, Expressao(ExpressaoOr(*simbolos)))
+
+        # The operands with a single clause are multiplied together and
+        # simplified once, not once per nesting level.
+        simbolos, e = self.cadeia(lambda x, y: x & y, self.profundidade)
+        e = Expressao(e.children[0] & simbolos[0])
+        e.transformar_em_forma_normal_disjuntiva()
+        self.assertEqual(e, Expressao(ExpressaoAnd(*simbolos)))
+
+        simbolos, e = self.cadeia(lambda x, y: x | y, self.profundidade)
+        e = Expressao(e.children[0] | ~ simbolos[0])
+        e.transformar_em_forma_normal_conjuntiva(simplificar=True)
+        self.assertEqual(len(e.children[0].children), self.profundidade + 1)
+
+        simbolos, e = self.cadeia(lambda x, y: x & y, self.profundidade)
+        c = ConjuntoClausulas.de_expressao(e, converter=True)
+        self.assertEqual(list(c), [[i] for i in range(1, self.profundidade + 1)])
+
+    def test_operacao_larga(self):
+        simbolos = [globals()[ascii_uppercase[i % 26]] for i in range(self.profundidade)]
+        f = Expressao(ExpressaoAnd(*simbolos)).compilar()
+        self.assertEqual(f(*[Verdadeiro] * 26), Verdadeiro)
+        self.assertEqual(f(*[Verdadeiro] * 25 + [Falso]), Falso)
+
+    def test_chaves_de_ordenacao(self):
+        _, e = self.cadeia(lambda x, y: y & x, 1000)
+        _, f = self.cadeia(lambda x, y: x & y, 1000)
+        e.generate_sort_keys()
+        f.generate_sort_keys()
+        self.assertTrue(e.comparar_ignorando_ordem(f))
+
+    def test_compartilhamento(self):
+        # 2**200 paths from the root to A: each node must be visited once.
+        e = A | B
+        for _ in range(200):
+            e = e & ~ e
+        self.assertEqual(e.simbolos(), set(["A", "B"]))
+        self.assertEqual(e.eval({"A": Verdadeiro, "B": Falso}), Falso)
+        self.assertEqual(e.avaliar_parcial({"A": Verdadeiro}), Falso)
+        self.assertEqual(e.simbolos_por_frequencia(), ["A", "B"])
+        self.assertTrue(e == e.children[0] & e.children[1])
+        f = A | B
+        for _ in range(200):
+            f = f & ~ f
+        self.assertTrue(e == f)
+        g = A | C
+        for _ in range(200):
+            g = g & ~ g
+        self.assertFalse(e == g)
+        e.remover_duplas_negacoes()
+        e.remover_associativas()
+
+
+
+class TestarConjuntoClausulas(SimbolosGlobais, unittest.TestCase):
+    def test_ida_e_volta(self):
+        aleatorio = random.Random(13)
+        for _ in range(100):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D], 4))
+            f = Expressao(e.children[0])
+            f.transformar_em_forma_normal_conjuntiva()
+            c = ConjuntoClausulas.de_expressao(f)
+            self.assertEqual(c.expressao(), f)
+            self.assertEqual(ConjuntoClausulas.de_expressao(e, converter=True), c)
+            self.assertEqual(len(c), len(list(c)))
+            self.assertEqual(sorted(c.nomes), sorted(f.simbolos()))
+
+    def test_representacao(self):
+        c = ConjuntoClausulas.de_expressao(Expressao((A | ~ B) & C & (~ A | B | ~ C)))
+        self.assertEqual(c.nomes, ["A", "B", "C"])
+        self.assertEqual(c.literais.typecode, "i")
+        self.assertEqual(c.literais.tolist(), [1, -2, 3, -1, 2, -3])
+        self.assertEqual(c.inicios.tolist(), [0, 2, 3, 6])
+        self.assertEqual(len(c), 3)
+        self.assertEqual(c.nvars, 3)
+        self.assertEqual(c[1], [3])
+        self.assertEqual(c[-1], [-1, 2, -3])
+        self.assertRaises(IndexError, lambda: c[3])
+        self.assertEqual(list(c), [[1, -2], [3], [-1, 2, -3]])
+        self.assertEqual(eval(repr(c)), c)
+        self.assertNotEqual(c, ConjuntoClausulas(list(c)))
+
+        c = ConjuntoClausulas([[1, -3], []])
+        self.assertEqual(c.nvars, 3)
+        self.assertEqual(list(c), [[1, -3], []])
+        self.assertEqual(str(ConjuntoClausulas([[1, -3], [2]]).expressao()), "(((1 | ~ 3) & 2))")
+
+        self.assertRaises(ValueError, ConjuntoClausulas.de_expressao, Expressao(A | (B & C)))
+
+    def test_resolver(self):
+        c = ConjuntoClausulas.de_expressao(Expressao((A | B) & (~ A | B) & (A | ~ B)))
+        self.assertEqual(resolver_sat(c), {"A": Verdadeiro, "B": Verdadeiro})
+        self.assertEqual(ResolvedorSAT(c).resolver(), [1, 2])
+        c.adicionar_clausula([-1, -2])
+        self.assertEqual(resolver_sat(c), None)
+
+    def test_simplificar(self):
+        c = ConjuntoClausulas(
+            [[3, 1, 2], [1, -1], [2, 1, 2], [-3], [1, 2, -3], [2, 1]],
+            ["A", "B", "C"],
+        )
+        c.simplificar()
+        self.assertEqual(list(c), [[2, 1], [-3]])
+        self.assertEqual(c.nvars, 3)
+
+        c = ConjuntoClausulas([[1, -1]])
+        c.simplificar()
+        self.assertEqual(list(c), [])
+        self.assertEqual(list(resolver_sat(c)), ["1"])
+
+        c = ConjuntoClausulas([[1, 2], [], [3]])
+        c.simplificar()
+        self.assertEqual(list(c), [[]])
+        self.assertEqual(resolver_sat(c), None)
+
+        aleatorio = random.Random(14)
+        for _ in range(100):
+            clausulas = [
+                [aleatorio.choice([-1, 1]) * aleatorio.randint(1, 5)
+                 for _ in range(aleatorio.randint(1, 4))]
+                for _ in range(aleatorio.randint(1, 12))
+            ]
+            c = ConjuntoClausulas(clausulas)
+            c.simplificar()
+            simplificadas = [set(x) for x in c]
+            for i, x in enumerate(simplificadas):
+                self.assertFalse(any(-l in x for l in x))
+                for j, y in enumerate(simplificadas):
+                    self.assertTrue(i == j or not x.issubset(y))
+            # Every original clause is implied by (contains) a kept one.
+            for x in clausulas:
+                x = set(x)
+                self.assertTrue(
+                    any(-l in x for l in x) or
+                    any(y.issubset(x) for y in simplificadas)
+                )
+
+    def test_muitas_clausulas(self):
+        # (A1 & B1) | (A2 & B2) | ... has 2**n clauses
+        n = 12
+        e = Expressao(reduce(lambda x, y: x | y, [
+            ExpressaoSimbolo("A%d" % i) & ExpressaoSimbolo("B%d" % i)
+            for i in range(n)
+        ]))
+        c = ConjuntoClausulas.de_expressao(e, converter=True)
+        self.assertEqual(len(c), 1 << n)
+        self.assertEqual(len(c.literais), n << n)
+        self.assertEqual(c[0], list(range(1, n + 1)))
+        self.assertEqual(sorted(c[-1]), list(range(n + 1, 2 * n + 1)))
+
+
+
+class TestarMinimizacao(SimbolosGlobais, unittest.TestCase):
+    def assertEquivalente(self, e, f, simbolos):
+        for valores in itertools.product([Verdadeiro, Falso], repeat=len(simbolos)):
+            valores = dict(zip(simbolos, valores))
+            self.assertEqual(e.eval(valores), f.eval(valores))
+
+    def test_formula(self):
+        f = Formula(lambda A,B,C: (A & B) | (A & ~B & C) | (~A & B & C), 3)
+        self.assertEqual(str(f.minimizar()), "(((A & B) | (A & C) | (B & C)))")
+        self.assertEqual(str(f.minimizar(conjuntiva=True)), "(((A | B) & (A | C) & (B | C)))")
+        self.assertEqual(str(f.minimizar(exato=False)), "(((A & B) | (A & C) | (B & C)))")
+
+        f = Formula(lambda A,B,C: A ^ B ^ C, 3)
+        self.assertEqual(len(f.minimizar().children[0].children), 4)
+        self.assertEqual(len(f.minimizar(conjuntiva=True).children[0].children), 4)
+
+        f = Formula(lambda A,B: A | ~ A, 2)
+        self.assertEqual(str(f.minimizar()), "((A | ~ A))")
+        self.assertEqual(str(f.minimizar(conjuntiva=True)), "((A | ~ A))")
+        f = Formula(lambda A,B: A & ~ A, 2)
+        self.assertEqual(str(f.minimizar()), "((A & ~ A))")
+        self.assertEqual(str(f.minimizar(conjuntiva=True)), "((A & ~ A))")
+
+        f = Formula(lambda *args: args[0] & ~ args[2], 3)
+        self.assertEqual(str(f.minimizar()), "((x1 & ~ x3))")
+        self.assertEqual(str(f.minimizar(nomes="XYZ")), "((X & ~ Z))")
+
+        self.assertRaises(ValueError, Formula(lambda: Verdadeiro, 0).minimizar)
+
+    def test_expressao(self):
+        e = Expressao((A & B) | (A & ~ B) | (~ A & B))
+        self.assertEqual(str(e.minimizar()), "((A | B))")
+        self.assertEqual(str(e), "((((A & B) | (A & ~ B)) | (~ A & B)))")
+
+        aleatorio = random.Random(16)
+        for _ in range(100):
+            e = Expressao(expressao_aleatoria(aleatorio, [A, B, C, D, E], 4))
+            simbolos = sorted(e.simbolos())
+            for conjuntiva in (False, True):
+                exata = e.minimizar(conjuntiva, exato=True)
+                heuristica = e.minimizar(conjuntiva, exato=False)
+                self.assertEquivalente(exata, e, simbolos)
+                self.assertEquivalente(heuristica, e, simbolos)
+                # The result is in the requested normal form.
+                fnc = exata if conjuntiva else Expressao(~ exata.children[0])
+                fnc.interiorizar_negacao()
+                fnc.remover_duplas_negacoes()
+                resolver_sat(fnc)
+                self.assertTrue(self.termos(exata, conjuntiva) <= self.termos(heuristica, conjuntiva))
+
+    def termos(self, e, conjuntiva):
+        e = e.children[0]
+        if (e.is_and and conjuntiva) or (e.is_or and not conjuntiva):
+            return len(e.children)
+        return 1
+
+    def test_muitas_variaveis(self):
+        # Too many variables for the exact method.
+        def funcao(*args):
+            return (args[0] ^ args[1] ^ args[2]) | (args[3] & args[4]) | reduce(lambda x, y: x & y, args[5:])
+        f = Formula(funcao, 16)
+        e = f.minimizar()
+        self.assertEqual(len(e.children[0].children), 6)
+        g = Formula(lambda *args: e.eval(dict(("x%d" % (i + 1), v) for i, v in enumerate(args))), 16)
+        self.assertTrue(f == g)
+
+
+class TestarSimbolos(unittest.TestCase):
+    def test_nomes_com_varios_caracteres(self):
+        p10 = ExpressaoSimbolo("P10")
+        x = ExpressaoSimbolo("x_1234")
+        e = Expressao((p10 & ~ x) | (x > p10))
+        self.assertEqual(e.simbolos(), set(["P10", "x_1234"]))
+        self.assertEqual(p10.simbolos(), set(["P10"]))
+
+        f = Formula(e)
+        self.assertEqual(f.nvars, 2)
+        self.assertEqual(f.simbolos, ["P10", "x_1234"])
+        g = Formula(lambda P10, x_1234: (P10 & ~ x_1234) | (x_1234 > P10), 2)
+        self.assertEqual(f.tbverdade, g.tbverdade)
+        self.assertEqual(str(e.minimizar()), "((P10 | ~ x_1234))")
+        self.assertEqual(resolver_sat(Expressao(p10 & ~ x)), {"P10": Verdadeiro, "x_1234": Falso})
+
+    def test_simbolos_em_cache(self):
+        a, b, c = [ExpressaoSimbolo(n) for n in ("a1", "b22", "c333")]
+        e = Expressao((a & b) | ~ a)
+        self.assertEqual(e.simbolos(), set(["a1", "b22"]))
+        self.assertEqual(e.simbolos(), set(["a1", "b22"]))
+        # The result doesn't depend on the other names in the process.
+        outros = [ExpressaoSimbolo("z%d" % i) for i in range(1000)]
+        self.assertEqual(Expressao(reduce(lambda x, y: x | y, outros)).simbolos(), set(s.name for s in outros))
+        self.assertEqual(e.simbolos(), set(["a1", "b22"]))
+        self.assertEqual(e.children[0].simbolos(), set(["a1", "b22"]))
+
+        # Changing the tree, or a name, updates the symbols.
+        e.children[0].children[1].children = (c, )
+        self.assertEqual(e.simbolos(), set(["a1", "b22", "c333"]))
+        self.assertEqual(e.children[0].simbolos(), set(["a1", "b22", "c333"]))
+        b.name = "d4444"
+        self.assertEqual(e.simbolos(), set(["a1", "d4444", "c333"]))
+
+        i = ExpressaoSimbolo("a1").internar()
+        self.assertRaises(AttributeError, setattr, i, "name", "b")
+        self.assertEqual((i & ~ i).simbolos(), set(["a1"]))
+
+    def test_tabela_simbolos(self):
+        a, b, c = [ExpressaoSimbolo(n) for n in ("x_10", "x_2", "P1")]
+        e = Expressao((a & b) | ~ c)
+        t = e.tabela_simbolos()
+        self.assertEqual(list(t), ["P1", "x_10", "x_2"])
+        self.assertEqual([t.id(n) for n in t], [0, 1, 2])
+        self.assertEqual(t.nome(2), "x_2")
+        self.assertTrue("x_10" in t and "y" not in t)
+        self.assertRaises(KeyError, t.id, "y")
+        self.assertTrue(e.tabela_simbolos() is t)
+        # The ids are dense for each expression, whatever other names exist.
+        self.assertEqual(Expressao(b & ExpressaoSimbolo("z")).tabela_simbolos().id("z"), 1)
+        self.assertEqual(Formula(e).simbolos, list(t))
+
+        e.children[0].children[1].children = (ExpressaoSimbolo("A"), )
+        self.assertEqual(list(e.tabela_simbolos()), ["A", "x_10", "x_2"])
+        b.name = "B"
+        self.assertEqual(list(e.tabela_simbolos()), ["A", "B", "x_10"])
+
+
+class TestarLerExpressao(unittest.TestCase):
+    def setUp(self):
+        self.simbolos = {}
+        criar_simbolos_no_namespace("ABCD", self.simbolos)
+
+    def test_mesma_arvore_dos_operadores(self):
+        for texto in ("(A & ~B) | C", "A | B & ~C ^ D", "~ ~ A & (B | ~ (C ^ D))",
+                      "A & B & C | D", "((A))", "~(A > B)"):
+            self.assertEqual(ler_expressao(texto, simbolos=self.simbolos),
+                             eval(texto, {}, dict(self.simbolos)), texto)
+
+    def test_str(self):
+        aleatorio = random.Random(22)
+        simbolos = [self.simbolos[s] for s in "ABCD"]
+        for _ in range(50):
+            e = expressao_aleatoria(aleatorio, simbolos, 5)
+            lida = ler_expressao(str(e))
+            for linha in itertools.product((Verdadeiro, Falso), repeat=4):
+                valores = dict(zip("ABCD", linha))
+                self.assertEqual(lida.eval(valores), e.eval(valores), str(e))
+
+    def test_implica(self):
+        A, B, C = [self.simbolos[s] for s in "ABC"]
+        self.assertEqual(ler_expressao("A > B > C", simbolos=self.simbolos), A > (B > C))
+        self.assertEqual(ler_expressao("A & B > C", simbolos=self.simbolos), (A & B) > C)
+
+    def test_precedencia(self):
+        A, B, C = [self.simbolos[s] for s in "ABC"]
+        self.assertEqual(ler_expressao("A | B & C", {"|": 5}, self.simbolos), (A | B) & C)
+        self.assertEqual(ler_expressao("~ A & B", {"~": 0}, self.simbolos), ~ (A & B))
+        self.assertRaises(ValueError, ler_expressao, "A", {"!": 1})
+
+    def test_simbolos(self):
+        e = ler_expressao("P10 & ~P10 | x_1")
+        self.assertEqual(e.simbolos(), set(["P10", "x_1"]))
+        p10 = e.children[0].children[0]
+        self.assertTrue(e.children[0].children[1].children[0] is p10)
+
+        e = Expressao(ExpressaoSimbolo(u"ação") & ~ ExpressaoSimbolo(u"Ω_2"))
+        lida = ler_expressao(str(e))
+        self.assertEqual(lida, e.children[0])
+        self.assertEqual(lida.simbolos(), set([u"ação", u"Ω_2"]))
+        self.assertRaises(ValueError, ler_expressao, "A & 2x")
+
+        simbolos = {}
+        e = ler_expressao("A | B", simbolos=simbolos)
+        self.assertEqual(sorted(simbolos), ["A", "B"])
+        self.assertTrue(e.children[0] is simbolos["A"])
+
+    def test_erros(self):
+        for texto, posicao in (("", 0), ("A &", 3), ("(A", 0), ("A)", 1), ("A B", 2),
+                               ("& A", 0), ("A $ B", 2), ("A ~ B", 2), ("((A) & B", 0),
+                               ("A % B", 2)):
+            try:
+                ler_expressao(texto)
+            except ValueError as e:
+                self.assertTrue(("posição %d" % posicao) in str(e), (texto, str(e)))
+            else:
+                self.fail(texto)
+
+    def test_profundo(self):
+        # Deeper than the default recursion limit
+        n = 5000
+        e = ler_expressao("(" * n + "~" * n + "A" + ")" * n)
+        for _ in range(n):
+            e = e.children[0]
+        self.assertEqual(e.name, "A")
+
+        e = ler_expressao(" & ".join("(x%d | ~y%d)" % (i, i) for i in range(n)))
+        self.assertEqual(e.children[1], ExpressaoOr(ExpressaoSimbolo("x%d" % (n - 1)),
+                                                    ExpressaoNot(ExpressaoSimbolo("y%d" % (n - 1)))))
+
+
+class TestarDimacs(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.diretorio, "formula.cnf")
+
+    def tearDown(self):
+        shutil.rmtree(self.diretorio)
+
+    def test_conjunto(self):
+        aleatorio = random.Random(23)
+        clausulas = [
+            [aleatorio.choice((-1, 1)) * aleatorio.randint(1, 50) for _ in range(aleatorio.randint(1, 5))]
+            for _ in range(1000)
+        ]
+        c = ConjuntoClausulas(clausulas, ["x%d" % i for i in range(1, 51)])
+        escrever_dimacs(c, self.caminho)
+        self.assertEqual(ler_dimacs(self.caminho), c)
+        self.assertEqual(list(iterar_dimacs(self.caminho)), clausulas)
+
+        escrever_dimacs(clausulas, self.caminho)
+        with open(self.caminho) as f:
+            self.assertEqual(f.readline(), "p cnf 50 1000\n")
+        self.assertEqual(ler_dimacs(self.caminho), ConjuntoClausulas(clausulas))
+
+    def test_gerador(self):
+        clausulas = [[1, -2], [2, 3, -7], [-1]]
+        escrever_dimacs((c for c in clausulas), self.caminho)
+        with open(self.caminho) as f:
+            self.assertEqual(f.readline().split(), ["p", "cnf", "7", "3"])
+        self.assertEqual(list(iterar_dimacs(self.caminho)), clausulas)
+
+        escrever_dimacs(iter(clausulas), self.caminho, nvars=10, nclausulas=3)
+        with open(self.caminho) as f:
+            self.assertEqual(f.readline(), "p cnf 10 3\n")
+
+        arquivo = io.StringIO()
+        escrever_dimacs(iter(clausulas), arquivo, nvars=8, nclausulas=3)
+        self.assertEqual(arquivo.getvalue(), "p cnf 8 3\n1 -2 0\n2 3 -7 0\n-1 0\n")
+
+        class SemSeek(object):
+            def write(self, texto):
+                pass
+        self.assertRaises(ValueError, escrever_dimacs, iter(clausulas), SemSeek())
+        escrever_dimacs(iter(clausulas), SemSeek(), 7, 3)
+
+    def test_posicao(self):
+        with open(self.caminho, "wb") as f:
+            f.write(b"1 2 0\n-1 0\n3 0\n")
+        with open(self.caminho, "rb") as f:
+            f.readline()
+            self.assertEqual(list(iterar_dimacs(f)), [[-1], [3]])
+
+    def test_expressao(self):
+        A, B, C = [ExpressaoSimbolo(s) for s in "ABC"]
+        e = Expressao((A | ~ B) & (B | C) & ~ C)
+        escrever_dimacs(e, self.caminho)
+        lida = ler_dimacs(self.caminho, expressao=True)
+        self.assertEqual(lida, ConjuntoClausulas.de_expressao(e).expressao())
+        self.assertEqual(str(lida), "(((A | ~ B) & (B | C) & ~ C))")
+        self.assertEqual(lida.eval(resolver_sat(lida)), Verdadeiro)
+
+        self.assertRaises(ValueError, escrever_dimacs, Expressao(A & (B | (A & C))), self.caminho)
+
+    def test_formato(self):
+        texto = (
+            "c comentário\n"
+            "p cnf 3 3\n"
+            "1 -2\n"
+            "  3 0 -1 0\n"
+            "\n"
+            "2 3 0\n"
+            "%\n"
+            "0\n"
+        )
+        with open(self.caminho, "wb") as f:
+            f.write(texto.encode("utf-8"))
+        esperado = [[1, -2, 3], [-1], [2, 3]]
+        self.assertEqual(list(iterar_dimacs(self.caminho)), esperado)
+        with open(self.caminho, "rb") as f:
+            self.assertEqual(list(iterar_dimacs(f)), esperado)
+        self.assertEqual(list(iterar_dimacs(io.BytesIO(texto.encode("utf-8")))), esperado)
+        self.assertEqual(list(iterar_dimacs(io.StringIO(u"1 2 0\n-1"))), [[1, 2], [-1]])
+        self.assertEqual(list(iterar_dimacs(io.BytesIO(b""))), [])
+
+        self.assertRaises(ValueError, list, iterar_dimacs(io.BytesIO(b"p sat 3\n")))
+        self.assertRaises(ValueError, list, iterar_dimacs(io.BytesIO(b"1 x 0\n")))
+
+    def test_nomes(self):
+        arquivo = io.StringIO()
+        escrever_dimacs(ConjuntoClausulas([[1, -3]], ["P10", "2", "x 1"]), arquivo)
+        self.assertEqual(arquivo.getvalue(), "c nome 1 P10\nc nome 3 x 1\np cnf 3 1\n1 -3 0\n")
+        nomes = {}
+        arquivo.seek(0)
+        self.assertEqual(list(iterar_dimacs(arquivo, nomes)), [[1, -3]])
+        self.assertEqual(nomes, {1: "P10", 3: "x 1"})
+
+        # Names that would not read back as they are go between quotes
+        nomes = [" a b ", "", '"x"', "a\nb", "ação"]
+        arquivo = io.StringIO()
+        escrever_dimacs(ConjuntoClausulas([[1, 2, 3, 4, 5]], nomes), arquivo)
+        self.assertTrue(arquivo.getvalue().startswith('c nome 1 " a b "\nc nome 2 ""\n'))
+        arquivo.seek(0)
+        self.assertEqual(ler_dimacs(arquivo).nomes, nomes)
+        self.assertRaises(ValueError, list, iterar_dimacs(io.BytesIO(b'c nome 1 "a\n1 0\n')))
+
+    def test_nvars(self):
+        c = ConjuntoClausulas([[1, -3]])
+        arquivo = io.StringIO()
+        escrever_dimacs(c, arquivo, nvars=5)
+        self.assertEqual(arquivo.getvalue(), "p cnf 5 1\n1 -3 0\n")
+        self.assertRaises(ValueError, escrever_dimacs, c, io.StringIO(), nvars=2)
+        self.assertRaises(ValueError, escrever_dimacs, c, io.StringIO(), nclausulas=2)
+
+        A, B = ExpressaoSimbolo("A"), ExpressaoSimbolo("B")
+        arquivo = io.StringIO()
+        escrever_dimacs(Expressao(A & (~ A | B)), arquivo, nvars=3, nclausulas=2)
+        self.assertTrue("p cnf 3 2\n" in arquivo.getvalue())
+        self.assertRaises(ValueError, escrever_dimacs, Expressao(A & B), io.StringIO(), nvars=1)
+
+
+class TestarSerializacao(unittest.TestCase):
+    def test_ida_e_volta(self):
+        aleatorio = random.Random(24)
+        simbolos = [ExpressaoSimbolo(s) for s in ("A", "P10", "x_1", "ação")]
+        for _ in range(100):
+            e = Expressao(expressao_aleatoria(aleatorio, simbolos, 6))
+            dados = e.serializar()
+            for d in (dados, bytearray(dados), memoryview(dados)):
+                lida = Expressao.desserializar(d)
+                self.assertEqual(lida, e)
+                self.assertEqual(str(lida), str(e))
+
+    def test_compartilhamento(self):
+        A, B = ExpressaoSimbolo("A"), ExpressaoSimbolo("B")
+        s = A & B
+        e = Expressao(ExpressaoOr(s, ~ s, s))
+        lida = Expressao.desserializar(e.serializar())
+        self.assertEqual(lida, e)
+        ou = lida.children[0]
+        self.assertTrue(ou.children[0] is ou.children[2])
+        self.assertTrue(ou.children[1].children[0] is ou.children[0])
+        self.assertTrue(ou.children[0].children[0] is not ExpressaoSimbolo("A"))
+
+        # Symbols with the same name that are different objects stay apart.
+        e = ExpressaoAnd(ExpressaoSimbolo("A"), ExpressaoSimbolo("A"))
+        lida = Expressao.desserializar(e.serializar())
+        self.assertTrue(lida.children[0] is not lida.children[1])
+
+    def test_profunda(self):
+        # Deeper than the default recursion limit
+        n = 5000
+        simbolos = [ExpressaoSimbolo("x%d" % i) for i in range(n)]
+        e = Expressao(reduce(lambda x, y: x & y, simbolos))
+        dados = e.serializar()
+        lida = Expressao.desserializar(dados)
+        self.assertEqual(lida, e)
+        self.assertEqual(lida.children[0].children[1].name, "x%d" % (n - 1))
+
+        # An operation with 2 * n operands needs 4-byte integers.
+        e = Expressao(ExpressaoAnd(*(simbolos * 2)))
+        self.assertEqual(e.serializar()[4:5], b"\x04")
+        self.assertEqual(Expressao.desserializar(e.serializar()), e)
+
+    def test_dados_invalidos(self):
+        dados = Expressao(ExpressaoSimbolo("A") & ExpressaoSimbolo("B")).serializar()
+        for invalido in (b"", dados[:10], dados[:-1], b"XYZ" + dados[3:]):
+            self.assertRaises(ValueError, Expressao.desserializar, invalido)
+        self.assertRaises(ValueError, Expressao.desserializar, ExpressaoNot(ExpressaoSimbolo("A")).serializar()[:-1])
+
+    def test_pickle(self):
+        A, B, C = [ExpressaoSimbolo(s) for s in "ABC"]
+        s = A | ~ B
+        e = Expressao(s & (C > s))
+        for protocolo in range(pickle.HIGHEST_PROTOCOL + 1):
+            lida = pickle.loads(pickle.dumps(e, protocolo))
+            self.assertEqual(lida, e)
+        lida = copy.deepcopy(e)
+        self.assertEqual(lida, e)
+        self.assertTrue(lida.children[0].children[0] is lida.children[0].children[1].children[1])
+        self.assertTrue(lida.children[0].children[0] is not s)
+
+        # copy.copy() is still shallow.
+        c = copy.copy(e)
+        self.assertTrue(c is not e and c.children[0] is e.children[0])
+
+    def test_classes_nao_suportadas(self):
+        class ExpressaoXor(ExpressaoBinaria):
+            __slots__ = ()
+            operator_str = " ^ "
+
+        e = Expressao(ExpressaoXor(ExpressaoSimbolo("A"), ExpressaoSimbolo("B")))
+        self.assertRaises(TypeError, e.serializar)
+        c = copy.deepcopy(e)
+        self.assertEqual(c, e)
+        self.assertTrue(isinstance(c.children[0], ExpressaoXor))
+
+    def test_nomes_nao_texto(self):
+        e = Expressao(ExpressaoSimbolo(1) & ExpressaoSimbolo(2))
+        self.assertRaises(TypeError, e.serializar)
+        for c in (copy.deepcopy(e), pickle.loads(pickle.dumps(e))):
+            self.assertEqual(c, e)
+            self.assertEqual(c.simbolos(), set([1, 2]))
+
+    def test_limite(self):
+        e = Expressao(ExpressaoSimbolo("A" * 40) | ExpressaoSimbolo("B"))
+        limite = logica._limite_serializado
+        logica._limite_serializado = 40
+        try:
+            self.assertRaises(OverflowError, e.serializar)
+            self.assertEqual(copy.deepcopy(e), e)
+        finally:
+            logica._limite_serializado = limite
+        self.assertEqual(Expressao.desserializar(e.serializar()), e)
+
+
+class TestarTabelaVerdade(unittest.TestCase):
+    def test_sequencia(self):
+        valores = [Verdadeiro, Falso, Falso, Verdadeiro, Verdadeiro]
+        t = TabelaVerdade(0b11001, 5)
+        self.assertEqual(len(t), 5)
+        self.assertEqual(list(t), valores)
+        self.assertEqual(list(reversed(t)), valores[::-1])
+        self.assertEqual([t[i] for i in range(-5, 5)], valores + valores)
+        self.assertTrue(t[0] is Verdadeiro and t[1] is Falso)
+        self.assertEqual(t[1:4], valores[1:4])
+        self.assertEqual(t[::-2], valores[::-2])
+        self.assertRaises(IndexError, lambda: t[5])
+        self.assertRaises(IndexError, lambda: t[-6])
+        self.assertEqual((t.count(Verdadeiro), t.count(False), t.count(2)), (3, 2, 0))
+        self.assertEqual((t.index(Verdadeiro), t.index(Falso)), (0, 1))
+        self.assertRaises(ValueError, TabelaVerdade(0, 4).index, Verdadeiro)
+        self.assertTrue(Falso in t)
+        self.assertFalse(Verdadeiro in TabelaVerdade(0, 4))
+        self.assertEqual(repr(t), repr(valores))
+
+    def test_comparacao(self):
+        t = TabelaVerdade(0b0110, 4)
+        self.assertTrue(t == [Falso, Verdadeiro, Verdadeiro, Falso])
+        self.assertTrue([False, True, True, False] == t)
+        self.assertFalse(t == (0, 1, 1, 0))
+        self.assertTrue(t != (Falso, Verdadeiro, Verdadeiro, Falso))
+        self.assertFalse(t != TabelaVerdade(0b0110, 4))
+        self.assertTrue(t != TabelaVerdade(0b0110, 5))
+        self.assertTrue(t != [Falso, Verdadeiro, Verdadeiro])
+        self.assertFalse(t == None)
+        self.assertEqual(len(set([t, TabelaVerdade(0b0110, 4), TabelaVerdade(0b0111, 4)])), 2)
+
+    def test_tabela_grande(self):
+        n = 1 << 15
+        aleatorio = random.Random(25)
+        mascara = aleatorio.getrandbits(n)
+        t = TabelaVerdade(mascara, n)
+        valores = list(t)
+        self.assertEqual(len(valores), n)
+        self.assertEqual(valores[12345], Booleano((mascara >> 12345) & 1))
+        self.assertEqual(t.count(Verdadeiro), valores.count(Verdadeiro))
+        self.assertEqual(t, valores)
+        self.assertEqual(pickle.loads(pickle.dumps(t, 2)), t)
+
+    def test_formula(self):
+        f = Formula(lambda A, B, C: (A & B) | C, 3)
+        self.assertTrue(isinstance(f.tbverdade, TabelaVerdade))
+        self.assertTrue(f.tbverdade is f.tbverdade)
+        self.assertEqual(f.tbverdade.mascara, f.tbmascara)
+        g = Formula(lambda A, B, C: (A & B) | C, 3, bitparalelo=False)
+        self.assertEqual(g.tbverdade, f.tbverdade)
+
+        aleatorio = random.Random(25)
+        for nvars in (1, 4, 10):
+            completa = (1 << (1 << nvars)) - 1
+            for mascara in (0, completa, aleatorio.getrandbits(1 << nvars)):
+                f = Formula(lambda *args: Falso, nvars)
+                f._tbmascara = mascara
+                self.assertEqual(f.tautologia(), Booleano(mascara == completa))
+                self.assertEqual(f.contradicao(), Booleano(mascara == 0))
+                self.assertEqual(f.tbverdade.count(Verdadeiro), f.contar_verdadeiros())
+                g = Formula(lambda *args: Falso, nvars)
+                g._tbmascara = mascara ^ (1 << 3 if nvars > 1 else 1)
+                self.assertFalse(f == g)
+                self.assertEqual(f.diferenca(g), f.valoracao(3 if nvars > 1 else 0))
+
+
+@unittest.skipIf(tracemalloc is None, "tracemalloc não está disponível")
+class TestarMemoria(SimbolosGlobais, unittest.TestCase):
+    n = 1000
+
+    def medir(self, funcao, n=None):
+        """Retorna a memória alocada por funcao() por chamada, em n chamadas
+        (por padrão, self.n), e os resultados, que continuam vivos durante a
+        medição."""
+        if n is None:
+            n = self.n
+        # The list is allocated before the measurement, and the first call
+        # allocates what all the calls share.
+        resultados = [None] * n
+        funcao()
+        tracemalloc.start()
+        try:
+            antes = tracemalloc.get_traced_memory()[0]
+            for i in range(n):
+                resultados[i] = funcao()
+            depois = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return (depois - antes) / float(n), resultados
+
+    def test_arvore(self):
+        class TresSlots(object):
+            __slots__ = ("a", "b", "__weakref__")
+
+        self.assertEqual(sys.getsizeof(A & B), sys.getsizeof(TresSlots()))
+        memoria, arvores = self.medir(lambda: Expressao(A & ~ B))
+        # Only the nodes and their tuples of children
+        e = arvores[0]
+        nos = (e, e.children[0], e.children[0].children[1])
+        self.assertTrue(memoria <= sum(sys.getsizeof(x) + sys.getsizeof(x.children) for x in nos))
+
+    def test_chaves(self):
+        # Each of the 200 nodes stores its keys and a weak reference to its
+        # parent, which is a few times the size of the node.
+        arvores = iter([Expressao(reduce(lambda x, y: x & ~ y, [A, B] * 50)) for _ in range(51)])
+        def chaves():
+            e = next(arvores)
+            return hash(e), e.sort_key
+        memoria, _ = self.medir(chaves, 50)
+        self.assertTrue(memoria / 200 <= 6 * sys.getsizeof(A & B))
+
+    def test_chaves_guardadas(self):
+        e = reduce(lambda x, y: x & ~ y, [A, B] * 50)
+        outra = reduce(lambda x, y: x & ~ y, [A, B] * 50)
+        nos = [e]
+        for x in nos:
+            nos.extend(x.children)
+        def chaves():
+            tracemalloc.start()
+            try:
+                [(hash(x), x.sort_key) for x in nos]
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        chaves()
+        antes = chaves()
+        # Changing an expression that shares only the symbols with e does
+        # not throw away the keys of e.
+        hash(outra)
+        outra.children[1].children = (C,)
+        hash(outra)
+        outra.transformar_em_forma_normal_conjuntiva()
+        self.assertTrue(chaves() <= antes)
+
+    def test_simbolos(self):
+        # Only the queried expression stores its set of names, and the other
+        # nodes store just a weak reference to their parents.
+        arvores = iter([Expressao(reduce(lambda x, y: x & ~ y, [A, B] * 50)) for _ in range(51)])
+        memoria, _ = self.medir(lambda: next(arvores).simbolos(), 50)
+        self.assertTrue(memoria / 200 <= 4 * sys.getsizeof(A & B))
+
+
 class TestarExpressoesTrueFalse(unittest.TestCase):
     """Esta classe contém apenas testes não críticos"""
 
@@ -731,10 +2682,29 @@ if __name__ == '__main__':
         sys.stderr.write("\n")
 
     sys.stderr.write("Running CRITICAL tests:\n")
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestarExpressoes)
+    suite = unittest.TestSuite([
+        unittest.TestLoader().loadTestsFromTestCase(testcase)
+        for testcase in (
+            TestarExpressoes,
+            TestarFormula,
+            TestarAvaliacaoEmLote,
+            TestarResolvedorSAT,
+            TestarInternamento,
+            TestarBDD,
+            TestarAvaliacaoParcial,
+            TestarExpressoesProfundas,
+            TestarConjuntoClausulas,
+            TestarMinimizacao,
+            TestarSimbolos,
+            TestarLerExpressao,
+            TestarDimacs,
+            TestarSerializacao,
+            TestarTabelaVerdade,
+            TestarMemoria,
+        )
+    ])
     unittest.TextTestRunner(verbosity=1).run(suite)
 
     # Also running doctest:
     import doctest
-    import logica
     doctest.testmod(logica)